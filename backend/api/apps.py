@@ -1,6 +1,13 @@
+import os
 from django.apps import AppConfig
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Index creation is opt-in at startup; `manage.py mongo_indexes` applies the registry on deploy
+        if os.getenv('MONGODB_ENSURE_INDEXES', 'False') == 'True':
+            from .services.mongo_service import mongo_service
+            mongo_service.ensure_indexes()
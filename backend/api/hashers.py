@@ -0,0 +1,15 @@
+import os
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id with its cost taken from the environment.
+
+    Stored hashes made with other parameters (or by PBKDF2) are upgraded on
+    the next successful login, so the cost can be raised or lowered at any time.
+    """
+
+    time_cost = int(os.getenv('ARGON2_TIME_COST', '2'))
+    memory_cost = int(os.getenv('ARGON2_MEMORY_COST_KIB', '65536'))
+    parallelism = int(os.getenv('ARGON2_PARALLELISM', '1'))
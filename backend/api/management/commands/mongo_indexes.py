@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from api.services.mongo_service import mongo_service
+
+
+class Command(BaseCommand):
+    help = 'Apply and check the MongoDB index registry'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Report missing, unexpected and mismatched indexes instead of creating them')
+        parser.add_argument('--unused', action='store_true',
+                            help='List indexes with no recorded use since the server started')
+        parser.add_argument('--explain', action='store_true',
+                            help='Verify every hot query is served by an index scan')
+
+    def handle(self, *args, **options):
+        problems = False
+
+        if not (options['check'] or options['unused'] or options['explain']):
+            failed = mongo_service.ensure_indexes()
+            if failed:
+                raise CommandError(f"Could not create indexes: {', '.join(failed)}")
+            self.stdout.write(self.style.SUCCESS('Indexes are up to date'))
+            return
+
+        if options['check']:
+            drift = mongo_service.index_drift()
+            for kind, names in drift.items():
+                for name in names:
+                    problems = True
+                    self.stdout.write(self.style.WARNING(f'{kind}: {name}'))
+            if not any(drift.values()):
+                self.stdout.write(self.style.SUCCESS('No index drift'))
+
+        if options['unused']:
+            for collection, name, since in mongo_service.unused_indexes():
+                self.stdout.write(f'unused: {collection}.{name} (since {since})')
+
+        if options['explain']:
+            for result in mongo_service.explain_hot_queries():
+                line = f"{result['name']} ({result['collection']}): {' > '.join(result['stages'])}"
+                if result['ok']:
+                    self.stdout.write(self.style.SUCCESS(f'IXSCAN  {line}'))
+                else:
+                    problems = True
+                    self.stdout.write(self.style.ERROR(f'NO IXSCAN  {line}'))
+
+        if problems:
+            raise CommandError('Index check failed')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from api.services.question_bank import question_bank
+
+
+class Command(BaseCommand):
+    help = 'Mark the precomputed playlist questions as the question bank and report its coverage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backfill', action='store_true',
+                            help='Mark questions of playlist transcripts stored before the bank existed')
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            marked = question_bank.backfill()
+            self.stdout.write(self.style.SUCCESS(f'Marked {marked} questions as banked'))
+
+        coverage = question_bank.coverage()
+        self.stdout.write(f"Banked videos: {coverage['videos']}")
+        for question_type, count in sorted(coverage['questions'].items()):
+            self.stdout.write(f"  {question_type}: {count} questions")
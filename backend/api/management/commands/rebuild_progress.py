@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from api.services.progress_service import progress_service
+
+
+class Command(BaseCommand):
+    help = 'Recompute user_progress rollups from the attempt_events log'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild the rollups of this user id')
+
+    def handle(self, *args, **options):
+        written = progress_service.rebuild(user_id=options['user'])
+        scope = f"user {options['user']}" if options['user'] else 'all users'
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} progress rollups for {scope}'))
@@ -1,11 +1,38 @@
-from django.utils.functional import SimpleLazyObject
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
 from rest_framework.exceptions import AuthenticationFailed
-from django.contrib.auth.models import AnonymousUser
-from bson import ObjectId
-from .services.user_service import user_service
+from .token_cache import MongoUser, token_cache
 
 class MongoJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication for MongoDB users.
+
+    MongoUserMiddleware authenticates each request once and leaves the result
+    on the request; DRF picks it up here instead of validating the token again.
+    Verified tokens are cached by signature (see api/token_cache.py).
+    """
+
+    def authenticate(self, request):
+        authenticated = getattr(request._request, 'jwt_auth', None)
+        if authenticated is not None:
+            return authenticated
+        return super().authenticate(request)
+
+    def _verify(self, raw_token):
+        """(validated_token, user), from the cache when the token was verified recently"""
+        cached = token_cache.get(raw_token)
+        if cached is not None:
+            return cached
+        validated_token = super().get_validated_token(raw_token)
+        if token_cache.is_revoked(validated_token):
+            raise InvalidToken('Token has been revoked')
+        user = self.get_user(validated_token)
+        token_cache.set(raw_token, validated_token, user)
+        return validated_token, user
+
+    def get_validated_token(self, raw_token):
+        return self._verify(raw_token)[0]
+
     def get_user(self, validated_token):
         """
         Overridden to handle MongoDB ObjectId user IDs
@@ -14,44 +41,41 @@ class MongoJWTAuthentication(JWTAuthentication):
             user_id = validated_token['user_id']
             if user_id is None:
                 return None
-            
-            # Create a simple user object with the MongoDB ID
-            user = type('MongoUser', (), {
-                'id': user_id,
-                'is_authenticated': True,
-                'is_active': True,
-                'user_id': user_id  # Add user_id as a property of the user object
-            })()
-            
-            return user
+            return MongoUser(user_id)
         except KeyError:
             raise AuthenticationFailed('No user ID in token')
         except Exception as e:
             raise AuthenticationFailed(str(e))
 
+    def authenticate_token(self, raw_token):
+        """(user, validated_token) for a raw token"""
+        validated_token, user = self._verify(raw_token)
+        return user, validated_token
+
 class MongoUserMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        # Stateless, so one instance serves every request
+        self.jwt_auth = MongoJWTAuthentication()
 
     def __call__(self, request):
         # Initialize user_id as None
         request.user_id = None
-        
+        request.jwt_auth = None
+
         # Try to get the JWT token from the Authorization header
         auth_header = request.headers.get('Authorization', '')
         if auth_header.startswith('Bearer '):
             try:
-                # Extract and validate the token
-                jwt_auth = MongoJWTAuthentication()
-                token = auth_header.split(' ')[1]
-                validated_token = jwt_auth.get_validated_token(token)
-                
-                # Set user_id from the token
-                request.user_id = validated_token.get('user_id')
+                # Validate once; DRF reuses request.jwt_auth
+                user, validated_token = self.jwt_auth.authenticate_token(auth_header.split(' ')[1])
+                if user is not None:
+                    request.jwt_auth = (user, validated_token)
+                    request.user_id = user.user_id
             except Exception as e:
                 # Log the error but continue processing the request
                 print(f"Error processing JWT token: {str(e)}")
                 pass
-        
+
         response = self.get_response(request)
-        return response 
\ No newline at end of file
+        return response
@@ -6,17 +6,30 @@ MongoDB Schema Documentation
 
 Collections:
 
-1. transcripts
+1. transcripts (per-user; the text lives in video_transcripts)
 {
     '_id': ObjectId,
     'user_id': str,
     'video_id': str,
+    'video_transcript_id': ObjectId,  # -> video_transcripts._id
     'title': str,
-    'content': str,
+    'content': str,  # legacy documents only, see scripts/migrate_shared_transcripts.py
     'language': str,
     'created_at': datetime,
     'updated_at': datetime,
-    'is_favorite': bool
+    'is_favorite': bool,
+    'question_count': int  # maintained by MongoService.save_question_groups
+}
+
+1a. video_transcripts (one per video and language, shared by all users)
+{
+    '_id': ObjectId,
+    'video_id': str,
+    'language': str,
+    'content': str,
+    'segments': Binary,  # core.segments.SegmentTable: float32 starts/durations + offsets into content
+    'segment_count': int,
+    'created_at': datetime
 }
 
 2. qa_pairs
@@ -31,16 +44,60 @@ Collections:
     'options': list[str],
     'created_at': datetime,
     'attempts': int,
-    'correct_attempts': int
+    'correct_attempts': int,
+    'source': str  # optional: 'playlist' for the precomputed question bank, 'bank' for copies of it
 }
 
-3. user_progress
+3. user_progress (rollups maintained by ProgressService, rebuilt with `manage.py rebuild_progress`)
 {
-    '_id': ObjectId,
+    '_id': str,  # '<user_id>:<transcript_id or *>:<type or *>'
     'user_id': str,
+    'transcript_id': str,  # None for the user's totals
     'video_id': str,
-    'type': str,
-    'answers': dict,
+    'type': str,  # None for totals across types
+    'attempts': int,
+    'correct_attempts': int,
+    'last_attempt_at': datetime,
     'updated_at': datetime
 }
+
+3a. attempt_events (append-only, short keys to keep the log compact)
+{
+    '_id': ObjectId,  # creation time is the attempt time
+    'u': str,  # user_id
+    'q': ObjectId,  # qa_pairs._id
+    't': str,  # transcript_id
+    'v': str,  # video_id
+    'k': str,  # question type
+    'c': bool  # answered correctly
+}
+
+4. qa_jobs
+{
+    '_id': ObjectId,
+    'transcript_id': str,
+    'user_id': str,
+    'question_types': list[str],
+    'status': str,  # queued / running / completed / failed
+    'attempts': int,
+    'worker_id': str,
+    'lease_expires_at': datetime,
+    'question_ids': list[str],
+    'error': str,
+    'created_at': datetime,
+    'updated_at': datetime,
+    'finished_at': datetime
+}
+
+5. qa_cache
+{
+    '_id': str,  # sha256 of (normalized transcript, type, prompt version, model)
+    'qa_pairs': list[dict],
+    'question_type': str,
+    'model': str,
+    'prompt_version': int,
+    'hits': int,
+    'created_at': datetime,
+    'expires_at': datetime  # TTL index
+}
 """
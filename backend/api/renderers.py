@@ -0,0 +1,21 @@
+import json
+from rest_framework.renderers import BaseRenderer
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets views that stream Server-Sent Events accept `Accept: text/event-stream`.
+
+    The events themselves are written by the view's StreamingHttpResponse; this
+    only renders the plain Responses such a view returns before streaming
+    (e.g. 404 or 400), as a single `error` event.
+    """
+
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return f"event: error\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n".encode('utf-8')
@@ -13,7 +13,9 @@ class TranscriptSerializer(serializers.Serializer):
     user_id = serializers.CharField(read_only=True)
     video_id = serializers.CharField()
     title = serializers.CharField(required=False)
-    content = serializers.CharField()
+    # Only the detail endpoint returns content; lists return a short preview instead
+    content = serializers.CharField(required=False)
+    preview = serializers.CharField(required=False, read_only=True)
     language = serializers.CharField()
     created_at = serializers.DateTimeField(read_only=True)
     updated_at = serializers.DateTimeField(read_only=True)
@@ -21,6 +23,10 @@ class TranscriptSerializer(serializers.Serializer):
     questions = serializers.SerializerMethodField()
 
     def get_questions(self, obj):
+        # List views pass every row's questions in the context from one query
+        if 'questions_by_transcript' in self.context:
+            return self.context['questions_by_transcript'].get(str(obj['id']), [])
+
         from api.services.mongo_service import mongo_service
         # Get questions from MongoDB
         questions = list(mongo_service.db.qa_pairs.find({'transcript_id': str(obj['id'])}))
@@ -0,0 +1,229 @@
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from .mongo_service import mongo_service
+from .question_bank import question_bank
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+
+class JobService:
+    """Question generation jobs persisted in the qa_jobs collection"""
+
+    def __init__(self):
+        self.db = mongo_service.db
+        self.lease_seconds = int(os.getenv('QA_JOB_LEASE_SECONDS', '300'))
+        self.max_attempts = int(os.getenv('QA_JOB_MAX_ATTEMPTS', '3'))
+
+    def enqueue_generation(self, transcript_id, user_id, question_types):
+        """Queue a question generation job for one or more question types and return its id"""
+        now = datetime.utcnow()
+        job = {
+            'transcript_id': transcript_id,
+            'user_id': user_id,
+            'question_types': list(question_types),
+            'status': JOB_QUEUED,
+            'attempts': 0,
+            'question_ids': [],
+            'error': None,
+            'created_at': now,
+            'updated_at': now
+        }
+        result = self.db.qa_jobs.insert_one(job)
+        return str(result.inserted_id)
+
+    def get_job(self, job_id, user_id=None):
+        """Get a job by id, optionally scoped to a user; None for unknown or malformed ids"""
+        try:
+            query = {'_id': ObjectId(job_id)}
+        except (InvalidId, TypeError):
+            return None
+        if user_id:
+            query['user_id'] = user_id
+        job = self.db.qa_jobs.find_one(query)
+        if job:
+            job['id'] = str(job.pop('_id'))
+        return job
+
+    def claim_next_job(self, worker_id):
+        """
+        Atomically claim the oldest queued job.
+        Running jobs whose lease expired (crashed worker) are claimed again;
+        each claim gets a new lease_id, so the previous holder can no longer finish the job.
+        """
+        now = datetime.utcnow()
+        return self.db.qa_jobs.find_one_and_update(
+            {
+                '$or': [
+                    {'status': JOB_QUEUED},
+                    {'status': JOB_RUNNING, 'lease_expires_at': {'$lt': now}}
+                ]
+            },
+            {
+                '$set': {
+                    'status': JOB_RUNNING,
+                    'worker_id': worker_id,
+                    'lease_id': ObjectId(),
+                    'started_at': now,
+                    'lease_expires_at': now + timedelta(seconds=self.lease_seconds),
+                    'updated_at': now
+                },
+                '$inc': {'attempts': 1}
+            },
+            sort=[('created_at', 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def _lease_filter(job):
+        """Matches the job only while the claim it was returned by still holds the lease"""
+        return {'_id': job['_id'], 'status': JOB_RUNNING, 'lease_id': job.get('lease_id')}
+
+    def complete_job(self, job, question_ids):
+        """
+        Mark a claimed job as completed with the ids of the created questions.
+        Returns False when the lease was lost to another worker, whose outcome is kept.
+        """
+        now = datetime.utcnow()
+        result = self.db.qa_jobs.update_one(
+            self._lease_filter(job),
+            {
+                '$set': {
+                    'status': JOB_COMPLETED,
+                    'question_ids': question_ids,
+                    'error': None,
+                    'finished_at': now,
+                    'updated_at': now
+                },
+                '$unset': {'lease_expires_at': ''}
+            }
+        )
+        return result.matched_count == 1
+
+    def fail_job(self, job, error):
+        """
+        Requeue a failed job, or mark it failed once it ran out of attempts.
+        Returns False when the lease was lost to another worker.
+        """
+        now = datetime.utcnow()
+        retry = job.get('attempts', 0) < self.max_attempts
+        result = self.db.qa_jobs.update_one(
+            self._lease_filter(job),
+            {
+                '$set': {
+                    'status': JOB_QUEUED if retry else JOB_FAILED,
+                    'error': error,
+                    'updated_at': now
+                },
+                '$unset': {'lease_expires_at': ''}
+            }
+        )
+        return result.matched_count == 1
+
+
+class GenerationWorkerPool:
+    """
+    Pool of worker threads that run queued generation jobs.
+
+    LLM calls are network bound, so threads are enough to keep several
+    requests in flight; run one pool per process next to the web workers.
+    """
+
+    def __init__(self, job_service, qa_service, concurrency=4, poll_interval=1.0):
+        self.job_service = job_service
+        self.qa_service = qa_service
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self.stats = {'completed': 0, 'failed': 0, 'questions': 0, 'lost_leases': 0}
+
+    def start(self):
+        """Start the worker threads"""
+        self._stop.clear()
+        for i in range(self.concurrency):
+            thread = threading.Thread(
+                target=self._work,
+                args=(f"{self.worker_prefix}:{i}",),
+                name=f"qa-worker-{i}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Signal the workers to stop after their current job and wait for them"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _work(self, worker_id):
+        while not self._stop.is_set():
+            try:
+                job = self.job_service.claim_next_job(worker_id)
+            except Exception as e:
+                print(f"Error claiming generation job: {str(e)}")
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            self.run_job(job)
+
+    def run_job(self, job):
+        """Generate and store the questions for a claimed job"""
+        try:
+            transcript = mongo_service.get_transcript(job['transcript_id'], user_id=job.get('user_id'))
+            if not transcript:
+                raise ValueError('Transcript not found')
+
+            created, missing = question_bank.serve(job['transcript_id'], transcript, job['question_types'])
+            if missing:
+                generated = self.qa_service.generate_questions_batch(
+                    text=transcript['content'],
+                    question_types=missing
+                )
+                created += mongo_service.save_generated_questions(
+                    transcript_id=job['transcript_id'],
+                    transcript=transcript,
+                    generated=generated
+                )
+            if not self.job_service.complete_job(job, [q['_id'] for q in created]):
+                print(f"Generation job {job['_id']} was reclaimed by another worker; not marking it completed")
+                with self._lock:
+                    self.stats['lost_leases'] += 1
+                return
+            with self._lock:
+                self.stats['completed'] += 1
+                self.stats['questions'] += len(created)
+        except Exception as e:
+            print(f"Error running generation job {job['_id']}: {str(e)}")
+            owned = self.job_service.fail_job(job, str(e))
+            with self._lock:
+                self.stats['failed' if owned else 'lost_leases'] += 1
+
+    def wait_until_idle(self, timeout=None):
+        """Block until no queued or running jobs are left (used by load tests)"""
+        deadline = time.monotonic() + timeout if timeout else None
+        while deadline is None or time.monotonic() < deadline:
+            pending = self.job_service.db.qa_jobs.count_documents(
+                {'status': {'$in': [JOB_QUEUED, JOB_RUNNING]}}
+            )
+            if pending == 0:
+                return True
+            time.sleep(self.poll_interval)
+        return False
+
+
+# Create singleton instance
+job_service = JobService()
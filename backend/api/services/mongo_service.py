@@ -1,14 +1,73 @@
 import os
+import base64
 import certifi
-from pymongo import MongoClient
+from collections import namedtuple, Counter
+from pymongo import MongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import ConnectionFailure, PyMongoError
 from dotenv import load_dotenv
 from datetime import datetime
 from urllib.parse import quote_plus
 from bson import ObjectId
+from bson.binary import Binary
+from core.lru import LRUCache
+from core.segments import SegmentTable
+from .question_docs import build_question_docs, insert_question_docs
+from .write_behind import AttemptCounterBuffer
 
 # Load environment variables
 load_dotenv()
 
+IndexSpec = namedtuple('IndexSpec', ['collection', 'keys', 'options'])
+HotQuery = namedtuple('HotQuery', ['name', 'collection', 'filter', 'sort'])
+
+# Characters of transcript text returned in place of the content by list endpoints
+PREVIEW_LENGTH = 200
+
+# Every index the app relies on. Applied idempotently by
+# `python manage.py mongo_indexes` (and at startup with MONGODB_ENSURE_INDEXES=True);
+# anything else found in these collections is drift.
+INDEXES = [
+    IndexSpec('users', [('email', 1)], {'unique': True}),
+    IndexSpec('users', [('username', 1)], {'unique': True}),
+    IndexSpec('video_transcripts', [('video_id', 1), ('language', 1)], {'unique': True}),
+    IndexSpec('transcripts', [('user_id', 1), ('created_at', -1), ('_id', -1)], {}),
+    IndexSpec('transcripts', [('user_id', 1), ('video_id', 1)], {}),
+    IndexSpec('qa_pairs', [('transcript_id', 1), ('type', 1)], {}),
+    IndexSpec('qa_pairs', [('video_id', 1), ('type', 1)], {'partialFilterExpression': {'source': 'playlist'}}),
+    IndexSpec('qa_jobs', [('status', 1), ('created_at', 1)], {}),
+    IndexSpec('qa_jobs', [('status', 1), ('lease_expires_at', 1)], {}),
+    IndexSpec('qa_cache', [('expires_at', 1)], {'expireAfterSeconds': 0}),
+    IndexSpec('youtube_videos', [('video_id', 1)], {'unique': True}),
+    IndexSpec('attempt_events', [('u', 1), ('_id', 1)], {}),
+    IndexSpec('user_progress', [('user_id', 1), ('transcript_id', 1), ('type', 1)], {}),
+    IndexSpec('review_cards', [('user_id', 1), ('due_at', 1)], {}),
+    IndexSpec('review_cards', [('user_id', 1), ('question_id', 1)], {'unique': True}),
+]
+
+# Queries on the request path that must be served by an index (checked with explain())
+HOT_QUERIES = [
+    HotQuery('transcripts_by_user', 'transcripts', {'user_id': 'u'}, [('created_at', -1), ('_id', -1)]),
+    HotQuery('transcript_by_user_and_video', 'transcripts', {'user_id': 'u', 'video_id': 'v'}, None),
+    HotQuery('questions_by_transcript', 'qa_pairs', {'transcript_id': 't'}, None),
+    HotQuery('questions_by_transcript_and_type', 'qa_pairs', {'transcript_id': 't', 'type': 'mcq'}, None),
+    HotQuery('bank_questions', 'qa_pairs', {'video_id': 'v', 'source': 'playlist'}, None),
+    HotQuery('video_transcript', 'video_transcripts', {'video_id': 'v', 'language': 'hi'}, None),
+    HotQuery('next_queued_job', 'qa_jobs', {'status': 'queued'}, [('created_at', 1)]),
+    HotQuery('user_by_email', 'users', {'email': 'e'}, None),
+    HotQuery('progress_by_user', 'user_progress', {'user_id': 'u', 'type': None}, None),
+    HotQuery('progress_by_transcript', 'user_progress', {'user_id': 'u', 'transcript_id': 't'}, None),
+    HotQuery('due_reviews', 'review_cards', {'user_id': 'u', 'due_at': {'$lte': datetime(2100, 1, 1)}}, [('due_at', 1)]),
+]
+
+# Options that make two indexes on the same keys different
+_INDEX_OPTIONS = ('unique', 'sparse', 'expireAfterSeconds', 'partialFilterExpression')
+
+
+def index_name(keys):
+    """Default MongoDB index name for a key specification"""
+    return '_'.join(f'{field}_{direction}' for field, direction in keys)
+
+
 class MongoService:
     _instance = None
     _client = None
@@ -21,7 +80,16 @@ class MongoService:
 
     def __init__(self):
         if self._client is None:
+            # question_id -> answer key; questions are immutable once generated
+            self._answer_keys = LRUCache(
+                max_entries=int(os.getenv('ANSWER_KEY_CACHE_SIZE', '20000')),
+                ttl=int(os.getenv('ANSWER_KEY_CACHE_TTL', '3600'))
+            )
             self._connect()
+            # Optional write-behind for attempt counters on hot questions
+            self.attempt_counters = None
+            if os.getenv('ATTEMPT_COUNTERS_WRITE_BEHIND', 'False') == 'True':
+                self.attempt_counters = AttemptCounterBuffer(self._db.qa_pairs).start()
 
     def _connect(self):
         """Connect to MongoDB"""
@@ -53,6 +121,99 @@ class MongoService:
             print(f"Error connecting to MongoDB: {str(e)}")
             raise
 
+    def ensure_indexes(self, collections=None):
+        """
+        Create the registered indexes, optionally only for some collections.
+        Existing identical indexes are a no-op; conflicting ones are reported, not dropped.
+        Returns the names of the indexes that could not be created.
+        """
+        specs = [spec for spec in INDEXES if not collections or spec.collection in collections]
+        failed = []
+        for position, spec in enumerate(specs):
+            name = f"{spec.collection}.{index_name(spec.keys)}"
+            try:
+                self._db[spec.collection].create_index(spec.keys, name=index_name(spec.keys), **spec.options)
+            except ConnectionFailure as e:
+                # Unreachable server: every remaining index would wait out the same timeout
+                print(f"Could not create indexes, MongoDB is unreachable: {str(e)}")
+                failed.extend(f"{rest.collection}.{index_name(rest.keys)}" for rest in specs[position:])
+                break
+            except PyMongoError as e:
+                print(f"Could not create index {name}: {str(e)}")
+                failed.append(name)
+        return failed
+
+    def index_drift(self):
+        """
+        Compare the registry with the indexes that exist in the database.
+        Returns {'missing': [...], 'unexpected': [...], 'mismatched': [...]} of 'collection.index' names.
+        """
+        drift = {'missing': [], 'unexpected': [], 'mismatched': []}
+        for collection in sorted({spec.collection for spec in INDEXES}):
+            existing = self._db[collection].index_information()
+            registered = {index_name(spec.keys): spec for spec in INDEXES if spec.collection == collection}
+
+            for name, spec in registered.items():
+                info = existing.get(name)
+                if info is None:
+                    drift['missing'].append(f"{collection}.{name}")
+                    continue
+                keys = [(field, int(direction)) for field, direction in info['key']]
+                options = {k: info[k] for k in _INDEX_OPTIONS if k in info}
+                if keys != list(spec.keys) or options != spec.options:
+                    drift['mismatched'].append(f"{collection}.{name}")
+
+            for name in existing:
+                if name != '_id_' and name not in registered:
+                    drift['unexpected'].append(f"{collection}.{name}")
+        return drift
+
+    def unused_indexes(self):
+        """
+        Indexes with no recorded use since the server last restarted, from $indexStats.
+        Returns a list of (collection, index name, counting since) tuples.
+        """
+        unused = []
+        for collection in sorted({spec.collection for spec in INDEXES}):
+            for stats in self._db[collection].aggregate([{'$indexStats': {}}]):
+                if stats['name'] != '_id_' and stats['accesses']['ops'] == 0:
+                    unused.append((collection, stats['name'], stats['accesses']['since']))
+        return unused
+
+    def explain_hot_queries(self):
+        """
+        Run explain() for every registered hot query.
+        Returns a list of dicts with the query name, the winning plan's stages and
+        whether it is index-backed (IXSCAN and no COLLSCAN).
+        """
+        results = []
+        for query in HOT_QUERIES:
+            cursor = self._db[query.collection].find(query.filter)
+            if query.sort:
+                cursor = cursor.sort(query.sort)
+            plan = cursor.explain()['queryPlanner']['winningPlan']
+            stages = self._plan_stages(plan)
+            results.append({
+                'name': query.name,
+                'collection': query.collection,
+                'stages': stages,
+                'ok': 'IXSCAN' in stages and 'COLLSCAN' not in stages
+            })
+        return results
+
+    @classmethod
+    def _plan_stages(cls, plan):
+        """Flatten the stage names of an explain() plan tree"""
+        stages = [plan.get('stage')] if plan.get('stage') else []
+        # Slot-based engine plans nest the classic plan under queryPlan
+        if 'queryPlan' in plan:
+            stages += cls._plan_stages(plan['queryPlan'])
+        if 'inputStage' in plan:
+            stages += cls._plan_stages(plan['inputStage'])
+        for child in plan.get('inputStages', []):
+            stages += cls._plan_stages(child)
+        return stages
+
     @property
     def db(self):
         """Get database instance"""
@@ -70,14 +231,195 @@ class MongoService:
         query = {'transcript_id': transcript_id} if transcript_id else {}
         return list(collection.find(query))
 
-    def save_transcript(self, user_id, video_id, content, language='hi'):
-        """Save transcript to MongoDB"""
+    def save_questions(self, transcript_id, video_id, questions, question_type=None, video_title='',
+                       update_counters=False, source=None):
+        """Save questions for one transcript with a single bulk insert"""
+        return self.save_question_groups(
+            [{
+                'transcript_id': transcript_id,
+                'video_id': video_id,
+                'questions': questions,
+                'question_type': question_type,
+                'video_title': video_title,
+                'source': source
+            }],
+            update_counters=update_counters
+        )
+
+    def save_question_groups(self, groups, update_counters=False):
+        """
+        Save several groups of questions (keyword arguments of build_question_docs) with one insert_many.
+        With update_counters, each transcript's question_count is incremented by what was stored.
+        """
+        docs = []
+        for group in groups:
+            docs.extend(build_question_docs(**group))
+        created = insert_question_docs(self._db.qa_pairs, docs)
+        self.prime_answer_keys(created)
+
+        if update_counters and created:
+            counts = Counter(doc['transcript_id'] for doc in created)
+            updates = [
+                UpdateOne({'_id': ObjectId(transcript_id)}, {'$inc': {'question_count': count}})
+                for transcript_id, count in counts.items() if ObjectId.is_valid(transcript_id)
+            ]
+            if updates:
+                self._db.transcripts.bulk_write(updates, ordered=False)
+        return created
+
+    def save_generated_questions(self, transcript_id, transcript, generated, update_counters=True):
+        """Save LLM output ({question_type: [qa_pair, ...]}) for a transcript and return the created documents"""
+        return self.save_question_groups(
+            [
+                {
+                    'transcript_id': transcript_id,
+                    'video_id': transcript['video_id'],
+                    'questions': questions,
+                    'question_type': question_type,
+                    'video_title': transcript.get('title', '')
+                }
+                for question_type, questions in generated.items()
+            ],
+            update_counters=update_counters
+        )
+
+    @staticmethod
+    def _answer_key(question):
+        return {
+            'answer': question.get('answer', ''),
+            'transcript_id': question.get('transcript_id'),
+            'video_id': question.get('video_id'),
+            'type': question.get('type')
+        }
+
+    def prime_answer_keys(self, questions):
+        """Cache the answer keys of questions that were just read or created"""
+        for question in questions:
+            if question.get('_id') and 'answer' in question:
+                self._answer_keys.set(str(question['_id']), self._answer_key(question))
+
+    def get_answer_key(self, question_id):
+        """Get a question's answer, transcript_id, video_id and type, from the in-process cache when possible"""
+        answer_key = self._answer_keys.get(question_id)
+        if answer_key is None:
+            question = self._db.qa_pairs.find_one(
+                {'_id': ObjectId(question_id)},
+                {'answer': 1, 'transcript_id': 1, 'video_id': 1, 'type': 1}
+            )
+            if question is None:
+                return None
+            answer_key = self._answer_key(question)
+            self._answer_keys.set(question_id, answer_key)
+        return answer_key
+
+    @staticmethod
+    def check_answer(answer_key, submitted_answer):
+        """Case-insensitive comparison of a submitted answer with the answer key"""
+        return submitted_answer.strip().lower() == str(answer_key['answer']).strip().lower()
+
+    def record_attempt(self, question_id, submitted_answer, transcript_id=None):
+        """
+        Check an answer and count the attempt.
+        The answer is checked against the cached answer key and the counters are
+        incremented and read back with one find_one_and_update, so a submission
+        for a cached question is a single database round-trip. With write-behind
+        counters enabled the increment is buffered and flushed in batches instead.
+        Returns {'is_correct', 'correct_answer', 'attempts', 'correct_attempts', ...} or None if not found.
+        """
+        answer_key = self.get_answer_key(question_id)
+        if answer_key is None:
+            return None
+        if transcript_id is not None and answer_key['transcript_id'] != transcript_id:
+            return None
+
+        is_correct = self.check_answer(answer_key, submitted_answer)
+        if self.attempt_counters is not None:
+            attempts, correct_attempts = self.attempt_counters.increment(question_id, is_correct)
+            counters = {'attempts': attempts, 'correct_attempts': correct_attempts}
+        else:
+            counters = self._find_and_count(question_id, is_correct)
+        if counters is None:
+            # Question was deleted after its answer key was cached
+            self._answer_keys.delete(question_id)
+            return None
+
+        return {
+            'is_correct': is_correct,
+            'correct_answer': str(answer_key['answer']).strip(),
+            'attempts': counters.get('attempts', 0),
+            'correct_attempts': counters.get('correct_attempts', 0),
+            'transcript_id': answer_key['transcript_id'],
+            'video_id': answer_key['video_id'],
+            'type': answer_key['type']
+        }
+
+    def _find_and_count(self, question_id, is_correct):
+        return self._db.qa_pairs.find_one_and_update(
+            {'_id': ObjectId(question_id)},
+            {'$inc': {'attempts': 1, 'correct_attempts': 1 if is_correct else 0}},
+            projection={'_id': 0, 'attempts': 1, 'correct_attempts': 1},
+            return_document=ReturnDocument.AFTER
+        )
+
+    def save_video_transcript(self, video_id, content, language='hi', segments=None):
+        """
+        Save the canonical transcript of a video, shared by every user.
+        segments is a SegmentTable built from the same fetch as content.
+        Returns the id of the existing document if the video was already stored.
+        """
+        collection = self._db.video_transcripts
+        now = datetime.utcnow()
+        doc = collection.find_one_and_update(
+            {'video_id': video_id, 'language': language},
+            {
+                '$setOnInsert': {
+                    'video_id': video_id,
+                    'language': language,
+                    'content': content,
+                    'segments': Binary(segments.to_bytes()) if segments else None,
+                    'segment_count': len(segments) if segments else 0,
+                    'created_at': now
+                }
+            },
+            projection={'_id': 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return doc['_id']
+
+    def get_video_transcript(self, video_id, languages=('hi', 'en')):
+        """Get the canonical transcript of a video in the first available language"""
+        collection = self._db.video_transcripts
+        docs = {
+            doc['language']: doc
+            for doc in collection.find({'video_id': video_id, 'language': {'$in': list(languages)}})
+        }
+        for language in languages:
+            if language in docs:
+                return docs[language]
+        return None
+
+    @staticmethod
+    def get_segments(video_transcript):
+        """Load the SegmentTable of a video_transcripts document, or None if it has no timings"""
+        segments = video_transcript.get('segments')
+        if not segments:
+            return None
+        if isinstance(segments, list):
+            # Documents written before segments were stored in binary form
+            return SegmentTable.from_entries(segments)
+        return SegmentTable.from_bytes(bytes(segments), video_transcript['content'])
+
+    def save_transcript(self, user_id, video_id, content, language='hi', title=None, segments=None):
+        """Save a user's transcript, storing the text once in video_transcripts"""
         try:
+            video_transcript_id = self.save_video_transcript(video_id, content, language, segments)
             collection = self._db.transcripts
             data = {
                 'user_id': user_id,
                 'video_id': video_id,
-                'content': content,
+                'video_transcript_id': video_transcript_id,
+                'title': title or 'Untitled',
                 'language': language,
                 'created_at': datetime.utcnow(),
                 'updated_at': datetime.utcnow(),
@@ -90,22 +432,83 @@ class MongoService:
             print(f"Error saving transcript to MongoDB: {str(e)}")
             raise
 
+    def _attach_content(self, transcripts):
+        """
+        Fill in 'content' from video_transcripts for per-user documents that only hold a reference.
+        Legacy documents with inline content are left untouched.
+        """
+        refs = {t['video_transcript_id'] for t in transcripts if 'content' not in t and t.get('video_transcript_id')}
+        if refs:
+            contents = {
+                doc['_id']: doc['content']
+                for doc in self._db.video_transcripts.find({'_id': {'$in': list(refs)}}, {'content': 1})
+            }
+            for transcript in transcripts:
+                if 'content' not in transcript and transcript.get('video_transcript_id') in contents:
+                    transcript['content'] = contents[transcript['video_transcript_id']]
+        for transcript in transcripts:
+            transcript['id'] = str(transcript['_id'])
+            if transcript.get('video_transcript_id'):
+                transcript['video_transcript_id'] = str(transcript['video_transcript_id'])
+        return transcripts
+
+    def _attach_previews(self, transcripts):
+        """Fill in 'preview' from video_transcripts for documents that only hold a reference"""
+        refs = {t['video_transcript_id'] for t in transcripts if t.get('preview') is None and t.get('video_transcript_id')}
+        if refs:
+            previews = {
+                doc['_id']: doc['preview']
+                for doc in self._db.video_transcripts.aggregate([
+                    {'$match': {'_id': {'$in': list(refs)}}},
+                    {'$project': {'preview': {'$substrCP': ['$content', 0, PREVIEW_LENGTH]}}}
+                ])
+            }
+            for transcript in transcripts:
+                if transcript.get('preview') is None:
+                    transcript['preview'] = previews.get(transcript.get('video_transcript_id'), '')
+        for transcript in transcripts:
+            transcript['id'] = str(transcript['_id'])
+            if transcript.get('video_transcript_id'):
+                transcript['video_transcript_id'] = str(transcript['video_transcript_id'])
+        return transcripts
+
     def get_transcripts(self, user_id=None):
-        """Get transcripts, optionally filtered by user_id"""
+        """
+        Get transcripts, optionally filtered by user_id, without their content.
+        Each has a short 'preview' of the text instead; get_transcript returns the full content.
+        """
         try:
-            collection = self._db.transcripts
             query = {'user_id': user_id} if user_id else {}
-            transcripts = list(collection.find(query))
-            
-            # Convert ObjectIds to strings
-            for transcript in transcripts:
-                transcript['id'] = str(transcript['_id'])
-            
-            return transcripts
+            transcripts = list(self._db.transcripts.aggregate([
+                {'$match': query},
+                # Legacy documents still hold their content inline
+                {'$addFields': {'preview': {'$cond': [
+                    {'$eq': [{'$type': '$content'}, 'string']},
+                    {'$substrCP': ['$content', 0, PREVIEW_LENGTH]},
+                    None
+                ]}}},
+                {'$project': {'content': 0}}
+            ]))
+            return self._attach_previews(transcripts)
         except Exception as e:
             print(f"Error getting transcripts from MongoDB: {str(e)}")
             raise
 
+    def get_transcript(self, transcript_id, user_id=None):
+        """Get transcript by id, optionally scoped to a user"""
+        try:
+            collection = self._db.transcripts
+            query = {'_id': ObjectId(transcript_id)}
+            if user_id:
+                query['user_id'] = user_id
+            transcript = collection.find_one(query)
+            if transcript:
+                self._attach_content([transcript])
+            return transcript
+        except Exception as e:
+            print(f"Error getting transcript from MongoDB: {str(e)}")
+            raise
+
     def get_transcript_by_user_and_video(self, user_id, video_id):
         """Get transcript by user_id and video_id"""
         try:
@@ -115,12 +518,134 @@ class MongoService:
                 'video_id': video_id
             })
             if transcript:
-                transcript['id'] = str(transcript['_id'])
+                self._attach_content([transcript])
             return transcript
         except Exception as e:
             print(f"Error getting transcript from MongoDB: {str(e)}")
             raise
 
+    @staticmethod
+    def _question_count_stages():
+        """Aggregation stages adding 'question_count' to transcript documents"""
+        return [
+            {
+                '$lookup': {
+                    'from': 'qa_pairs',
+                    'let': {'transcript_id': {'$toString': '$_id'}},
+                    'pipeline': [
+                        {'$match': {'$expr': {'$eq': ['$transcript_id', '$$transcript_id']}}},
+                        {'$count': 'count'}
+                    ],
+                    'as': 'question_counts'
+                }
+            },
+            {
+                '$addFields': {
+                    'question_count': {'$ifNull': [{'$arrayElemAt': ['$question_counts.count', 0]}, 0]}
+                }
+            },
+            {'$project': {'question_counts': 0}}
+        ]
+
+    @staticmethod
+    def _encode_cursor(transcript):
+        """
+        Opaque pagination cursor for the (created_at, _id) sort position of a transcript.
+        Transcripts without created_at sort after all others and are paged by _id alone.
+        """
+        created_at = transcript.get('created_at')
+        raw = f"{created_at.isoformat() if created_at else ''}|{transcript['_id']}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        try:
+            created_at, transcript_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            return datetime.fromisoformat(created_at) if created_at else None, ObjectId(transcript_id)
+        except Exception:
+            raise ValueError('Invalid cursor')
+
+    def list_transcripts_page(self, user_id, limit=20, cursor=None, favorites_only=False):
+        """
+        Get one page of a user's transcripts, newest first, without their content.
+        Pages are keyed on (created_at, _id) so inserts never shift later pages.
+        Returns {'results': [...], 'next_cursor': str or None}.
+        """
+        try:
+            match = {'user_id': user_id}
+            if favorites_only:
+                match['is_favorite'] = True
+            if cursor:
+                created_at, last_id = self._decode_cursor(cursor)
+                if created_at is None:
+                    match['created_at'] = None
+                    match['_id'] = {'$lt': last_id}
+                else:
+                    # Missing created_at sorts lowest, so those transcripts come after every dated one
+                    match['$or'] = [
+                        {'created_at': {'$lt': created_at}},
+                        {'created_at': created_at, '_id': {'$lt': last_id}},
+                        {'created_at': None}
+                    ]
+
+            pipeline = [
+                {'$match': match},
+                {'$sort': {'created_at': -1, '_id': -1}},
+                {'$limit': limit + 1},
+                {'$project': {'content': 0}},
+                *self._question_count_stages()
+            ]
+            transcripts = list(self._db.transcripts.aggregate(pipeline))
+
+            has_more = len(transcripts) > limit
+            transcripts = transcripts[:limit]
+            next_cursor = self._encode_cursor(transcripts[-1]) if has_more else None
+            for transcript in transcripts:
+                transcript['id'] = str(transcript.pop('_id'))
+                if transcript.get('video_transcript_id'):
+                    transcript['video_transcript_id'] = str(transcript['video_transcript_id'])
+            return {'results': transcripts, 'next_cursor': next_cursor}
+        except ValueError:
+            raise
+        except Exception as e:
+            print(f"Error listing transcripts from MongoDB: {str(e)}")
+            raise
+
+    def get_questions_by_transcript(self, transcript_ids):
+        """Get the questions of several transcripts in one query, grouped by transcript_id"""
+        grouped = {transcript_id: [] for transcript_id in transcript_ids}
+        for question in self._db.qa_pairs.find({'transcript_id': {'$in': list(transcript_ids)}}):
+            question['_id'] = str(question['_id'])
+            grouped.setdefault(question['transcript_id'], []).append(question)
+        return grouped
+
+    def get_practice_sets(self, user_id):
+        """
+        Get the user's transcripts that have questions, with their question counts.
+        One aggregation: the $lookup counts matching qa_pairs through the
+        transcript_id index instead of loading every question document.
+        """
+        try:
+            pipeline = [
+                {'$match': {'user_id': user_id}},
+                {'$project': {'title': 1, 'video_id': 1}},
+                *self._question_count_stages(),
+                {
+                    '$project': {
+                        '_id': 0,
+                        'id': {'$toString': '$_id'},
+                        'title': {'$ifNull': ['$title', 'Untitled']},
+                        'video_id': 1,
+                        'question_count': 1
+                    }
+                },
+                {'$match': {'question_count': {'$gt': 0}}}
+            ]
+            return list(self._db.transcripts.aggregate(pipeline))
+        except Exception as e:
+            print(f"Error getting practice sets from MongoDB: {str(e)}")
+            raise
+
     def toggle_transcript_favorite(self, transcript_id, user_id):
         """Toggle favorite status of a transcript"""
         try:
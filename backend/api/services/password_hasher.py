@@ -0,0 +1,207 @@
+import os
+import atexit
+import threading
+import time
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from django.contrib.auth.hashers import check_password, make_password
+
+
+class HashQueueFull(Exception):
+    """Raised when too many hashes are already waiting for the pool, or it cannot run them"""
+
+
+class HashRateLimited(Exception):
+    """Raised when one client or account already has too many hashes in flight"""
+
+
+def _init_worker():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+    import django
+    django.setup()
+
+
+def _check(password, encoded):
+    """(valid, upgraded hash or None); runs in a pool process"""
+    upgraded = []
+    valid = check_password(password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return valid, upgraded[0] if upgraded else None
+
+
+def _make(password):
+    return make_password(password)
+
+
+class PasswordHasher:
+    """
+    Password hashing off the request thread.
+
+    Hashes run on a small process pool, so a burst of logins queues instead of
+    pinning every web worker's CPU. At most PASSWORD_HASH_MAX_QUEUE hashes may
+    be queued or running per web process; more wait up to
+    PASSWORD_HASH_QUEUE_TIMEOUT seconds and are then rejected. Each client IP
+    and each email may only have a few hashes in flight at once. With
+    PASSWORD_HASH_WORKERS=0 hashing runs inline, as before.
+    """
+
+    def __init__(self):
+        self.workers = int(os.getenv('PASSWORD_HASH_WORKERS', '1'))
+        self.max_queue = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', '32'))
+        self.queue_timeout = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', '5'))
+        self.per_ip = int(os.getenv('PASSWORD_HASH_PER_IP', '4'))
+        self.per_email = int(os.getenv('PASSWORD_HASH_PER_EMAIL', '2'))
+        self._slots = threading.BoundedSemaphore(self.max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = Counter()
+        self._stats = {
+            'hashes': 0,
+            'upgraded': 0,
+            'rejected_queue_full': 0,
+            'rejected_rate_limited': 0,
+            'pool_restarts': 0,
+            'waiting': 0,
+            'queued': 0,
+            'max_queued': 0,
+            'total_wait_ms': 0.0,
+            'total_hash_ms': 0.0
+        }
+
+    def _pool(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # Spawned processes share no threads or sockets with the web worker
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker
+                    )
+                    atexit.register(self.shutdown)
+        return self._executor
+
+    def _replace_pool(self, broken):
+        """Drop a pool whose worker process died; the next hash starts a new one"""
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+                self._stats['pool_restarts'] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, args):
+        # A pool process killed mid-hash (e.g. by the OOM killer) breaks the whole executor
+        for _ in range(2):
+            executor = self._pool()
+            try:
+                return executor.submit(_timed, fn, *args).result()
+            except BrokenProcessPool as e:
+                print(f"Password hashing pool broke, restarting it: {str(e)}")
+                self._replace_pool(executor)
+        raise HashQueueFull('Sign-in is temporarily unavailable, try again shortly')
+
+    def _acquire_keys(self, keys):
+        with self._lock:
+            for key in keys:
+                limit = self.per_ip if key.startswith('ip:') else self.per_email
+                if self._in_flight[key] >= limit:
+                    self._stats['rejected_rate_limited'] += 1
+                    raise HashRateLimited('Too many concurrent sign-in attempts, try again shortly')
+            for key in keys:
+                self._in_flight[key] += 1
+
+    def _release_keys(self, keys):
+        with self._lock:
+            for key in keys:
+                self._in_flight[key] -= 1
+                if self._in_flight[key] <= 0:
+                    del self._in_flight[key]
+
+    def _run(self, fn, args, keys):
+        keys = [key for key in keys if key]
+        self._acquire_keys(keys)
+        try:
+            if self.workers <= 0:
+                started = time.monotonic()
+                result = fn(*args)
+                self._record(0.0, time.monotonic() - started)
+                return result
+
+            queued_at = time.monotonic()
+            with self._lock:
+                self._stats['waiting'] += 1
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+            with self._lock:
+                self._stats['waiting'] -= 1
+                if not acquired:
+                    self._stats['rejected_queue_full'] += 1
+            if not acquired:
+                raise HashQueueFull('Sign-in is busy, try again shortly')
+            with self._lock:
+                self._stats['queued'] += 1
+                self._stats['max_queued'] = max(self._stats['max_queued'], self._stats['queued'])
+            try:
+                result, hash_seconds = self._submit(fn, args)
+                self._record(time.monotonic() - queued_at - hash_seconds, hash_seconds)
+                return result
+            finally:
+                with self._lock:
+                    self._stats['queued'] -= 1
+                self._slots.release()
+        finally:
+            self._release_keys(keys)
+
+    def _record(self, wait_seconds, hash_seconds):
+        with self._lock:
+            self._stats['hashes'] += 1
+            self._stats['total_wait_ms'] += max(0.0, wait_seconds) * 1000
+            self._stats['total_hash_ms'] += hash_seconds * 1000
+
+    def check(self, password, encoded, email=None, client_ip=None):
+        """
+        Verify a password against a stored hash
+        Returns:
+            tuple: (valid, new hash to store or None when the stored one is current)
+        """
+        valid, upgraded = self._run(_check, (password, encoded), [
+            f'ip:{client_ip}' if client_ip else None,
+            f'email:{email.lower()}' if email else None
+        ])
+        if upgraded:
+            with self._lock:
+                self._stats['upgraded'] += 1
+        return valid, upgraded
+
+    def make(self, password, email=None, client_ip=None):
+        """Hash a new password"""
+        return self._run(_make, (password,), [
+            f'ip:{client_ip}' if client_ip else None,
+            f'email:{email.lower()}' if email else None
+        ])
+
+    def stats(self):
+        """Counters, queue depth (queued: submitted to the pool, waiting: for a slot) and average times in milliseconds"""
+        with self._lock:
+            stats = dict(self._stats)
+        hashes = stats['hashes']
+        stats['avg_wait_ms'] = stats.pop('total_wait_ms') / hashes if hashes else 0.0
+        stats['avg_hash_ms'] = stats.pop('total_hash_ms') / hashes if hashes else 0.0
+        stats['workers'] = self.workers
+        stats['max_queue'] = self.max_queue
+        return stats
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _timed(fn, *args):
+    started = time.monotonic()
+    result = fn(*args)
+    return result, time.monotonic() - started
+
+
+# Create a singleton instance
+password_hasher = PasswordHasher()
@@ -0,0 +1,200 @@
+import os
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne, ReplaceOne
+from .mongo_service import mongo_service
+from .write_behind import AttemptEventBuffer, ProgressRollupBuffer
+
+# Placeholder for "all transcripts" / "all types" in rollup ids
+ALL = '*'
+REBUILD_BATCH_SIZE = 1000
+
+
+def rollup_id(user_id, transcript_id=None, question_type=None):
+    """Deterministic _id of a user_progress rollup document"""
+    return f"{user_id}:{transcript_id or ALL}:{question_type or ALL}"
+
+
+def rollup_scopes(transcript_id, video_id, question_type):
+    """The (transcript_id, video_id, type) scopes one attempt counts towards"""
+    return [
+        (None, None, None),
+        (transcript_id, video_id, None),
+        (transcript_id, video_id, question_type)
+    ]
+
+
+class ProgressService:
+    """
+    Per-user answer history.
+
+    Every attempt is appended to the compact attempt_events collection and
+    added to three user_progress rollups: the user's totals, the transcript
+    totals and the transcript/type totals. Progress pages read rollups by
+    key instead of scanning attempts; rebuild() recomputes them from events.
+    Both writes are queued and written in batches by background threads
+    (PROGRESS_WRITE_BEHIND, on by default), so answering stays one round-trip;
+    progress pages may lag by up to PROGRESS_FLUSH_SECONDS.
+    """
+
+    def __init__(self):
+        self.db = mongo_service.db
+        self.events = None
+        self.rollups = None
+        if os.getenv('PROGRESS_WRITE_BEHIND', 'True') == 'True':
+            self.events = AttemptEventBuffer(self.db.attempt_events).start()
+            self.rollups = ProgressRollupBuffer(self.db.user_progress).start()
+
+    def record_attempt(self, user_id, question_id, result):
+        """Record an attempt returned by MongoService.record_attempt"""
+        try:
+            now = datetime.utcnow()
+            event = {
+                'u': user_id,
+                'q': ObjectId(question_id),
+                't': result['transcript_id'],
+                'v': result['video_id'],
+                'k': result['type'],
+                'c': result['is_correct']
+            }
+            correct = 1 if result['is_correct'] else 0
+            scopes = rollup_scopes(result['transcript_id'], result['video_id'], result['type'])
+
+            if self.events is not None:
+                self.events.add(ObjectId(), event)
+                for transcript_id, video_id, question_type in scopes:
+                    self.rollups.add(rollup_id(user_id, transcript_id, question_type), {
+                        'attempts': 1,
+                        'correct_attempts': correct,
+                        'last_attempt_at': now,
+                        'scope': {
+                            'user_id': user_id,
+                            'transcript_id': transcript_id,
+                            'video_id': video_id,
+                            'type': question_type
+                        }
+                    })
+                return True
+
+            self.db.attempt_events.insert_one(event)
+            updates = []
+            for transcript_id, video_id, question_type in scopes:
+                updates.append(UpdateOne(
+                    {'_id': rollup_id(user_id, transcript_id, question_type)},
+                    {
+                        '$inc': {'attempts': 1, 'correct_attempts': correct},
+                        '$set': {'last_attempt_at': now, 'updated_at': now},
+                        '$setOnInsert': {
+                            'user_id': user_id,
+                            'transcript_id': transcript_id,
+                            'video_id': video_id,
+                            'type': question_type
+                        }
+                    },
+                    upsert=True
+                ))
+            self.db.user_progress.bulk_write(updates, ordered=False)
+            return True
+        except Exception as e:
+            print(f"Error recording progress: {str(e)}")
+            return False
+
+    def flush(self):
+        """Write queued attempts now"""
+        if self.events is not None:
+            self.events.flush()
+            self.rollups.flush()
+
+    @staticmethod
+    def _format(doc):
+        attempts = doc.get('attempts', 0)
+        return {
+            'transcript_id': doc.get('transcript_id'),
+            'video_id': doc.get('video_id'),
+            'type': doc.get('type'),
+            'attempts': attempts,
+            'correct_attempts': doc.get('correct_attempts', 0),
+            'accuracy': round(doc.get('correct_attempts', 0) / attempts, 3) if attempts else 0.0,
+            'last_attempt_at': doc.get('last_attempt_at')
+        }
+
+    def get_progress(self, user_id, transcript_id=None):
+        """
+        Get a user's totals plus either every transcript's totals or,
+        with transcript_id, that transcript's per-type totals
+        """
+        if transcript_id:
+            query, total_field = {'user_id': user_id, 'transcript_id': transcript_id}, 'type'
+        else:
+            query, total_field = {'user_id': user_id, 'type': None}, 'transcript_id'
+
+        total = None
+        items = []
+        for doc in self.db.user_progress.find(query):
+            if doc[total_field] is None:
+                total = self._format(doc)
+            else:
+                items.append(self._format(doc))
+
+        if transcript_id:
+            return {'transcript': total, 'types': items}
+        return {'summary': total, 'transcripts': items}
+
+    def rebuild(self, user_id=None):
+        """
+        Recompute user_progress from attempt_events, for one user or everyone.
+        Attempts recorded while the rebuild runs may be overwritten; run it when idle.
+        Returns the number of rollup documents written.
+        """
+        self.flush()
+        match = {'u': user_id} if user_id else {}
+        pipeline = [
+            {'$match': match},
+            {'$group': {
+                '_id': {'u': '$u', 't': '$t', 'k': '$k'},
+                'v': {'$first': '$v'},
+                'attempts': {'$sum': 1},
+                'correct_attempts': {'$sum': {'$cond': ['$c', 1, 0]}},
+                'last_id': {'$max': '$_id'}
+            }}
+        ]
+
+        rollups = {}
+        for group in self.db.attempt_events.aggregate(pipeline, allowDiskUse=True):
+            key = group['_id']
+            last_attempt_at = group['last_id'].generation_time.replace(tzinfo=None)
+            for transcript_id, video_id, question_type in rollup_scopes(key['t'], group['v'], key['k']):
+                _id = rollup_id(key['u'], transcript_id, question_type)
+                rollup = rollups.setdefault(_id, {
+                    '_id': _id,
+                    'user_id': key['u'],
+                    'transcript_id': transcript_id,
+                    'video_id': video_id,
+                    'type': question_type,
+                    'attempts': 0,
+                    'correct_attempts': 0,
+                    'last_attempt_at': last_attempt_at
+                })
+                rollup['attempts'] += group['attempts']
+                rollup['correct_attempts'] += group['correct_attempts']
+                rollup['last_attempt_at'] = max(rollup['last_attempt_at'], last_attempt_at)
+
+        # Rollups with no remaining events are removed
+        self.db.user_progress.delete_many({'user_id': user_id} if user_id else {})
+
+        now = datetime.utcnow()
+        written = 0
+        batch = []
+        for rollup in rollups.values():
+            rollup['updated_at'] = now
+            batch.append(ReplaceOne({'_id': rollup['_id']}, rollup, upsert=True))
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                written += self.db.user_progress.bulk_write(batch, ordered=False).upserted_count
+                batch = []
+        if batch:
+            written += self.db.user_progress.bulk_write(batch, ordered=False).upserted_count
+        return written
+
+
+# Create a singleton instance
+progress_service = ProgressService()
@@ -1,5 +1,6 @@
 import json
 from qa_engine.qa_model import qa_model
+from qa_engine.backends import get_backend
 from typing import Dict, List, Optional, Union
 
 class QAService:
@@ -35,6 +36,47 @@ class QAService:
             print(f"Error in QA service: {str(e)}")
             raise ValueError(f"Failed to generate questions: {str(e)}")
 
+    def generate_questions_batch(self, text, question_types):
+        """
+        Generate several question types in one model round-trip
+        Args:
+            text (str): The text to generate questions from
+            question_types (list): Types of questions to generate (novice/mcq/fill_blanks)
+        Returns:
+            dict: Mapping of question type to its list of question dictionaries
+        """
+        try:
+            return self.qa_model.generate_questions_batch(text, [t.lower() for t in question_types])
+        except Exception as e:
+            print(f"Error in QA service: {str(e)}")
+            raise ValueError(f"Failed to generate questions: {str(e)}")
+
+    def stream_questions(self, text, question_types):
+        """
+        Generate questions, yielding each one as soon as the model has written it
+        Args:
+            text (str): The text to generate questions from
+            question_types (list): Types of questions to generate (novice/mcq/fill_blanks)
+        Yields:
+            tuple: (question_type, question dictionary)
+        """
+        return self.qa_model.stream_questions(text, [t.lower() for t in question_types])
+
+    @property
+    def backend(self):
+        """The LLM backend questions are generated with"""
+        return self.qa_model.backend
+
+    def use_backend(self, backend):
+        """
+        Switch the LLM backend
+        Args:
+            backend (LLMBackend | str): Backend instance or name (deepseek/openai/fake)
+        """
+        if isinstance(backend, str):
+            backend = get_backend(backend)
+        self.qa_model.use_backend(backend)
+
     def answer_question(self, context, question):
         """
         Answer a question based on the context
@@ -0,0 +1,174 @@
+import os
+import threading
+from bson import ObjectId
+from pymongo import UpdateMany
+from core.lru import LRUCache
+from .mongo_service import mongo_service
+
+# qa_pairs.source of the precomputed playlist questions, and of their copies in user transcripts
+BANK_SOURCE = 'playlist'
+COPY_SOURCE = 'bank'
+BACKFILL_BATCH_SIZE = 500
+
+
+class QuestionBank:
+    """
+    Questions pre-generated for the curated playlist by scripts/auto_generate_qa.py
+    and scripts/generate_dataset.py.
+
+    When a user adds one of those videos, the banked questions of the requested
+    types are copied to the user's transcript with one bulk insert and only the
+    missing types go to the LLM. A video's bank (or its absence) is cached in
+    process, so videos outside the playlist cost one indexed query per TTL.
+    """
+
+    def __init__(self):
+        self.db = mongo_service.db
+        self.enabled = os.getenv('QUESTION_BANK_ENABLED', 'True') == 'True'
+        self._videos = LRUCache(
+            max_entries=int(os.getenv('QUESTION_BANK_CACHE_SIZE', '2000')),
+            ttl=int(os.getenv('QUESTION_BANK_CACHE_TTL', '600'))
+        )
+        # Hit rates are logged every this many lookups (0 turns the log line off)
+        self.log_every = int(os.getenv('QUESTION_BANK_LOG_EVERY', '100'))
+        self._lock = threading.Lock()
+        self._stats = {
+            'lookups': 0,
+            'hits': 0,
+            'partial_hits': 0,
+            'misses': 0,
+            'types_requested': 0,
+            'types_served': 0,
+            'questions_served': 0
+        }
+
+    def _video_bank(self, video_id):
+        """All banked questions of a video by type ({} when it is not in the playlist)"""
+        bank = self._videos.get(video_id)
+        if bank is None:
+            bank = {}
+            for doc in self.db.qa_pairs.find(
+                    {'video_id': video_id, 'source': BANK_SOURCE},
+                    {'question_text': 1, 'answer': 1, 'options': 1, 'type': 1}):
+                bank.setdefault(doc['type'], []).append(doc)
+            self._videos.set(video_id, bank)
+        return bank
+
+    def lookup(self, video_id, question_types):
+        """
+        Banked questions for the requested types
+        Returns:
+            dict: {question_type: [qa_pair, ...]} for the types the bank has
+        """
+        question_types = list(dict.fromkeys(question_types))
+        found = {}
+        if self.enabled and video_id:
+            try:
+                bank = self._video_bank(video_id)
+                found = {t: bank[t] for t in question_types if bank.get(t)}
+            except Exception as e:
+                print(f"Error reading question bank for video {video_id}: {str(e)}")
+
+        with self._lock:
+            stats = self._stats
+            stats['lookups'] += 1
+            stats['types_requested'] += len(question_types)
+            stats['types_served'] += len(found)
+            stats['questions_served'] += sum(len(pairs) for pairs in found.values())
+            if not found:
+                stats['misses'] += 1
+            elif len(found) < len(question_types):
+                stats['partial_hits'] += 1
+            else:
+                stats['hits'] += 1
+            log_now = self.log_every and stats['lookups'] % self.log_every == 0
+        if log_now:
+            stats = self.stats()
+            print(
+                f"Question bank: {stats['lookups']} lookups, hit rate {stats['hit_rate']:.1%}, "
+                f"type hit rate {stats['type_hit_rate']:.1%}, {stats['questions_served']} questions served"
+            )
+        return found
+
+    def serve(self, transcript_id, transcript, question_types):
+        """
+        Copy banked questions to a user's transcript
+        Returns:
+            tuple: (created question documents, question types still to generate)
+        """
+        found = self.lookup(transcript.get('video_id'), question_types)
+        created = []
+        if found:
+            created = mongo_service.save_question_groups(
+                [
+                    {
+                        'transcript_id': transcript_id,
+                        'video_id': transcript['video_id'],
+                        'questions': pairs,
+                        'question_type': question_type,
+                        'video_title': transcript.get('title', ''),
+                        'source': COPY_SOURCE
+                    }
+                    for question_type, pairs in found.items()
+                ],
+                update_counters=True
+            )
+        missing = [t for t in dict.fromkeys(question_types) if t not in found]
+        return created, missing
+
+    def invalidate(self, video_id=None):
+        """Forget cached banks, e.g. after the ingestion scripts added videos"""
+        if video_id is None:
+            self._videos.clear()
+        else:
+            self._videos.delete(video_id)
+
+    def backfill(self):
+        """
+        Mark the questions of playlist transcripts (those without a user) as banked.
+        Returns the number of questions marked.
+        """
+        transcript_ids = [
+            str(doc['_id']) for doc in self.db.transcripts.find({'user_id': {'$exists': False}}, {'_id': 1})
+        ]
+        marked = 0
+        for i in range(0, len(transcript_ids), BACKFILL_BATCH_SIZE):
+            batch = transcript_ids[i:i + BACKFILL_BATCH_SIZE]
+            # Questions may reference their transcript by string or by ObjectId
+            batch += [ObjectId(transcript_id) for transcript_id in batch]
+            result = self.db.qa_pairs.bulk_write([UpdateMany(
+                {'transcript_id': {'$in': batch}, 'source': {'$exists': False}},
+                {'$set': {'source': BANK_SOURCE}}
+            )])
+            marked += result.modified_count
+        self.invalidate()
+        return marked
+
+    def coverage(self):
+        """Banked videos and questions per type"""
+        by_type = {
+            row['_id']: row['questions']
+            for row in self.db.qa_pairs.aggregate([
+                {'$match': {'source': BANK_SOURCE}},
+                {'$group': {'_id': '$type', 'questions': {'$sum': 1}}}
+            ])
+        }
+        return {
+            'videos': len(self.db.qa_pairs.distinct('video_id', {'source': BANK_SOURCE})),
+            'questions': by_type
+        }
+
+    def stats(self):
+        """Lookup counters with the video hit rate and the share of requested types served"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['hit_rate'] = round((stats['hits'] + stats['partial_hits']) / stats['lookups'], 4) if stats['lookups'] else 0.0
+        stats['type_hit_rate'] = (
+            round(stats['types_served'] / stats['types_requested'], 4) if stats['types_requested'] else 0.0
+        )
+        stats['cache'] = self._videos.stats()
+        return stats
+
+
+# Create a singleton instance
+question_bank = QuestionBank()
@@ -0,0 +1,60 @@
+from datetime import datetime
+from pymongo.errors import BulkWriteError
+
+
+def build_question_docs(transcript_id, video_id, questions, question_type=None, video_title='', source=None):
+    """
+    Validate and normalize LLM output into qa_pairs documents (schema in api/models.py).
+    Pairs without question text or answer are dropped; 'question' and 'question_text' are both accepted.
+    `source` marks where the questions came from ('playlist' for the precomputed bank, 'bank' for copies of it).
+    """
+    now = datetime.utcnow()
+    docs = []
+    for q in questions or []:
+        if not isinstance(q, dict):
+            continue
+        question_text = str(q.get('question_text') or q.get('question') or '').strip()
+        answer = str(q.get('answer') or '').strip()
+        if not question_text or not answer:
+            continue
+
+        options = q.get('options') or []
+        if not isinstance(options, list):
+            options = []
+        options = [str(option).strip() for option in options if str(option).strip()]
+
+        docs.append({
+            'transcript_id': str(transcript_id),
+            'video_id': video_id,
+            'video_title': video_title or '',
+            'question_text': question_text,
+            'answer': answer,
+            'type': question_type or q.get('type') or 'novice',
+            'options': options,
+            'created_at': now,
+            'attempts': 0,
+            'correct_attempts': 0
+        })
+        if source:
+            docs[-1]['source'] = source
+    return docs
+
+
+def insert_question_docs(collection, docs):
+    """
+    Write qa_pairs documents with one unordered insert_many.
+    Returns the documents that were stored, with '_id' as a string.
+    """
+    if not docs:
+        return []
+    failed = set()
+    try:
+        collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        # Unordered inserts keep going past a bad document; drop only the failures
+        failed = {error['index'] for error in e.details.get('writeErrors', [])}
+        print(f"Failed to insert {len(failed)} of {len(docs)} questions")
+    created = [doc for i, doc in enumerate(docs) if i not in failed]
+    for doc in created:
+        doc['_id'] = str(doc['_id'])
+    return created
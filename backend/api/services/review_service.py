@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import UpdateOne
+from core.srs import INITIAL_EASE, sm2_review_bulk
+from .mongo_service import mongo_service
+
+# Grades used when a review is an answer submission rather than a self-rating
+CORRECT_QUALITY = 4
+INCORRECT_QUALITY = 1
+WRITE_BATCH_SIZE = 1000
+
+
+class ReviewService:
+    """
+    Spaced-repetition review scheduling (SM-2) over qa_pairs.
+
+    Each user has one review_cards document per question they study, holding
+    its ease, interval and due_at. The next reviews are a range scan on the
+    (user_id, due_at) index, and grading many cards at once runs the SM-2
+    update over numpy arrays.
+    """
+
+    def __init__(self):
+        self.db = mongo_service.db
+
+    def add_deck(self, user_id, transcript_id, question_type=None):
+        """
+        Create cards, due now, for a transcript's questions the user is not studying yet.
+        Returns the number of new cards.
+        """
+        query = {'transcript_id': transcript_id}
+        if question_type:
+            query['type'] = question_type
+        now = datetime.utcnow()
+
+        created = 0
+        updates = []
+        for question in self.db.qa_pairs.find(query, {'transcript_id': 1, 'type': 1}):
+            updates.append(UpdateOne(
+                {'user_id': user_id, 'question_id': question['_id']},
+                {'$setOnInsert': {
+                    'transcript_id': question['transcript_id'],
+                    'type': question.get('type'),
+                    'ease': INITIAL_EASE,
+                    'interval': 0.0,
+                    'reps': 0,
+                    'lapses': 0,
+                    'due_at': now,
+                    'last_reviewed_at': None,
+                    'created_at': now
+                }},
+                upsert=True
+            ))
+            if len(updates) >= WRITE_BATCH_SIZE:
+                created += self.db.review_cards.bulk_write(updates, ordered=False).upserted_count
+                updates = []
+        if updates:
+            created += self.db.review_cards.bulk_write(updates, ordered=False).upserted_count
+        return created
+
+    def due_cards(self, user_id, limit=20, now=None):
+        """Get the user's next `limit` due cards, oldest due first, with their questions"""
+        cards = list(self.db.review_cards.find(
+            {'user_id': user_id, 'due_at': {'$lte': now or datetime.utcnow()}}
+        ).sort('due_at', 1).limit(limit))
+        if not cards:
+            return []
+
+        questions = {
+            question['_id']: question
+            for question in self.db.qa_pairs.find(
+                {'_id': {'$in': [card['question_id'] for card in cards]}},
+                {'question_text': 1, 'options': 1, 'type': 1, 'transcript_id': 1, 'video_title': 1}
+            )
+        }
+
+        due = []
+        for card in cards:
+            question = questions.get(card['question_id'])
+            if question is None:
+                continue
+            question['_id'] = str(question['_id'])
+            due.append({
+                'question': question,
+                'due_at': card['due_at'],
+                'interval': card['interval'],
+                'reps': card['reps'],
+                'lapses': card['lapses']
+            })
+        return due
+
+    def review(self, user_id, reviews, now=None):
+        """
+        Grade cards and reschedule them.
+
+        Args:
+            user_id (str): Reviewing user
+            reviews (list): (question_id, quality) pairs, quality from 0 to 5
+
+        Returns:
+            dict: question_id -> {'interval', 'due_at', 'reps', 'lapses'} for graded cards
+        """
+        now = now or datetime.utcnow()
+        qualities = {}
+        for question_id, quality in reviews:
+            qualities[ObjectId(question_id)] = min(5, max(0, int(quality)))
+
+        cards = list(self.db.review_cards.find(
+            {'user_id': user_id, 'question_id': {'$in': list(qualities)}},
+            {'question_id': 1, 'ease': 1, 'interval': 1, 'reps': 1, 'lapses': 1}
+        ))
+        if not cards:
+            return {}
+        return self._reschedule(cards, [qualities[card['question_id']] for card in cards], now)
+
+    def review_deck(self, user_id, quality, transcript_id=None, now=None):
+        """
+        Grade every card of a deck (or all the user's cards) with the same quality,
+        e.g. to reset a deck with quality 0. Returns the number of cards rescheduled.
+        """
+        query = {'user_id': user_id}
+        if transcript_id:
+            query['transcript_id'] = transcript_id
+        cards = list(self.db.review_cards.find(
+            query, {'question_id': 1, 'ease': 1, 'interval': 1, 'reps': 1, 'lapses': 1}
+        ))
+        if not cards:
+            return 0
+        return len(self._reschedule(cards, [quality] * len(cards), now or datetime.utcnow()))
+
+    def _reschedule(self, cards, qualities, now):
+        ease, interval, reps, lapsed = sm2_review_bulk(
+            [card['ease'] for card in cards],
+            [card['interval'] for card in cards],
+            [card['reps'] for card in cards],
+            qualities
+        )
+
+        scheduled = {}
+        updates = []
+        for i, card in enumerate(cards):
+            lapses = card.get('lapses', 0) + int(lapsed[i])
+            due_at = now + timedelta(days=float(interval[i]))
+            updates.append(UpdateOne(
+                {'_id': card['_id']},
+                {'$set': {
+                    'ease': float(ease[i]),
+                    'interval': float(interval[i]),
+                    'reps': int(reps[i]),
+                    'lapses': lapses,
+                    'due_at': due_at,
+                    'last_reviewed_at': now
+                }}
+            ))
+            scheduled[str(card['question_id'])] = {
+                'interval': float(interval[i]),
+                'due_at': due_at,
+                'reps': int(reps[i]),
+                'lapses': lapses
+            }
+            if len(updates) >= WRITE_BATCH_SIZE:
+                self.db.review_cards.bulk_write(updates, ordered=False)
+                updates = []
+        if updates:
+            self.db.review_cards.bulk_write(updates, ordered=False)
+        return scheduled
+
+
+# Create a singleton instance
+review_service = ReviewService()
@@ -1,24 +1,32 @@
+import os
 from datetime import datetime
 from bson import ObjectId
-from django.contrib.auth.hashers import make_password, check_password
+from pymongo.errors import DuplicateKeyError
 from .mongo_service import mongo_service
+from .password_hasher import password_hasher
+from .write_behind import LastLoginBuffer
+
+# Fields the login flow needs; the rest of the user document stays on the server
+LOGIN_FIELDS = {'email': 1, 'password': 1, 'first_name': 1, 'last_name': 1}
+
+
+class DuplicateUserError(Exception):
+    """Raised when signing up with an email that is already registered"""
+
 
 class UserService:
     def __init__(self):
         self.db = mongo_service.db
-        self._ensure_indexes()
+        # Logins queue last_login and a background thread writes it in batches
+        self.last_logins = None
+        if os.getenv('LAST_LOGIN_WRITE_BEHIND', 'True') == 'True':
+            self.last_logins = LastLoginBuffer(self.db.users).start()
 
-    def _ensure_indexes(self):
-        """Create necessary indexes for the users collection"""
-        self.db.users.create_index('email', unique=True)
-        self.db.users.create_index('username', unique=True)
-
-    def create_user(self, email, password, first_name='', last_name=''):
+    def create_user(self, email, password, first_name='', last_name='', client_ip=None):
         """Create a new user in MongoDB"""
+        # Hash the password on the hashing pool (may raise HashQueueFull / HashRateLimited)
+        hashed_password = password_hasher.make(password, email=email, client_ip=client_ip)
         try:
-            # Hash the password
-            hashed_password = make_password(password)
-            
             # Create user document
             user_doc = {
                 'email': email,
@@ -31,31 +39,43 @@ class UserService:
                 'last_login': None
             }
             
-            # Insert into MongoDB
+            # One round-trip: the unique email index rejects duplicates
             result = self.db.users.insert_one(user_doc)
+            user_doc['id'] = str(result.inserted_id)  # Add id field for JWT
             
-            # Get the created user
-            user = self.db.users.find_one({'_id': result.inserted_id})
-            user['id'] = str(user['_id'])  # Add id field for JWT
-            
-            return user
+            return user_doc
             
+        except DuplicateKeyError:
+            raise DuplicateUserError('Email already registered')
         except Exception as e:
             raise Exception(f"Error creating user: {str(e)}")
 
-    def get_user_by_email(self, email):
-        """Get user by email"""
-        user = self.db.users.find_one({'email': email})
+    def get_user_by_email(self, email, fields=None):
+        """Get user by email, optionally only some fields (e.g. LOGIN_FIELDS)"""
+        user = self.db.users.find_one({'email': email}, fields)
         if user:
             user['id'] = str(user['_id'])  # Add id field for JWT
         return user
 
-    def verify_password(self, user, password):
-        """Verify user's password"""
-        return check_password(password, user['password'])
+    def verify_password(self, user, password, client_ip=None):
+        """Verify user's password, upgrading the stored hash when the preferred hasher changed"""
+        valid, upgraded = password_hasher.check(password, user['password'], email=user.get('email'), client_ip=client_ip)
+        if upgraded:
+            try:
+                # Only replace the hash that was verified, in case the password changed meanwhile
+                self.db.users.update_one(
+                    {'_id': ObjectId(user['id']), 'password': user['password']},
+                    {'$set': {'password': upgraded}}
+                )
+            except Exception as e:
+                print(f"Error upgrading password hash: {str(e)}")
+        return valid
 
     def update_last_login(self, user_id):
-        """Update user's last login time"""
+        """Update user's last login time, in the background when write-behind is enabled"""
+        if self.last_logins is not None:
+            self.last_logins.add(str(user_id), datetime.utcnow())
+            return
         self.db.users.update_one(
             {'_id': ObjectId(user_id)},
             {'$set': {'last_login': datetime.utcnow()}}
@@ -0,0 +1,297 @@
+import os
+import abc
+import atexit
+import threading
+import time
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from core.lru import LRUCache
+
+
+class WriteBehindBuffer(abc.ABC):
+    """
+    Buffers per-document updates in process and writes them to a collection
+    as periodic unordered bulk_write batches.
+
+    Subclasses decide how two pending values for one key are merged and how a
+    pending value becomes a write operation. Pending values that fail to write
+    are merged back and retried on the next flush, and the buffer is flushed
+    one last time when the process exits.
+    """
+
+    def __init__(self, collection, flush_interval=1.0, max_pending=1000, name='write-behind'):
+        self.collection = collection
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.name = name
+        self._pending = {}
+        # The batch being written by the current flush
+        self._in_flight = {}
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._stats = {
+            'flushes': 0,
+            'flushed_keys': 0,
+            'failed_keys': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0
+        }
+
+    @abc.abstractmethod
+    def merge(self, current, value):
+        """Combine a pending value with a new one for the same key"""
+
+    @abc.abstractmethod
+    def to_operation(self, key, value):
+        """Build the bulk_write operation for a pending value"""
+
+    def on_flushed(self, batch):
+        """Called with the {key: value} batch that was written"""
+
+    def add(self, key, value):
+        """Queue an update; returns the merged pending value for the key"""
+        with self._lock:
+            current = self._pending.get(key)
+            merged = value if current is None else self.merge(current, value)
+            self._pending[key] = merged
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wakeup.set()
+        return merged
+
+    def pending(self, key):
+        """Get the value waiting to be written for a key, or None"""
+        with self._lock:
+            return self._pending.get(key)
+
+    def start(self):
+        """Start the background flush thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        """Stop the flush thread and write everything still pending"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Write all pending values now; returns the number of keys written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._in_flight = batch
+            if not batch:
+                return 0
+
+            keys = list(batch)
+            failed = set()
+            started = time.monotonic()
+            try:
+                self.collection.bulk_write([self.to_operation(key, batch[key]) for key in keys], ordered=False)
+            except BulkWriteError as e:
+                failed = {keys[error['index']] for error in e.details.get('writeErrors', [])}
+                print(f"{self.name}: {len(failed)} of {len(keys)} buffered writes failed")
+            except Exception as e:
+                failed = set(keys)
+                print(f"{self.name}: flush failed, retrying later: {str(e)}")
+            elapsed_ms = (time.monotonic() - started) * 1000
+
+            written = {key: batch[key] for key in keys if key not in failed}
+            with self._lock:
+                # Put failed values back in front of anything queued meanwhile
+                for key in failed:
+                    current = self._pending.get(key)
+                    self._pending[key] = batch[key] if current is None else self.merge(batch[key], current)
+                self._in_flight = written
+            if written:
+                self.on_flushed(written)
+
+            with self._lock:
+                self._in_flight = {}
+                self._stats['flushes'] += 1
+                self._stats['flushed_keys'] += len(written)
+                self._stats['failed_keys'] += len(failed)
+                self._stats['last_flush_ms'] = elapsed_ms
+                self._stats['max_flush_ms'] = max(self._stats['max_flush_ms'], elapsed_ms)
+                self._stats['total_flush_ms'] += elapsed_ms
+            return len(written)
+
+    def stats(self):
+        """Get flush counters and latency in milliseconds"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+        stats['avg_flush_ms'] = stats['total_flush_ms'] / stats['flushes'] if stats['flushes'] else 0.0
+        return stats
+
+
+class AttemptCounterBuffer(WriteBehindBuffer):
+    """
+    Write-behind attempts/correct_attempts counters for qa_pairs.
+
+    Classroom sessions send many submissions for the same few questions;
+    instead of one $inc per submission, increments are summed in process and
+    applied once per flush. Reads return the stored counts plus this process's
+    increments that are not written yet, so a submitter always sees their own
+    attempt counted. Stored counts are re-read after this process flushes a
+    question and at least every ATTEMPT_COUNTER_KNOWN_TTL_SECONDS, which picks
+    up the increments of other worker processes.
+    """
+
+    def __init__(self, collection, flush_interval=None, max_pending=None, known_entries=None, known_ttl=None):
+        super().__init__(
+            collection,
+            flush_interval=flush_interval or float(os.getenv('ATTEMPT_COUNTER_FLUSH_SECONDS', '1.0')),
+            max_pending=max_pending or int(os.getenv('ATTEMPT_COUNTER_MAX_PENDING', '1000')),
+            name='attempt-counters'
+        )
+        self._known = LRUCache(
+            max_entries=known_entries or int(os.getenv('ATTEMPT_COUNTER_KNOWN_ENTRIES', '20000')),
+            ttl=known_ttl or float(os.getenv('ATTEMPT_COUNTER_KNOWN_TTL_SECONDS', '5'))
+        )
+
+    def merge(self, current, value):
+        return (current[0] + value[0], current[1] + value[1])
+
+    def to_operation(self, key, value):
+        return UpdateOne(
+            {'_id': ObjectId(key)},
+            {'$inc': {'attempts': value[0], 'correct_attempts': value[1]}}
+        )
+
+    def on_flushed(self, batch):
+        # Stored counts now include the batch; read them again (with other workers' increments)
+        for key in batch:
+            self._known.delete(key)
+
+    def _load(self, question_id):
+        # No flush runs during the read, so the stored counts and the in-flight batch never overlap
+        with self._flush_lock:
+            doc = self.collection.find_one(
+                {'_id': ObjectId(question_id)},
+                {'_id': 0, 'attempts': 1, 'correct_attempts': 1}
+            ) or {}
+            self._known.set(question_id, (doc.get('attempts', 0), doc.get('correct_attempts', 0)))
+
+    def _totals(self, question_id, value=None):
+        """Stored + in-flight + pending counts, optionally queueing `value` first"""
+        while True:
+            with self._lock:
+                known = self._known.get(question_id)
+                if known is not None:
+                    pending = self.add(question_id, value) if value else self._pending.get(question_id)
+                    parts = [known, self._in_flight.get(question_id) or (0, 0), pending or (0, 0)]
+                    return sum(part[0] for part in parts), sum(part[1] for part in parts)
+            self._load(question_id)
+
+    def counts(self, question_id):
+        """Get (attempts, correct_attempts) including increments not yet flushed"""
+        return self._totals(question_id)
+
+    def increment(self, question_id, is_correct):
+        """Count one attempt and return the resulting (attempts, correct_attempts)"""
+        return self._totals(question_id, (1, 1 if is_correct else 0))
+
+
+class LastLoginBuffer(WriteBehindBuffer):
+    """
+    Write-behind users.last_login timestamps.
+
+    Logins only queue the timestamp; the latest one per user is written with
+    $max on the next flush, so a late batch can never move last_login back.
+    """
+
+    def __init__(self, collection, flush_interval=None, max_pending=None):
+        super().__init__(
+            collection,
+            flush_interval=flush_interval or float(os.getenv('LAST_LOGIN_FLUSH_SECONDS', '2.0')),
+            max_pending=max_pending or int(os.getenv('LAST_LOGIN_MAX_PENDING', '1000')),
+            name='last-login'
+        )
+
+    def merge(self, current, value):
+        return max(current, value)
+
+    def to_operation(self, key, value):
+        return UpdateOne({'_id': ObjectId(key)}, {'$max': {'last_login': value}})
+
+
+class AttemptEventBuffer(WriteBehindBuffer):
+    """
+    Write-behind attempt_events inserts.
+
+    Each event gets its ObjectId when it is queued and is written as a
+    $setOnInsert upsert, so a batch retried after an unacknowledged write never
+    stores an event twice.
+    """
+
+    def __init__(self, collection, flush_interval=None, max_pending=None):
+        super().__init__(
+            collection,
+            flush_interval=flush_interval or float(os.getenv('PROGRESS_FLUSH_SECONDS', '1.0')),
+            max_pending=max_pending or int(os.getenv('PROGRESS_MAX_PENDING', '1000')),
+            name='attempt-events'
+        )
+
+    def merge(self, current, value):
+        # Every event has its own key
+        return current
+
+    def to_operation(self, key, value):
+        return UpdateOne({'_id': key}, {'$setOnInsert': value}, upsert=True)
+
+
+class ProgressRollupBuffer(WriteBehindBuffer):
+    """
+    Write-behind user_progress rollup increments.
+
+    A user answering a run of questions touches the same few rollups (their
+    totals, the transcript and the transcript/type), so increments are summed
+    per rollup and upserted once per flush.
+    """
+
+    def __init__(self, collection, flush_interval=None, max_pending=None):
+        super().__init__(
+            collection,
+            flush_interval=flush_interval or float(os.getenv('PROGRESS_FLUSH_SECONDS', '1.0')),
+            max_pending=max_pending or int(os.getenv('PROGRESS_MAX_PENDING', '1000')),
+            name='progress-rollups'
+        )
+
+    def merge(self, current, value):
+        return dict(
+            current,
+            attempts=current['attempts'] + value['attempts'],
+            correct_attempts=current['correct_attempts'] + value['correct_attempts'],
+            last_attempt_at=max(current['last_attempt_at'], value['last_attempt_at'])
+        )
+
+    def to_operation(self, key, value):
+        return UpdateOne(
+            {'_id': key},
+            {
+                '$inc': {'attempts': value['attempts'], 'correct_attempts': value['correct_attempts']},
+                '$max': {'last_attempt_at': value['last_attempt_at']},
+                '$set': {'updated_at': datetime.utcnow()},
+                '$setOnInsert': value['scope']
+            },
+            upsert=True
+        )
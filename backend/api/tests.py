@@ -1,3 +1,372 @@
-from django.test import TestCase
+import os
+import time
+import tempfile
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
+from bson import ObjectId
+from django.test import SimpleTestCase
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
 
-# Create your tests here.
+# MongoClient connects lazily; no test here talks to a server
+if not os.getenv('MONGODB_URI'):
+    os.environ['MONGODB_URI'] = 'mongodb://localhost:27017'
+
+from .services.job_service import JOB_COMPLETED, JOB_RUNNING, JobService
+from .services.mongo_service import INDEXES, MongoService, mongo_service
+from .services.question_bank import QuestionBank
+from .services.password_hasher import PasswordHasher, HashQueueFull, HashRateLimited
+from .services.write_behind import AttemptCounterBuffer, ProgressRollupBuffer
+from .token_cache import MongoUser, VerifiedTokenCache
+from .transcript_cache import TranscriptCache
+from core.segments import SegmentTable
+
+
+class FakeQuestions:
+    def __init__(self, fail_times=0):
+        self.counts = {}
+        self.fail_times = fail_times
+
+    def find_one(self, query, projection=None):
+        attempts, correct_attempts = self.counts.get(query['_id'], (0, 0))
+        return {'attempts': attempts, 'correct_attempts': correct_attempts}
+
+    def bulk_write(self, operations, ordered=True):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise ConnectionError('primary stepped down')
+        for operation in operations:
+            document = operation._doc['$inc']
+            attempts, correct_attempts = self.counts.get(operation._filter['_id'], (0, 0))
+            self.counts[operation._filter['_id']] = (
+                attempts + document['attempts'],
+                correct_attempts + document['correct_attempts']
+            )
+
+
+class AttemptCounterBufferTests(SimpleTestCase):
+    def setUp(self):
+        self.question_id = str(ObjectId())
+
+    def test_reads_include_pending_increments(self):
+        collection = FakeQuestions()
+        collection.counts[ObjectId(self.question_id)] = (5, 2)
+        buffer = AttemptCounterBuffer(collection, flush_interval=60)
+
+        self.assertEqual(buffer.increment(self.question_id, True), (6, 3))
+        self.assertEqual(buffer.increment(self.question_id, False), (7, 3))
+        self.assertEqual(collection.counts[ObjectId(self.question_id)], (5, 2))
+
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(collection.counts[ObjectId(self.question_id)], (7, 3))
+        self.assertEqual(buffer.counts(self.question_id), (7, 3))
+
+    def test_failed_flush_keeps_increments(self):
+        collection = FakeQuestions(fail_times=1)
+        buffer = AttemptCounterBuffer(collection, flush_interval=60)
+        buffer.increment(self.question_id, True)
+
+        self.assertEqual(buffer.flush(), 0)
+        buffer.increment(self.question_id, False)
+        buffer.stop()
+
+        self.assertEqual(collection.counts[ObjectId(self.question_id)], (2, 1))
+        self.assertEqual(buffer.stats()['pending'], 0)
+
+    def test_reads_count_in_flight_batch_and_other_workers(self):
+        collection = FakeQuestions()
+        worker = AttemptCounterBuffer(collection, flush_interval=60, known_ttl=0.05)
+        other_worker = AttemptCounterBuffer(collection, flush_interval=60)
+        worker.increment(self.question_id, True)
+        during_flush = []
+        bulk_write = collection.bulk_write
+
+        def slow_bulk_write(operations, ordered=True):
+            during_flush.append(worker.counts(self.question_id))
+            bulk_write(operations, ordered)
+
+        collection.bulk_write = slow_bulk_write
+        worker.flush()
+        self.assertEqual(during_flush, [(1, 1)])
+        self.assertEqual(worker.counts(self.question_id), (1, 1))
+
+        other_worker.increment(self.question_id, False)
+        other_worker.flush()
+        time.sleep(0.1)
+        self.assertEqual(worker.counts(self.question_id), (2, 1))
+
+
+class RecordingCollection:
+    def __init__(self):
+        self.batches = []
+
+    def bulk_write(self, operations, ordered=True):
+        self.batches.append(operations)
+
+
+class ProgressRollupBufferTests(SimpleTestCase):
+    def test_attempts_on_one_rollup_become_one_upsert(self):
+        collection = RecordingCollection()
+        buffer = ProgressRollupBuffer(collection, flush_interval=60)
+        scope = {'user_id': 'u1', 'transcript_id': None, 'video_id': None, 'type': None}
+        first, second = datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 11)
+
+        buffer.add('u1:*:*', {'attempts': 1, 'correct_attempts': 1, 'last_attempt_at': second, 'scope': scope})
+        buffer.add('u1:*:*', {'attempts': 1, 'correct_attempts': 0, 'last_attempt_at': first, 'scope': scope})
+        buffer.flush()
+
+        [[operation]] = collection.batches
+        self.assertEqual(operation._filter, {'_id': 'u1:*:*'})
+        self.assertEqual(operation._doc['$inc'], {'attempts': 2, 'correct_attempts': 1})
+        self.assertEqual(operation._doc['$max'], {'last_attempt_at': second})
+        self.assertEqual(operation._doc['$setOnInsert'], scope)
+        self.assertTrue(operation._upsert)
+
+
+class FailingCollection:
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def create_index(self, keys, **options):
+        self.calls += 1
+        raise self.error
+
+
+class IndexRegistryTests(SimpleTestCase):
+    def make_service(self, error):
+        service = object.__new__(MongoService)
+        collection = FailingCollection(error)
+        service._db = {spec.collection: collection for spec in INDEXES}
+        return service, collection
+
+    def test_unreachable_server_is_reported_once(self):
+        service, collection = self.make_service(ServerSelectionTimeoutError('no servers'))
+        failed = service.ensure_indexes(['users', 'qa_jobs'])
+        self.assertEqual(collection.calls, 1)
+        self.assertEqual(len(failed), len([spec for spec in INDEXES if spec.collection in ('users', 'qa_jobs')]))
+
+    def test_conflicting_index_does_not_stop_the_rest(self):
+        service, collection = self.make_service(OperationFailure('index exists with different options'))
+        failed = service.ensure_indexes(['users'])
+        self.assertEqual(collection.calls, 2)
+        self.assertEqual(len(failed), 2)
+
+
+class FakeJobs:
+    def __init__(self, *jobs):
+        self.docs = {job['_id']: dict(job) for job in jobs}
+
+    def find_one(self, query):
+        job = self.docs.get(query['_id'])
+        return dict(job) if job and all(job.get(k) == v for k, v in query.items()) else None
+
+    def update_one(self, query, update):
+        job = self.docs.get(query['_id'])
+        if not job or any(job.get(k) != v for k, v in query.items()):
+            return SimpleNamespace(matched_count=0)
+        job.update(update.get('$set', {}))
+        for field in update.get('$unset', {}):
+            job.pop(field, None)
+        return SimpleNamespace(matched_count=1)
+
+
+class JobServiceTests(SimpleTestCase):
+    def setUp(self):
+        self.claimed = {'_id': ObjectId(), 'status': JOB_RUNNING, 'lease_id': ObjectId(), 'attempts': 1}
+        self.jobs = FakeJobs(self.claimed)
+        self.service = JobService()
+        self.service.db = SimpleNamespace(qa_jobs=self.jobs)
+
+    def test_malformed_job_id_is_not_found(self):
+        self.assertIsNone(self.service.get_job('not-an-object-id'))
+        self.assertIsNone(self.service.get_job(None))
+        self.assertEqual(self.service.get_job(str(self.claimed['_id']))['status'], JOB_RUNNING)
+
+    def test_only_the_lease_holder_finishes_a_job(self):
+        # The lease expired and another worker claimed the job again
+        reclaimed = dict(self.claimed, lease_id=ObjectId(), attempts=2)
+        self.jobs.docs[self.claimed['_id']].update(reclaimed)
+
+        self.assertFalse(self.service.complete_job(self.claimed, [ObjectId()]))
+        self.assertFalse(self.service.fail_job(self.claimed, 'timed out'))
+        self.assertEqual(self.jobs.docs[self.claimed['_id']]['status'], JOB_RUNNING)
+
+        self.assertTrue(self.service.complete_job(reclaimed, []))
+        self.assertEqual(self.jobs.docs[self.claimed['_id']]['status'], JOB_COMPLETED)
+
+
+class FakeBankQuestions:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = 0
+
+    def find(self, query, projection=None):
+        self.queries += 1
+        return [doc for doc in self.docs if doc['video_id'] == query['video_id']]
+
+
+class QuestionBankTests(SimpleTestCase):
+    transcript = {'video_id': 'banked', 'title': 'Lesson'}
+
+    def setUp(self):
+        self.questions = FakeBankQuestions([
+            {'_id': ObjectId(), 'video_id': 'banked', 'type': 'novice', 'question_text': 'q1', 'answer': 'a1'},
+            {'_id': ObjectId(), 'video_id': 'banked', 'type': 'mcq', 'question_text': 'q2', 'answer': 'a2'},
+        ])
+        self.bank = QuestionBank()
+        self.bank.db = SimpleNamespace(qa_pairs=self.questions)
+        self.bank.log_every = 0
+        save = mock.patch.object(
+            mongo_service, 'save_question_groups',
+            side_effect=lambda groups, update_counters: [q for group in groups for q in group['questions']]
+        )
+        self.save = save.start()
+        self.addCleanup(save.stop)
+
+    def test_bank_hit_copies_every_type(self):
+        created, missing = self.bank.serve('t1', self.transcript, ['novice', 'mcq'])
+        self.assertEqual(len(created), 2)
+        self.assertEqual(missing, [])
+        self.assertEqual(self.bank.stats()['hits'], 1)
+
+    def test_miss_falls_through_to_generation(self):
+        created, missing = self.bank.serve('t1', {'video_id': 'elsewhere'}, ['novice'])
+        self.assertEqual((created, missing), ([], ['novice']))
+        self.save.assert_not_called()
+        self.bank.serve('t2', {'video_id': 'elsewhere'}, ['novice'])
+        self.assertEqual(self.questions.queries, 1)
+        self.assertEqual(self.bank.stats()['misses'], 2)
+
+    def test_partial_fill_generates_only_missing_types(self):
+        created, missing = self.bank.serve('t1', self.transcript, ['mcq', 'fill_blanks'])
+        self.assertEqual([q['question_text'] for q in created], ['q2'])
+        self.assertEqual(missing, ['fill_blanks'])
+        stats = self.bank.stats()
+        self.assertEqual((stats['partial_hits'], stats['hit_rate'], stats['type_hit_rate']), (1, 1.0, 0.5))
+
+    def test_hit_rate_is_logged_periodically(self):
+        self.bank.log_every = 2
+        with mock.patch('builtins.print') as printed:
+            self.bank.serve('t1', self.transcript, ['novice'])
+            printed.assert_not_called()
+            self.bank.serve('t2', {'video_id': 'elsewhere'}, ['novice'])
+        self.assertIn('hit rate 50.0%', printed.call_args[0][0])
+
+
+class VerifiedTokenCacheTests(SimpleTestCase):
+    raw_token = 'header.payload.signature'
+
+    def make_claims(self, expires_in=60, jti='jti-1'):
+        return {'user_id': 'u1', 'jti': jti, 'exp': time.time() + expires_in}
+
+    def test_hit_returns_claims_and_user(self):
+        cache = VerifiedTokenCache()
+        claims = self.make_claims()
+        cache.set(self.raw_token, claims, MongoUser('u1'))
+        validated_token, user = cache.get(self.raw_token.encode())
+        self.assertIs(validated_token, claims)
+        self.assertEqual(user.user_id, 'u1')
+
+    def test_same_signature_with_other_payload_misses(self):
+        cache = VerifiedTokenCache()
+        cache.set(self.raw_token, self.make_claims(), MongoUser('u1'))
+        self.assertIsNone(cache.get('header.forged.signature'))
+
+    def test_expired_and_revoked_tokens_miss(self):
+        cache = VerifiedTokenCache()
+        cache.set(self.raw_token, self.make_claims(expires_in=-1), MongoUser('u1'))
+        self.assertIsNone(cache.get(self.raw_token))
+
+        claims = self.make_claims()
+        cache.set(self.raw_token, claims, MongoUser('u1'))
+        cache.revoke(claims)
+        self.assertIsNone(cache.get(self.raw_token))
+        self.assertTrue(cache.is_revoked(claims))
+
+    def test_revocation_reaches_other_workers_through_blacklist(self):
+        class SharedBlacklist:
+            revoked = set()
+
+            def revoke(self, token, buffered=True):
+                self.revoked.add(token['jti'])
+
+            def is_blacklisted(self, jti):
+                return jti in self.revoked
+
+        worker = VerifiedTokenCache(blacklist=SharedBlacklist())
+        other_worker = VerifiedTokenCache(blacklist=SharedBlacklist())
+        claims = self.make_claims()
+        other_worker.set(self.raw_token, claims, MongoUser('u1'))
+
+        worker.revoke(claims)
+
+        self.assertIsNone(other_worker.get(self.raw_token))
+
+
+class PasswordHasherTests(SimpleTestCase):
+    def test_concurrent_hashes_per_email_are_limited(self):
+        hasher = PasswordHasher()
+        hasher.workers = 0
+        hasher.per_email = 1
+        started, release = threading.Event(), threading.Event()
+
+        def slow_hash():
+            started.set()
+            release.wait(5)
+            return 'hash'
+
+        thread = threading.Thread(target=hasher._run, args=(slow_hash, (), ['email:a@example.com']))
+        thread.start()
+        started.wait(5)
+        with self.assertRaises(HashRateLimited):
+            hasher._run(slow_hash, (), ['email:a@example.com'])
+        self.assertEqual(hasher._run(lambda: 'other', (), ['email:b@example.com']), 'other')
+        release.set()
+        thread.join()
+
+        self.assertEqual(hasher.stats()['rejected_rate_limited'], 1)
+        self.assertEqual(hasher._run(lambda: 'again', (), ['email:a@example.com']), 'again')
+
+    def test_dead_pool_process_is_replaced(self):
+        hasher = PasswordHasher()
+        self.addCleanup(hasher.shutdown)
+
+        # The worker process exits mid-hash, as when the OOM killer takes it
+        with self.assertRaises(HashQueueFull):
+            hasher._run(os._exit, (1,), [])
+        self.assertEqual(hasher.stats()['pool_restarts'], 2)
+
+        self.assertEqual(hasher._run(len, ('hash',), []), 4)
+
+
+class TranscriptCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'transcripts.sqlite3')
+        self.table = SegmentTable.from_entries([
+            {'text': 'नमस्ते दोस्तों', 'start': 0.0, 'duration': 2.5},
+            {'text': 'आज हम हिंदी सीखेंगे।', 'start': 2.5, 'duration': 3.0}
+        ])
+
+    def test_disk_tier_is_shared_between_instances(self):
+        TranscriptCache(path=self.path).set('video1', self.table, 'hi')
+
+        other_worker = TranscriptCache(path=self.path)
+        table, language = other_worker.get('video1')
+        self.assertEqual(language, 'hi')
+        self.assertEqual(table.text, self.table.text)
+        self.assertEqual(list(table.all()), list(self.table.all()))
+
+        other_worker.get('video1')
+        stats = other_worker.stats()
+        self.assertEqual((stats['disk']['hits'], stats['memory']['hits']), (1, 1))
+        self.assertIsNone(other_worker.get('missing'))
+
+    def test_disk_tier_is_bounded(self):
+        cache = TranscriptCache(path=self.path, disk_bytes=1)
+        cache.set('video1', self.table, 'hi')
+        cache.set('video2', self.table, 'hi')
+        self.assertGreaterEqual(cache.stats()['disk']['evictions'], 1)
@@ -0,0 +1,240 @@
+import os
+import threading
+import time
+from django.db import transaction
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_from_epoch
+from core.bloom import BloomFilter
+from core.lru import LRUCache
+from .services.write_behind import WriteBehindBuffer
+
+# SQLite allows 999 parameters per statement
+SQL_BATCH_SIZE = 500
+
+
+class BlacklistTables:
+    """
+    The simplejwt OutstandingToken/BlacklistedToken tables behind the
+    bulk_write interface WriteBehindBuffer expects. Each flush is one
+    transaction, so workers take the SQLite write lock once per batch.
+    """
+
+    def bulk_write(self, operations, ordered=False):
+        now = aware_utcnow()
+        with transaction.atomic():
+            for i in range(0, len(operations), SQL_BATCH_SIZE):
+                batch = operations[i:i + SQL_BATCH_SIZE]
+                OutstandingToken.objects.bulk_create(
+                    [
+                        OutstandingToken(jti=jti, token=token, created_at=now, expires_at=datetime_from_epoch(exp))
+                        for jti, (token, exp) in batch
+                    ],
+                    ignore_conflicts=True
+                )
+                token_ids = OutstandingToken.objects.filter(
+                    jti__in=[jti for jti, _ in batch]
+                ).values_list('id', flat=True)
+                BlacklistedToken.objects.bulk_create(
+                    [BlacklistedToken(token_id=token_id) for token_id in token_ids],
+                    ignore_conflicts=True
+                )
+
+
+class RevocationBuffer(WriteBehindBuffer):
+    """Revoked refresh tokens (jti -> (token, exp)) waiting to be written"""
+
+    def __init__(self, blacklist):
+        super().__init__(
+            BlacklistTables(),
+            flush_interval=float(os.getenv('TOKEN_BLACKLIST_FLUSH_SECONDS', '0.5')),
+            max_pending=int(os.getenv('TOKEN_BLACKLIST_MAX_PENDING', '500')),
+            name='token-blacklist'
+        )
+        self.blacklist = blacklist
+
+    def merge(self, current, value):
+        return current
+
+    def to_operation(self, key, value):
+        return key, value
+
+    def on_flushed(self, batch):
+        # The filter may have been rebuilt from the database while these were pending
+        self.blacklist.remember(batch)
+
+    def flush(self):
+        written = super().flush()
+        # The flush thread also picks up other workers' revocations and purges expired rows
+        self.blacklist.maintain()
+        return written
+
+
+class TokenBlacklist:
+    """
+    Refresh token blacklist with the database off the hot path.
+
+    Every blacklisted jti is added to a Bloom filter, so the common case, a
+    token that was never revoked, is answered in memory. Filter hits are
+    confirmed against the database once and remembered in an LRU. Revocations
+    are written in batches by a background thread, which also loads
+    revocations made by other worker processes every
+    TOKEN_BLACKLIST_SYNC_SECONDS and purges expired tokens every
+    TOKEN_BLACKLIST_PURGE_SECONDS. Logouts are written before they return;
+    only rotations are batched. A token revoked in another process is
+    therefore rejected here after at most one sync interval, or one flush plus
+    one sync interval for a rotated token.
+    """
+
+    def __init__(self):
+        self.capacity = int(os.getenv('TOKEN_BLACKLIST_BLOOM_CAPACITY', '1000000'))
+        self.sync_interval = float(os.getenv('TOKEN_BLACKLIST_SYNC_SECONDS', '1.0'))
+        self.purge_interval = float(os.getenv('TOKEN_BLACKLIST_PURGE_SECONDS', '3600'))
+        self._confirmed = LRUCache(max_entries=int(os.getenv('TOKEN_BLACKLIST_CACHE_SIZE', '10000')))
+        self._bloom = None
+        self._last_id = 0
+        self._synced_at = 0.0
+        self._purged_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._buffer = RevocationBuffer(self)
+        self._stats = {'checks': 0, 'bloom_negatives': 0, 'db_checks': 0, 'revoked': 0, 'purged': 0}
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _load(self):
+        """Rebuild the filter from the blacklisted tokens that have not expired"""
+        bloom = BloomFilter(capacity=self.capacity)
+        last_id = 0
+        for blacklisted_id, jti in BlacklistedToken.objects.filter(
+                token__expires_at__gt=aware_utcnow()).values_list('id', 'token__jti').iterator():
+            bloom.add(jti)
+            last_id = max(last_id, blacklisted_id)
+        with self._lock:
+            self._bloom = bloom
+            self._last_id = last_id
+            self._synced_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        if self._bloom is None:
+            with self._load_lock:
+                if self._bloom is None:
+                    self._load()
+                    self._buffer.start()
+
+    def sync(self):
+        """Add tokens blacklisted since the last sync, by this or any other process"""
+        new = list(BlacklistedToken.objects.filter(id__gt=self._last_id).values_list('id', 'token__jti'))
+        for blacklisted_id, jti in new:
+            self._bloom.add(jti)
+            self._confirmed.set(jti, True)
+        with self._lock:
+            if new:
+                self._last_id = max(self._last_id, max(blacklisted_id for blacklisted_id, _ in new))
+            self._synced_at = time.monotonic()
+
+    def purge_expired(self):
+        """Delete expired outstanding tokens (and their blacklist entries) in small transactions"""
+        purged = 0
+        while True:
+            ids = list(OutstandingToken.objects.filter(
+                expires_at__lte=aware_utcnow()
+            ).values_list('id', flat=True)[:SQL_BATCH_SIZE])
+            if not ids:
+                break
+            OutstandingToken.objects.filter(id__in=ids).delete()
+            purged += len(ids)
+        self._count('purged', purged)
+        # Expired jtis can never be presented again; start from a clean filter
+        self._load()
+        with self._lock:
+            self._purged_at = time.monotonic()
+        return purged
+
+    def maintain(self):
+        """Periodic work of the flush thread"""
+        if self._bloom is None:
+            return
+        try:
+            now = time.monotonic()
+            if now - self._purged_at >= self.purge_interval:
+                self.purge_expired()
+            elif now - self._synced_at >= self.sync_interval:
+                self.sync()
+        except Exception as e:
+            print(f"Error maintaining token blacklist: {str(e)}")
+
+    def is_blacklisted(self, jti):
+        self._ensure_loaded()
+        self._count('checks')
+        if self._buffer.pending(jti) is not None:
+            return True
+        if jti not in self._bloom:
+            self._count('bloom_negatives')
+            return False
+        confirmed = self._confirmed.get(jti)
+        if confirmed is None:
+            self._count('db_checks')
+            confirmed = BlacklistedToken.objects.filter(token__jti=jti).exists()
+            self._confirmed.set(jti, confirmed)
+        return confirmed
+
+    def remember(self, jtis):
+        bloom = self._bloom
+        for jti in jtis:
+            bloom.add(jti)
+
+    def revoke(self, token, buffered=True):
+        """
+        Blacklist a refresh token
+        Args:
+            token (RefreshToken): The token to revoke
+            buffered (bool): Write with the next batch (rotation) instead of before returning (logout)
+        """
+        self._ensure_loaded()
+        jti = token[api_settings.JTI_CLAIM]
+        if buffered:
+            self._buffer.add(jti, (str(token), token['exp']))
+        else:
+            # A revocation still in the buffer would be lost if the worker were killed
+            self._buffer.collection.bulk_write([(jti, (str(token), token['exp']))])
+        self._bloom.add(jti)
+        self._confirmed.set(jti, True)
+        self._count('revoked')
+
+    def flush(self):
+        """Write pending revocations now"""
+        return self._buffer.flush()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['bloom'] = self._bloom.stats() if self._bloom is not None else None
+        stats['cache'] = self._confirmed.stats()
+        stats['writes'] = self._buffer.stats()
+        return stats
+
+
+token_blacklist = TokenBlacklist()
+
+
+class CachedRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist checks and writes go through token_blacklist"""
+
+    def check_blacklist(self):
+        if token_blacklist.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError('Token is blacklisted')
+
+    def blacklist(self, buffered=True):
+        token_blacklist.revoke(self, buffered=buffered)
+
+
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh with rotation, blacklisting the old refresh token through token_blacklist"""
+
+    token_class = CachedRefreshToken
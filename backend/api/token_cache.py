@@ -0,0 +1,85 @@
+import os
+import time
+from core.lru import LRUCache
+from .token_blacklist import token_blacklist
+
+
+class MongoUser:
+    """The authenticated user of a request; only the MongoDB user id is known from the token"""
+
+    __slots__ = ('id', 'user_id')
+
+    is_authenticated = True
+    is_active = True
+    is_anonymous = False
+
+    def __init__(self, user_id):
+        self.id = user_id
+        self.user_id = user_id
+
+    def __str__(self):
+        return str(self.user_id)
+
+
+class VerifiedTokenCache:
+    """
+    Recently verified access tokens, keyed by signature.
+
+    A hit skips signature verification and claim checks for a token seen in
+    the last `ttl` seconds. Entries never outlive the token's own `exp`, and
+    tokens revoked with revoke() (e.g. on logout) are rejected until they
+    would have expired anyway: at once in this process, and in other worker
+    processes once their `blacklist` (the shared token blacklist) has synced.
+    """
+
+    def __init__(self, max_entries=None, ttl=None, blacklist=None):
+        self.ttl = ttl or int(os.getenv('JWT_CACHE_TTL', '300'))
+        self.blacklist = blacklist
+        self._verified = LRUCache(max_entries=max_entries or int(os.getenv('JWT_CACHE_SIZE', '10000')))
+        self._revoked = LRUCache(max_entries=max_entries or int(os.getenv('JWT_CACHE_SIZE', '10000')))
+
+    @staticmethod
+    def _normalize(raw_token):
+        return raw_token.decode('ascii') if isinstance(raw_token, bytes) else raw_token
+
+    def get(self, raw_token):
+        """(validated_token, user) for a cached token, or None"""
+        raw_token = self._normalize(raw_token)
+        entry = self._verified.get(raw_token.rpartition('.')[2])
+        # The signature only identifies the token together with the signed header and payload
+        if entry is None or entry[0] != raw_token:
+            return None
+        _, validated_token, user = entry
+        if validated_token.get('exp', 0) <= time.time() or self.is_revoked(validated_token):
+            return None
+        return validated_token, user
+
+    def set(self, raw_token, validated_token, user):
+        raw_token = self._normalize(raw_token)
+        remaining = validated_token.get('exp', 0) - time.time()
+        if remaining <= 0 or self.is_revoked(validated_token):
+            return
+        self._verified.set(raw_token.rpartition('.')[2], (raw_token, validated_token, user), ttl=min(self.ttl, remaining))
+
+    def revoke(self, validated_token):
+        """Reject a token from now on, e.g. the access token of a logged out session"""
+        jti = validated_token.get('jti')
+        remaining = validated_token.get('exp', 0) - time.time()
+        if jti and remaining > 0:
+            self._revoked.set(jti, True, ttl=remaining)
+            if self.blacklist is not None:
+                self.blacklist.revoke(validated_token, buffered=False)
+
+    def is_revoked(self, validated_token):
+        jti = validated_token.get('jti')
+        if jti is None:
+            return False
+        if self._revoked.get(jti) is not None:
+            return True
+        return self.blacklist is not None and self.blacklist.is_blacklisted(jti)
+
+    def stats(self):
+        return {'verified': self._verified.stats(), 'revoked': self._revoked.stats()}
+
+
+token_cache = VerifiedTokenCache(blacklist=token_blacklist)
@@ -0,0 +1,214 @@
+import os
+import time
+import zlib
+import sqlite3
+import struct
+import threading
+from django.conf import settings
+from core.lru import ByteLRUCache
+from core.segments import SegmentTable
+
+# Entry layout before compression: header, language, segment table (core.segments format), text
+MAGIC = b'TRC1'
+HEADER = struct.Struct('<4sHI')
+
+
+def encode_entry(table, language):
+    """Compress a transcript's segment table and language into one blob"""
+    language_bytes = language.encode('utf-8')
+    segment_bytes = table.to_bytes()
+    return zlib.compress(
+        HEADER.pack(MAGIC, len(language_bytes), len(segment_bytes))
+        + language_bytes + segment_bytes + table.text.encode('utf-8'),
+        level=6
+    )
+
+
+def decode_entry(blob):
+    """(SegmentTable, language) from a blob made by encode_entry"""
+    data = zlib.decompress(blob)
+    magic, language_length, segment_length = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('Unknown transcript cache format')
+    position = HEADER.size
+    language = data[position:position + language_length].decode('utf-8')
+    position += language_length
+    segment_bytes = data[position:position + segment_length]
+    text = data[position + segment_length:].decode('utf-8')
+    return SegmentTable.from_bytes(segment_bytes, text), language
+
+
+class SQLiteStore:
+    """
+    Compressed entries in a SQLite file shared by all worker processes on a host.
+
+    WAL mode lets workers read while one writes. The file is kept under
+    `max_bytes` by deleting the least recently stored entries after writes.
+    """
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'errors': 0}
+        with self._connection() as db:
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS entries '
+                '(key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, '
+                'stored_at REAL NOT NULL, expires_at REAL)'
+            )
+            db.execute('CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at)')
+
+    def _connection(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def get(self, key):
+        try:
+            row = self._connection().execute(
+                'SELECT value, expires_at FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading transcript cache: {str(e)}")
+            self._count('errors')
+            return None
+        if row is None:
+            self._count('misses')
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            self._count('expirations')
+            self._count('misses')
+            return None
+        self._count('hits')
+        return value
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        try:
+            db = self._connection()
+            db.execute(
+                'INSERT OR REPLACE INTO entries (key, value, size, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)',
+                (key, value, len(value), now, now + ttl if ttl else None)
+            )
+            self._evict(db, now)
+        except sqlite3.Error as e:
+            print(f"Error writing transcript cache: {str(e)}")
+            self._count('errors')
+
+    def _evict(self, db, now):
+        expired = db.execute('DELETE FROM entries WHERE expires_at <= ?', (now,)).rowcount
+        if expired > 0:
+            self._count('expirations', expired)
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in db.execute('SELECT key, size FROM entries ORDER BY stored_at').fetchall():
+            if total <= self.max_bytes:
+                break
+            db.execute('DELETE FROM entries WHERE key = ?', (key,))
+            total -= size
+            evicted += 1
+        self._count('evictions', evicted)
+
+    def delete(self, key):
+        try:
+            self._connection().execute('DELETE FROM entries WHERE key = ?', (key,))
+        except sqlite3.Error as e:
+            print(f"Error deleting from transcript cache: {str(e)}")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        try:
+            entries, total = self._connection().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries'
+            ).fetchone()
+            stats.update(entries=entries, bytes=total)
+        except sqlite3.Error:
+            pass
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+
+class TranscriptCache:
+    """
+    Fetched YouTube transcripts by video id, so retries and other users adding
+    the same video skip YouTube.
+
+    Two tiers: a small per-process LRU bounded by bytes in front of a SQLite
+    file shared by the workers of a host, which survives restarts. Entries are
+    the compact segment table plus language, zlib-compressed; the memory tier
+    keeps them compressed as well.
+    """
+
+    def __init__(self, path=None, memory_bytes=None, disk_bytes=None, ttl=None):
+        self.ttl = ttl or getattr(settings, 'TRANSCRIPT_CACHE_TIMEOUT', 60 * 60 * 24)
+        self.memory = ByteLRUCache(
+            max_bytes=memory_bytes or int(os.getenv('TRANSCRIPT_CACHE_MEMORY_BYTES', str(8 * 1024 * 1024))),
+            ttl=self.ttl
+        )
+        self.disk = SQLiteStore(
+            path or os.getenv('TRANSCRIPT_CACHE_PATH', str(settings.BASE_DIR / 'transcript_cache.sqlite3')),
+            max_bytes=disk_bytes or int(os.getenv('TRANSCRIPT_CACHE_DISK_BYTES', str(512 * 1024 * 1024)))
+        )
+
+    @staticmethod
+    def _key(video_id):
+        return f'transcript_{video_id}'
+
+    def get(self, video_id):
+        """(SegmentTable, language) for a video, or None"""
+        key = self._key(video_id)
+        blob = self.memory.get(key)
+        if blob is None:
+            blob = self.disk.get(key)
+            if blob is None:
+                return None
+            self.memory.set(key, blob)
+        try:
+            return decode_entry(blob)
+        except (ValueError, zlib.error, struct.error) as e:
+            print(f"Dropping unreadable transcript cache entry {key}: {str(e)}")
+            self.delete(video_id)
+            return None
+
+    def set(self, video_id, table, language):
+        blob = encode_entry(table, language)
+        key = self._key(video_id)
+        self.memory.set(key, blob)
+        self.disk.set(key, blob, ttl=self.ttl)
+
+    def delete(self, video_id):
+        key = self._key(video_id)
+        self.memory.delete(key)
+        self.disk.delete(key)
+
+    def stats(self):
+        """Hit/miss/eviction counters per tier"""
+        return {'memory': self.memory.stats(), 'disk': self.disk.stats()}
+
+
+# Opened lazily so importing this module never touches the filesystem
+_transcript_cache = None
+_lock = threading.Lock()
+
+
+def get_transcript_cache():
+    global _transcript_cache
+    with _lock:
+        if _transcript_cache is None:
+            _transcript_cache = TranscriptCache()
+        return _transcript_cache
@@ -9,6 +9,10 @@ from .views import (
     get_practice_sets,
     get_practice_questions,
     submit_answer,
+    get_progress,
+    get_due_reviews,
+    add_review_deck,
+    submit_review,
     get_transcript_by_video
 )
 
@@ -32,6 +36,10 @@ urlpatterns = [
     path('practice/sets/', get_practice_sets, name='practice-sets'),
     path('practice/questions/<str:video_id>/<str:question_type>/', get_practice_questions, name='practice-questions'),
     path('practice/submit/<str:question_id>/', submit_answer, name='submit-answer'),
+    path('practice/progress/', get_progress, name='practice-progress'),
+    path('practice/review/due/', get_due_reviews, name='review-due'),
+    path('practice/review/decks/', add_review_deck, name='review-decks'),
+    path('practice/review/', submit_review, name='review-submit'),
     
     # Direct transcript access
     path('transcripts/<str:video_id>/', get_transcript_by_video, name='get-transcript-by-video'),
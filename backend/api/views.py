@@ -5,26 +5,62 @@ from django.core.validators import validate_email
 from rest_framework import status, viewsets, permissions
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
 from api.services.mongo_service import mongo_service
-from api.services.user_service import user_service
+from api.services.user_service import user_service, DuplicateUserError, LOGIN_FIELDS
+from api.services.password_hasher import HashQueueFull, HashRateLimited
 from bson import ObjectId
+from bson.errors import InvalidId
 from datetime import datetime
-from django.http import Http404
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+import json
 import logging
-from django.core.cache import cache
 from django.conf import settings
 
 from .serializers import TranscriptSerializer, QuestionSerializer
-from .youtube_utils import get_transcript, format_transcript, extract_video_id
+from .renderers import EventStreamRenderer
+from .token_cache import token_cache
+from .transcript_cache import get_transcript_cache
+from .token_blacklist import CachedRefreshToken
+from .youtube_utils import get_transcript, format_segments, extract_video_id
 from api.services.qa_service import qa_service
+from api.services.job_service import job_service
+from api.services.progress_service import progress_service
+from api.services.review_service import review_service, CORRECT_QUALITY, INCORRECT_QUALITY
+from api.services.question_bank import question_bank
 
 # Create your views here.
 
 logger = logging.getLogger(__name__)
 
+async def iterate_in_thread(iterator):
+    """Async iterator over a blocking one, advancing it in a worker thread"""
+    step = sync_to_async(next, thread_sensitive=False)
+    while True:
+        item = await step(iterator, None)
+        if item is None:
+            return
+        yield item
+
+
+def client_ip(request):
+    """
+    Client address as seen by the outermost trusted proxy.
+    Each of the TRUSTED_PROXY_COUNT proxies appends the address it received the
+    request from, so only the last that many X-Forwarded-For entries can be
+    trusted; anything left of them is supplied by the client.
+    """
+    proxies = settings.TRUSTED_PROXY_COUNT
+    hops = [hop.strip() for hop in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if hop.strip()]
+    if proxies > 0 and hops:
+        return hops[-min(proxies, len(hops))]
+    return request.META.get('REMOTE_ADDR')
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def signup(request):
@@ -49,20 +85,14 @@ def signup(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Check if email already exists
-    if user_service.user_exists(email):
-        return Response(
-            {'error': 'Email already registered'}, 
-            status=status.HTTP_400_BAD_REQUEST
-        )
-
     try:
-        # Create user in MongoDB
+        # Create user in MongoDB; the unique email index catches existing accounts
         user = user_service.create_user(
             email=email,
             password=password,
             first_name=first_name,
-            last_name=last_name
+            last_name=last_name,
+            client_ip=client_ip(request)
         )
         
         # Create JWT tokens
@@ -80,6 +110,21 @@ def signup(request):
                 'last_name': user['last_name']
             }
         }, status=status.HTTP_201_CREATED)
+    except DuplicateUserError:
+        return Response(
+            {'error': 'Email already registered'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except HashRateLimited as e:
+        return Response(
+            {'error': str(e)}, 
+            status=status.HTTP_429_TOO_MANY_REQUESTS
+        )
+    except HashQueueFull as e:
+        return Response(
+            {'error': str(e)}, 
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
     except Exception as e:
         return Response(
             {'error': str(e)}, 
@@ -100,7 +145,7 @@ def login(request):
 
     try:
         # Get user by email
-        user = user_service.get_user_by_email(email)
+        user = user_service.get_user_by_email(email, fields=LOGIN_FIELDS)
         if not user:
             return Response(
                 {'error': 'Invalid credentials'}, 
@@ -108,7 +153,7 @@ def login(request):
             )
         
         # Verify password
-        if user_service.verify_password(user, password):
+        if user_service.verify_password(user, password, client_ip=client_ip(request)):
             # Update last login
             user_service.update_last_login(user['id'])
             
@@ -132,6 +177,16 @@ def login(request):
                 {'error': 'Invalid credentials'}, 
                 status=status.HTTP_401_UNAUTHORIZED
             )
+    except HashRateLimited as e:
+        return Response(
+            {'error': str(e)}, 
+            status=status.HTTP_429_TOO_MANY_REQUESTS
+        )
+    except HashQueueFull as e:
+        return Response(
+            {'error': str(e)}, 
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
     except Exception as e:
         return Response(
             {'error': str(e)}, 
@@ -146,14 +201,18 @@ def logout(request):
         if not refresh_token:
             return Response({'error': 'Refresh token is required'}, status=status.HTTP_400_BAD_REQUEST)
             
-        token = RefreshToken(refresh_token)
-        token.blacklist()
+        token = CachedRefreshToken(refresh_token)
+        token.blacklist(buffered=False)
+        # Also reject this session's access token, here at once and in other workers after their next sync
+        if request.auth is not None:
+            token_cache.revoke(request.auth)
         
         return Response({'message': 'Successfully logged out'}, status=status.HTTP_200_OK)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 class TranscriptViewSet(viewsets.ModelViewSet):
+    serializer_class = TranscriptSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -162,6 +221,47 @@ class TranscriptViewSet(viewsets.ModelViewSet):
             return []
         return mongo_service.get_transcripts(user_id=str(user_id))
 
+    def list(self, request):
+        user_id = str(getattr(request, 'user_id', None) or '')
+        favorites_only = request.query_params.get('favorite', '').lower() == 'true'
+
+        # Cursor mode: a page without content, with question counts from one aggregation
+        if 'limit' in request.query_params or 'cursor' in request.query_params:
+            try:
+                limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+                page = mongo_service.list_transcripts_page(
+                    user_id=user_id,
+                    limit=limit,
+                    cursor=request.query_params.get('cursor'),
+                    favorites_only=favorites_only
+                )
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return Response(page)
+
+        transcripts = self.get_queryset()
+        if favorites_only:
+            transcripts = [t for t in transcripts if t.get('is_favorite')]
+        questions = mongo_service.get_questions_by_transcript([t['id'] for t in transcripts])
+        serializer = self.get_serializer(
+            transcripts,
+            many=True,
+            context={**self.get_serializer_context(), 'questions_by_transcript': questions}
+        )
+        return Response(serializer.data)
+
+    def retrieve(self, request, pk=None):
+        try:
+            transcript = mongo_service.get_transcript(pk, user_id=str(request.user_id))
+        except InvalidId:
+            transcript = None
+        if not transcript:
+            return Response(
+                {'error': 'Transcript not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(self.get_serializer(transcript).data)
+
     @action(detail=False, methods=['post'], url_path='create-from-video')
     def create_from_video(self, request):
         logger.info("Starting transcript creation process")
@@ -209,23 +309,34 @@ class TranscriptViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Try to get transcript from cache first
-            cache_key = f'transcript_{video_id}'
-            cached_data = cache.get(cache_key)
+            # Reuse the shared transcript if any user already added this video
+            video_transcript = mongo_service.get_video_transcript(video_id)
+            segments = None
             
-            if cached_data:
-                logger.info("Found transcript in cache")
-                transcript_data, language = cached_data
+            if video_transcript:
+                logger.info("Found shared transcript for video")
+                formatted_transcript = video_transcript['content']
+                language = video_transcript['language']
             else:
-                # Get transcript from YouTube
-                logger.info("Attempting to fetch transcript from YouTube")
-                transcript_data, language = get_transcript(video_id)
-                logger.info(f"Successfully fetched transcript in {language}")
+                # Try the transcript cache first (shared by the workers on this host)
+                transcript_cache = get_transcript_cache()
+                cached_data = transcript_cache.get(video_id)
                 
-                # Cache the transcript
-                cache.set(cache_key, (transcript_data, language), settings.TRANSCRIPT_CACHE_TIMEOUT)
-            
-            formatted_transcript = format_transcript(transcript_data)
+                if cached_data:
+                    logger.info("Found transcript in cache")
+                    segments, language = cached_data
+                else:
+                    # Get transcript from YouTube
+                    logger.info("Attempting to fetch transcript from YouTube")
+                    transcript_data, language = get_transcript(video_id)
+                    logger.info(f"Successfully fetched transcript in {language}")
+                    segments = format_segments(transcript_data)
+                    
+                    # Cache the transcript in the compact segment format
+                    transcript_cache.set(video_id, segments, language)
+                
+                # The segment table's text is the formatted transcript
+                formatted_transcript = segments.text
             logger.info(f"Formatted transcript length: {len(formatted_transcript)}")
             
             # Save transcript to MongoDB
@@ -234,7 +345,9 @@ class TranscriptViewSet(viewsets.ModelViewSet):
                 user_id=str(user_id),
                 video_id=video_id,
                 content=formatted_transcript,
-                language=language
+                language=language,
+                title=request.data.get('title', 'Untitled'),
+                segments=segments
             )
             logger.info("Successfully saved transcript to MongoDB")
             
@@ -298,6 +411,7 @@ class QuestionViewSet(viewsets.ModelViewSet):
         }))
         for question in questions:
             question['_id'] = str(question['_id'])
+        mongo_service.prime_answer_keys(questions)
         return questions
 
     def get_object(self):
@@ -329,43 +443,57 @@ class QuestionViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            # Get and validate question type
-            question_type = request.data.get('question_type', 'novice')
-            if not qa_service.validate_question_type(question_type):
+            # Get and validate question types; several types share one LLM round-trip
+            question_types = request.data.get('question_types') or [request.data.get('question_type', 'novice')]
+            if isinstance(question_types, str):
+                question_types = [t.strip() for t in question_types.split(',') if t.strip()]
+            if not all(qa_service.validate_question_type(t) for t in question_types):
                 return Response(
                     {'error': f'Invalid question type. Supported types: {qa_service.get_supported_question_types()}'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+            question_types = [t.lower() for t in question_types]
+            
+            # Job mode: hand the LLM call to the worker pool and return immediately
+            if str(request.data.get('async', request.query_params.get('async', ''))).lower() in ('true', '1'):
+                job_id = job_service.enqueue_generation(
+                    transcript_id=transcript_pk,
+                    user_id=str(request.user_id),
+                    question_types=question_types
+                )
+                return Response(
+                    {
+                        'job_id': job_id,
+                        'status': 'queued',
+                        'status_url': f'/api/transcripts/{transcript_pk}/questions/jobs/{job_id}/'
+                    },
+                    status=status.HTTP_202_ACCEPTED
+                )
+            
+            # Playlist videos have precomputed questions; only the missing types go to the LLM
+            created_questions, question_types = question_bank.serve(transcript_pk, transcript, question_types)
+            if created_questions:
+                print(f"Served {len(created_questions)} questions from the question bank")
+            if not question_types:
+                return Response(created_questions, status=status.HTTP_201_CREATED)
             
-            print(f"Generating {question_type} questions for transcript content: {transcript['content'][:100]}...")
+            print(f"Generating {question_types} questions for transcript content: {transcript['content'][:100]}...")
             
             # Generate questions using QA service
-            response = qa_service.generate_questions(
+            generated = qa_service.generate_questions_batch(
                 text=transcript['content'],
-                question_type=question_type
+                question_types=question_types
             )
             
-            questions = response.get('qa_pairs', []) if isinstance(response, dict) else response
-            print(f"Generated {len(questions)} questions")
+            for question_type, questions in generated.items():
+                print(f"Generated {len(questions)} {question_type} questions")
             
-            # Create questions in MongoDB
-            created_questions = []
-            for q in questions:
-                question_data = {
-                    'transcript_id': transcript_pk,
-                    'video_id': transcript['video_id'],
-                    'video_title': transcript.get('title', ''),
-                    'question_text': q['question'],
-                    'answer': q['answer'],
-                    'type': question_type,
-                    'options': q.get('options', []),
-                    'created_at': datetime.utcnow(),
-                    'attempts': 0,
-                    'correct_attempts': 0
-                }
-                result = mongo_service.db.qa_pairs.insert_one(question_data)
-                question_data['_id'] = str(result.inserted_id)
-                created_questions.append(question_data)
+            # Create all questions in MongoDB with one bulk write
+            created_questions += mongo_service.save_generated_questions(
+                transcript_id=transcript_pk,
+                transcript=transcript,
+                generated=generated
+            )
             
             return Response(created_questions, status=status.HTTP_201_CREATED)
             
@@ -376,6 +504,99 @@ class QuestionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=['get', 'post'], url_path='generate-stream',
+            renderer_classes=[JSONRenderer, EventStreamRenderer])
+    def generate_stream(self, request, transcript_pk=None):
+        """
+        Stream generated questions as Server-Sent Events.
+        Sends a `question` event per question as soon as the model finishes it,
+        then saves them all and sends a `done` event with the stored questions.
+        """
+        transcript = mongo_service.get_transcript(transcript_pk, user_id=str(request.user_id))
+        if not transcript:
+            return Response(
+                {'error': 'Transcript not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        params = request.data if request.method == 'POST' else request.query_params
+        question_types = params.get('question_types') or [params.get('question_type', 'novice')]
+        if isinstance(question_types, str):
+            question_types = [t.strip() for t in question_types.split(',') if t.strip()]
+        if not all(qa_service.validate_question_type(t) for t in question_types):
+            return Response(
+                {'error': f'Invalid question type. Supported types: {qa_service.get_supported_question_types()}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        def sse(event, data):
+            return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+        def events():
+            generated = {}
+            try:
+                banked, missing = question_bank.serve(transcript_pk, transcript, [t.lower() for t in question_types])
+                for question in banked:
+                    yield sse('question', question)
+
+                if missing:
+                    for question_type, question in qa_service.stream_questions(transcript['content'], missing):
+                        generated.setdefault(question_type, []).append(question)
+                        yield sse('question', question)
+
+                created_questions = banked + mongo_service.save_generated_questions(
+                    transcript_id=transcript_pk,
+                    transcript=transcript,
+                    generated=generated
+                )
+                yield sse('done', {'questions': created_questions})
+            except Exception as e:
+                print(f"Error streaming questions: {str(e)}")
+                yield sse('error', {'error': str(e)})
+
+        stream = events()
+        if isinstance(request._request, ASGIRequest):
+            # Django's ASGI handler buffers sync iterators whole; hand it an async one
+            stream = iterate_in_thread(stream)
+        response = StreamingHttpResponse(stream, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @action(detail=False, methods=['get'], url_path=r'jobs/(?P<job_id>[^/.]+)')
+    def job_status(self, request, transcript_pk=None, job_id=None):
+        try:
+            job = job_service.get_job(job_id, user_id=str(request.user_id))
+            if not job or job['transcript_id'] != transcript_pk:
+                return Response(
+                    {'error': 'Job not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
+            data = {
+                'job_id': job['id'],
+                'status': job['status'],
+                'question_types': job['question_types'],
+                'attempts': job.get('attempts', 0),
+                'error': job.get('error'),
+                'created_at': job['created_at'],
+                'finished_at': job.get('finished_at')
+            }
+            if job['status'] == 'completed':
+                questions = list(mongo_service.db.qa_pairs.find({
+                    '_id': {'$in': [ObjectId(qid) for qid in job['question_ids']]}
+                }))
+                for question in questions:
+                    question['_id'] = str(question['_id'])
+                data['questions'] = questions
+            return Response(data)
+        except Exception as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
     @action(detail=True, methods=['post'])
     def toggle_favorite(self, request, transcript_pk=None, pk=None):
         try:
@@ -393,7 +614,6 @@ class QuestionViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], url_path='answer')
     def submit_answer(self, request, transcript_pk=None, pk=None):
         try:
-            question = self.get_object()
             submitted_answer = request.data.get('answer', '').strip()
 
             if not submitted_answer:
@@ -402,50 +622,23 @@ class QuestionViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Handle MongoDB question
-            if isinstance(question, dict):
-                correct_answer = question.get('answer', '').strip()
-                is_correct = submitted_answer.lower() == correct_answer.lower()
-                
-                # Update MongoDB document with attempt information
-                mongo_service.db.qa_pairs.update_one(
-                    {'_id': ObjectId(question['_id'])},
-                    {
-                        '$inc': {
-                            'attempts': 1,
-                            'correct_attempts': 1 if is_correct else 0
-                        }
-                    }
+            # Check against the cached answer key and count the attempt in one round-trip
+            result = mongo_service.record_attempt(pk, submitted_answer, transcript_id=transcript_pk)
+            if result is None:
+                return Response(
+                    {'error': 'Question not found'},
+                    status=status.HTTP_404_NOT_FOUND
                 )
-                
-                # Get updated question data
-                updated_question = mongo_service.db.qa_pairs.find_one({'_id': ObjectId(question['_id'])})
-                
-                return Response({
-                    'is_correct': is_correct,
-                    'correct_answer': correct_answer if not is_correct else None,
-                    'feedback': 'Correct!' if is_correct else 'Incorrect. Try again!',
-                    'attempts': updated_question.get('attempts', 1),
-                    'correct_attempts': updated_question.get('correct_attempts', 1 if is_correct else 0)
-                })
-
-            # Handle Django model question
-            else:
-                correct_answer = question.answer.strip()
-                is_correct = submitted_answer.lower() == correct_answer.lower()
-
-                question.attempts = question.attempts + 1
-                if is_correct:
-                    question.correct_attempts = question.correct_attempts + 1
-                question.save()
-
-                return Response({
-                    'is_correct': is_correct,
-                    'correct_answer': correct_answer if not is_correct else None,
-                    'feedback': 'Correct!' if is_correct else 'Incorrect. Try again!',
-                    'attempts': question.attempts,
-                    'correct_attempts': question.correct_attempts
-                })
+            progress_service.record_attempt(str(request.user_id), pk, result)
+
+            is_correct = result['is_correct']
+            return Response({
+                'is_correct': is_correct,
+                'correct_answer': result['correct_answer'] if not is_correct else None,
+                'feedback': 'Correct!' if is_correct else 'Incorrect. Try again!',
+                'attempts': result['attempts'],
+                'correct_attempts': result['correct_attempts']
+            })
 
         except Exception as e:
             return Response(
@@ -457,26 +650,8 @@ class QuestionViewSet(viewsets.ModelViewSet):
 @permission_classes([IsAuthenticated])
 def get_practice_sets(request):
     try:
-        # Get all transcripts for the user from MongoDB
-        transcripts = list(mongo_service.db.transcripts.find({
-            'user_id': str(request.user_id)
-        }))
-        
-        practice_sets = []
-        for transcript in transcripts:
-            transcript['_id'] = str(transcript['_id'])
-            # Get questions for this transcript
-            questions = list(mongo_service.db.qa_pairs.find({
-                'transcript_id': str(transcript['_id'])
-            }))
-            
-            if questions:
-                practice_sets.append({
-                    'id': transcript['_id'],
-                    'title': transcript.get('title', 'Untitled'),
-                    'video_id': transcript['video_id'],
-                    'question_count': len(questions)
-                })
+        # Transcripts with their question counts from a single aggregation
+        practice_sets = mongo_service.get_practice_sets(str(request.user_id))
         
         return Response(practice_sets)
     except Exception as e:
@@ -509,6 +684,7 @@ def get_practice_questions(request, video_id, question_type):
         
         for question in questions:
             question['_id'] = str(question['_id'])
+        mongo_service.prime_answer_keys(questions)
         
         return Response(questions)
     except Exception as e:
@@ -521,41 +697,23 @@ def get_practice_questions(request, video_id, question_type):
 @permission_classes([IsAuthenticated])
 def submit_answer(request, question_id):
     try:
-        # Get question from MongoDB
-        question = mongo_service.db.qa_pairs.find_one({
-            '_id': ObjectId(question_id)
-        })
+        user_answer = request.data.get('answer', '').strip()
         
-        if not question:
+        # Check against the cached answer key and count the attempt in one round-trip
+        result = mongo_service.record_attempt(question_id, user_answer)
+        
+        if not result:
             return Response(
                 {'error': 'Question not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
-        
-        user_answer = request.data.get('answer', '').strip()
-        correct_answer = question['answer'].strip()
-        is_correct = user_answer.lower() == correct_answer.lower()
-        
-        # Update question stats in MongoDB
-        mongo_service.db.qa_pairs.update_one(
-            {'_id': ObjectId(question_id)},
-            {
-                '$inc': {
-                    'attempts': 1,
-                    'correct_attempts': 1 if is_correct else 0
-                }
-            }
-        )
-        
-        updated_question = mongo_service.db.qa_pairs.find_one({
-            '_id': ObjectId(question_id)
-        })
+        progress_service.record_attempt(str(request.user_id), question_id, result)
         
         return Response({
-            'is_correct': is_correct,
-            'correct_answer': correct_answer,
-            'attempts': updated_question['attempts'],
-            'correct_attempts': updated_question['correct_attempts']
+            'is_correct': result['is_correct'],
+            'correct_answer': result['correct_answer'],
+            'attempts': result['attempts'],
+            'correct_attempts': result['correct_attempts']
         })
     except Exception as e:
         return Response(
@@ -563,15 +721,129 @@ def submit_answer(request, question_id):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_progress(request):
+    try:
+        progress = progress_service.get_progress(
+            str(request.user_id),
+            transcript_id=request.query_params.get('transcript_id')
+        )
+        return Response(progress)
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_due_reviews(request):
+    try:
+        # pymongo treats a limit of 0 as no limit
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+    except (TypeError, ValueError):
+        return Response(
+            {'error': 'limit must be an integer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        return Response(review_service.due_cards(str(request.user_id), limit=limit))
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def add_review_deck(request):
+    try:
+        user_id = str(request.user_id)
+        transcript_id = request.data.get('transcript_id')
+        if not transcript_id or not mongo_service.get_transcript(transcript_id, user_id=user_id):
+            return Response(
+                {'error': 'Transcript not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        created = review_service.add_deck(user_id, transcript_id, request.data.get('question_type'))
+        return Response({'created': created}, status=status.HTTP_201_CREATED)
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def submit_review(request):
+    """
+    Grade one card with {question_id, quality} or {question_id, answer},
+    or several with {reviews: [{question_id, quality}, ...]}
+    """
+    try:
+        user_id = str(request.user_id)
+        reviews = request.data.get('reviews')
+        result = None
+
+        if reviews is None:
+            question_id = request.data.get('question_id')
+            quality = request.data.get('quality')
+            answer = request.data.get('answer')
+            if not question_id or (quality is None and answer is None):
+                return Response(
+                    {'error': 'question_id and either quality or answer are required'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            if quality is None:
+                # Answering counts as an attempt and grades the card by correctness
+                result = mongo_service.record_attempt(question_id, answer.strip())
+                if result is None:
+                    return Response(
+                        {'error': 'Question not found'},
+                        status=status.HTTP_404_NOT_FOUND
+                    )
+                progress_service.record_attempt(user_id, question_id, result)
+                quality = CORRECT_QUALITY if result['is_correct'] else INCORRECT_QUALITY
+            reviews = [{'question_id': question_id, 'quality': quality}]
+
+        scheduled = review_service.review(
+            user_id,
+            [(review['question_id'], review['quality']) for review in reviews]
+        )
+        if not scheduled:
+            return Response(
+                {'error': 'No review cards found for these questions'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        response = {'scheduled': scheduled}
+        if result is not None:
+            response['is_correct'] = result['is_correct']
+            response['correct_answer'] = result['correct_answer']
+        return Response(response)
+    except (KeyError, TypeError, ValueError, InvalidId):
+        return Response(
+            {'error': 'Invalid review data'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_transcript_by_video(request, video_id):
     try:
         # Get transcript from MongoDB
-        transcript = mongo_service.db.transcripts.find_one({
-            'video_id': video_id,
-            'user_id': str(request.user_id)
-        })
+        transcript = mongo_service.get_transcript_by_user_and_video(
+            user_id=str(request.user_id),
+            video_id=video_id
+        )
         
         if not transcript:
             return Response(
@@ -3,6 +3,7 @@ import re
 import logging
 import time
 from random import uniform
+from core.segments import SegmentTable
 
 logger = logging.getLogger(__name__)
 
@@ -91,4 +92,8 @@ def format_transcript(transcript_data):
         logger.error(f"Error formatting transcript: {str(e)}")
         import traceback
         logger.error(f"Full traceback: {traceback.format_exc()}")
-        raise 
\ No newline at end of file
+        raise 
+
+def format_segments(transcript_data):
+    """Keep segment timings alongside the text so questions can be traced back to the video."""
+    return SegmentTable.from_entries(transcript_data)
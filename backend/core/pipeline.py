@@ -0,0 +1,176 @@
+import queue
+import threading
+import time
+
+# Marks the end of the input on a stage queue
+_DONE = object()
+
+
+class RateLimiter:
+    """Token bucket shared by every thread that calls one upstream service"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is allowed"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class Stage:
+    """
+    One step of a Pipeline.
+
+    ``func`` receives one item and returns the item for the next stage, or
+    None to drop it. With ``batch_size`` set, ``func`` receives a list of up
+    to that many items instead, flushed at least every ``batch_timeout`` seconds.
+    """
+
+    def __init__(self, name, func, concurrency=1, rate_limiter=None, batch_size=None, batch_timeout=2.0):
+        self.name = name
+        self.func = func
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.stats = {'processed': 0, 'failed': 0, 'dropped': 0, 'busy_seconds': 0.0}
+        self._lock = threading.Lock()
+
+    def _record(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def call(self, payload, count):
+        """Run func on an item or batch, recording timing and failures"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        started = time.monotonic()
+        try:
+            result = self.func(payload)
+        except Exception as e:
+            print(f"Stage {self.name} failed: {str(e)}")
+            self._record('failed', count)
+            return None
+        finally:
+            self._record('busy_seconds', time.monotonic() - started)
+        self._record('processed', count)
+        return result
+
+
+class Pipeline:
+    """
+    Runs items through a sequence of stages, each with its own thread pool.
+
+    Stages are connected by bounded queues, so a slow stage applies
+    backpressure to the ones before it instead of buffering the whole input.
+    """
+
+    def __init__(self, stages, queue_size=8):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.elapsed = 0.0
+
+    def run(self, items):
+        """Process all items and return per-stage stats"""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        remaining = [stage.concurrency for stage in self.stages]
+        lock = threading.Lock()
+        threads = []
+
+        def worker(index):
+            stage = self.stages[index]
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(self.stages) else None
+
+            def emit(result, count):
+                if outbox is None:
+                    return
+                if result is None:
+                    stage._record('dropped', count)
+                    return
+                if stage.batch_size:
+                    # Batch stages may fan back out into individual items
+                    for item in result if isinstance(result, list) else [result]:
+                        outbox.put(item)
+                else:
+                    outbox.put(result)
+
+            if stage.batch_size:
+                self._run_batches(stage, inbox, emit)
+            else:
+                while True:
+                    item = inbox.get()
+                    if item is _DONE:
+                        break
+                    emit(stage.call(item, 1), 1)
+
+            # The last worker of a stage closes the next stage's queue
+            with lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last and outbox is not None:
+                for _ in range(self.stages[index + 1].concurrency):
+                    outbox.put(_DONE)
+
+        started = time.monotonic()
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.concurrency):
+                thread = threading.Thread(target=worker, args=(index,), name=f"{stage.name}-{n}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        for item in items:
+            queues[0].put(item)
+        for _ in range(self.stages[0].concurrency):
+            queues[0].put(_DONE)
+
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.monotonic() - started
+        return self.stats()
+
+    @staticmethod
+    def _run_batches(stage, inbox, emit):
+        batch = []
+        deadline = time.monotonic() + stage.batch_timeout
+        while True:
+            try:
+                item = inbox.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            finished = item is _DONE
+            if item is not None and not finished:
+                batch.append(item)
+            if batch and (finished or len(batch) >= stage.batch_size or time.monotonic() >= deadline):
+                emit(stage.call(batch, len(batch)), len(batch))
+                batch = []
+                deadline = time.monotonic() + stage.batch_timeout
+            if finished:
+                return
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + stage.batch_timeout
+
+    def stats(self):
+        """Per-stage counters and throughput in items per second"""
+        report = {}
+        for stage in self.stages:
+            with stage._lock:
+                stats = dict(stage.stats)
+            stats['concurrency'] = stage.concurrency
+            stats['throughput'] = stats['processed'] / self.elapsed if self.elapsed else 0.0
+            report[stage.name] = stats
+        report['elapsed_seconds'] = self.elapsed
+        return report
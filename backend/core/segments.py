@@ -0,0 +1,153 @@
+import sys
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Binary layout: header, then float32 starts, float32 durations and uint32 offsets, little-endian
+MAGIC = b'SEG1'
+HEADER = struct.Struct('<4sI')
+
+
+def _entry_fields(entry):
+    # youtube_transcript_api returns dicts in older releases and snippet objects in newer ones
+    if isinstance(entry, dict):
+        return entry.get('text', ''), entry.get('start', 0), entry.get('duration', 0)
+    return entry.text, entry.start, entry.duration
+
+
+class SegmentRange:
+    """A run of consecutive segments [first, last) of a SegmentTable"""
+
+    __slots__ = ('table', 'first', 'last')
+
+    def __init__(self, table, first, last):
+        self.table = table
+        self.first = first
+        self.last = max(first, last)
+
+    def __len__(self):
+        return self.last - self.first
+
+    @property
+    def start(self):
+        return self.table.starts[self.first] if len(self) else 0.0
+
+    @property
+    def end(self):
+        if not len(self):
+            return 0.0
+        return self.table.starts[self.last - 1] + self.table.durations[self.last - 1]
+
+    @property
+    def char_span(self):
+        """(start, end) character offsets of the run in the transcript text"""
+        if not len(self):
+            return (0, 0)
+        return self.table.offsets[self.first], self.table.offsets[self.last] - 1
+
+    @property
+    def text(self):
+        begin, end = self.char_span
+        return self.table.text[begin:end]
+
+    def __iter__(self):
+        """Yield (start, duration, text) per segment"""
+        for i in range(self.first, self.last):
+            yield self.table.segment(i)
+
+
+class SegmentTable:
+    """
+    Timed transcript segments in columnar form.
+
+    Starts and durations are float32 arrays and each segment's text is a span
+    of the transcript text, found through an offsets array, so a video's
+    segments cost 12 bytes each on top of the text that is already stored.
+    The text is the segment texts joined with single spaces, i.e. the same
+    string format_transcript produces.
+    """
+
+    __slots__ = ('starts', 'durations', 'offsets', 'text')
+
+    def __init__(self, starts, durations, offsets, text):
+        self.starts = starts
+        self.durations = durations
+        self.offsets = offsets
+        self.text = text
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Build a table from fetched transcript entries ({'text', 'start', 'duration'} or snippet objects)"""
+        starts = array('f')
+        durations = array('f')
+        offsets = array('I', [0])
+        texts = []
+        position = 0
+        for entry in entries:
+            text, start, duration = _entry_fields(entry)
+            starts.append(float(start))
+            durations.append(float(duration))
+            texts.append(text)
+            position += len(text) + 1
+            offsets.append(position)
+        return cls(starts, durations, offsets, ' '.join(texts))
+
+    def to_bytes(self):
+        """Serialize the timing columns (not the text) for storage as BSON binary"""
+        columns = [array('f', self.starts), array('f', self.durations), array('I', self.offsets)]
+        if sys.byteorder == 'big':
+            for column in columns:
+                column.byteswap()
+        return HEADER.pack(MAGIC, len(self.starts)) + b''.join(column.tobytes() for column in columns)
+
+    @classmethod
+    def from_bytes(cls, data, text):
+        """Load a table serialized with to_bytes, for the transcript text it was built from"""
+        magic, count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError('Unknown segment format')
+        position = HEADER.size
+        columns = []
+        for typecode, length in (('f', count), ('f', count), ('I', count + 1)):
+            column = array(typecode)
+            size = column.itemsize * length
+            column.frombytes(data[position:position + size])
+            position += size
+            if sys.byteorder == 'big':
+                column.byteswap()
+            columns.append(column)
+        return cls(columns[0], columns[1], columns[2], text)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def segment(self, i):
+        """(start, duration, text) of one segment"""
+        return self.starts[i], self.durations[i], self.text[self.offsets[i]:self.offsets[i + 1] - 1]
+
+    def all(self):
+        return SegmentRange(self, 0, len(self))
+
+    def slice_time(self, start, end):
+        """Segments overlapping the [start, end) time range in seconds"""
+        first = bisect_right(self.starts, start) - 1
+        if first < 0 or self.starts[first] + self.durations[first] <= start:
+            first += 1
+        return SegmentRange(self, first, bisect_left(self.starts, end))
+
+    def slice_chars(self, start, end):
+        """Segments overlapping the [start, end) character span of the text"""
+        first = max(0, bisect_right(self.offsets, start) - 1)
+        last = min(len(self), bisect_left(self.offsets, end))
+        return SegmentRange(self, first, last)
+
+    def time_at(self, char_offset):
+        """Start time of the segment containing a character offset"""
+        if not len(self):
+            return 0.0
+        return self.starts[min(len(self) - 1, max(0, bisect_right(self.offsets, char_offset) - 1))]
+
+    def find(self, phrase):
+        """Start time of the first segment containing a phrase, or None"""
+        index = self.text.find(phrase)
+        return None if index < 0 else self.time_at(index)
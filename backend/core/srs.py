@@ -0,0 +1,62 @@
+import numpy as np
+
+# SM-2 defaults
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+PASSING_QUALITY = 3
+
+
+def sm2_review(ease, interval, reps, quality):
+    """
+    Apply one SM-2 review to a card.
+
+    Args:
+        ease (float): Ease factor, at least MIN_EASE
+        interval (float): Current interval in days
+        reps (int): Consecutive successful reviews
+        quality (int): Answer grade from 0 (blackout) to 5 (perfect)
+
+    Returns:
+        tuple: (ease, interval, reps, lapsed)
+    """
+    if quality >= PASSING_QUALITY:
+        if reps == 0:
+            interval = 1.0
+        elif reps == 1:
+            interval = 6.0
+        else:
+            interval = float(round(interval * ease))
+        reps += 1
+        lapsed = False
+    else:
+        interval = 1.0
+        reps = 0
+        lapsed = True
+    penalty = 5 - quality
+    ease = max(MIN_EASE, ease + 0.1 - penalty * (0.08 + penalty * 0.02))
+    return ease, interval, reps, lapsed
+
+
+def sm2_review_bulk(ease, interval, reps, quality):
+    """
+    Vectorized sm2_review for a whole deck.
+
+    Args:
+        ease, interval, reps, quality (array-like): One entry per card
+
+    Returns:
+        tuple: numpy arrays (ease, interval, reps, lapsed)
+    """
+    ease = np.asarray(ease, dtype=np.float64)
+    interval = np.asarray(interval, dtype=np.float64)
+    reps = np.asarray(reps, dtype=np.int64)
+    quality = np.asarray(quality, dtype=np.int64)
+
+    passed = quality >= PASSING_QUALITY
+    grown = np.where(reps == 0, 1.0, np.where(reps == 1, 6.0, np.rint(interval * ease)))
+    new_interval = np.where(passed, grown, 1.0)
+    new_reps = np.where(passed, reps + 1, 0)
+
+    penalty = 5 - quality
+    new_ease = np.maximum(MIN_EASE, ease + 0.1 - penalty * (0.08 + penalty * 0.02))
+    return new_ease, new_interval, new_reps, ~passed
@@ -1,3 +1,138 @@
-from django.test import TestCase
+from unittest import mock
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from .bloom import BloomFilter
+from .lru import ByteLRUCache, LRUCache
+from .pipeline import Pipeline, Stage
+from .segments import SegmentTable
+from .srs import sm2_review, sm2_review_bulk
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_expired_entries_are_misses(self):
+        cache = LRUCache(max_entries=2, ttl=10)
+        with mock.patch('core.lru.time.monotonic', return_value=100):
+            cache.set('a', 1)
+        with mock.patch('core.lru.time.monotonic', return_value=111):
+            self.assertIsNone(cache.get('a'))
+
+        stats = cache.stats()
+        self.assertEqual(stats['expirations'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+
+class PipelineTests(SimpleTestCase):
+    def test_runs_items_through_stubbed_stages(self):
+        written = []
+
+        def fetch(video_id):
+            # Every third video has no transcript and is dropped
+            return None if video_id % 3 == 0 else {'video_id': video_id}
+
+        def generate(video):
+            if video['video_id'] == 4:
+                raise ValueError('LLM error')
+            return dict(video, qa_pairs=['q'])
+
+        pipeline = Pipeline(
+            [
+                Stage('fetch', fetch, concurrency=3),
+                Stage('generate', generate, concurrency=2),
+                Stage('write', written.extend, batch_size=4, batch_timeout=0.1)
+            ],
+            queue_size=2
+        )
+        stats = pipeline.run(range(1, 13))
+
+        self.assertEqual(sorted(v['video_id'] for v in written), [1, 2, 5, 7, 8, 10, 11])
+        self.assertEqual(stats['fetch']['processed'], 12)
+        self.assertEqual(stats['fetch']['dropped'], 4)
+        self.assertEqual(stats['generate']['failed'], 1)
+        self.assertEqual(stats['write']['processed'], 7)
+
+
+class SM2Tests(SimpleTestCase):
+    def test_intervals_grow_and_reset(self):
+        ease, interval, reps, lapsed = sm2_review(2.5, 0.0, 0, 5)
+        self.assertEqual((interval, reps, lapsed), (1.0, 1, False))
+        ease, interval, reps, lapsed = sm2_review(ease, interval, reps, 4)
+        self.assertEqual(interval, 6.0)
+        ease, interval, reps, lapsed = sm2_review(ease, interval, reps, 4)
+        self.assertEqual(interval, round(6.0 * ease))
+
+        ease, interval, reps, lapsed = sm2_review(ease, interval, reps, 1)
+        self.assertEqual((interval, reps, lapsed), (1.0, 0, True))
+        self.assertEqual(sm2_review(1.3, 1.0, 0, 0)[0], 1.3)
+
+    def test_bulk_matches_scalar(self):
+        cards = [(2.5, 0.0, 0, 5), (2.2, 6.0, 1, 3), (1.7, 15.0, 4, 4), (2.9, 40.0, 7, 2), (1.3, 3.0, 2, 0)]
+        ease, interval, reps, lapsed = sm2_review_bulk(*zip(*cards))
+
+        for i, card in enumerate(cards):
+            expected = sm2_review(*card)
+            self.assertAlmostEqual(ease[i], expected[0])
+            self.assertEqual((interval[i], reps[i], lapsed[i]), expected[1:])
+
+
+class SegmentTableTests(SimpleTestCase):
+    def setUp(self):
+        self.table = SegmentTable.from_entries([
+            {'text': 'नमस्ते दोस्तों', 'start': 0.0, 'duration': 2.5},
+            {'text': 'आज हम', 'start': 2.5, 'duration': 1.5},
+            {'text': 'हिंदी सीखेंगे।', 'start': 4.0, 'duration': 3.0}
+        ])
+
+    def test_round_trip(self):
+        loaded = SegmentTable.from_bytes(self.table.to_bytes(), self.table.text)
+
+        self.assertEqual(loaded.text, 'नमस्ते दोस्तों आज हम हिंदी सीखेंगे।')
+        self.assertEqual(list(loaded.all()), list(self.table.all()))
+        self.assertEqual(loaded.segment(1), (2.5, 1.5, 'आज हम'))
+
+    def test_slices(self):
+        by_time = self.table.slice_time(3.0, 4.5)
+        self.assertEqual(by_time.text, 'आज हम हिंदी सीखेंगे।')
+        self.assertEqual((by_time.start, by_time.end), (2.5, 7.0))
+
+        by_chars = self.table.slice_chars(15, 17)
+        self.assertEqual(by_chars.text, 'आज हम')
+        self.assertEqual(self.table.find('हिंदी'), 4.0)
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(capacity=2000, error_rate=0.01)
+        for i in range(2000):
+            bloom.add(f'jti-{i}')
+
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(2000)))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class ByteLRUCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used_by_size(self):
+        cache = ByteLRUCache(max_bytes=10)
+        cache.set('a', b'1234')
+        cache.set('b', b'1234')
+        cache.get('a')
+        cache.set('c', b'1234')
+
+        self.assertEqual(cache.get('a'), b'1234')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['bytes'], 8)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+        cache.set('huge', b'x' * 11)
+        self.assertIsNone(cache.get('huge'))
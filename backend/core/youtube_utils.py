@@ -1,5 +1,6 @@
 from youtube_transcript_api import YouTubeTranscriptApi
 from urllib.parse import urlparse, parse_qs
+from .segments import SegmentTable
 
 def get_video_id(url):
     """
@@ -59,4 +60,11 @@ def format_transcript(transcript_data):
     for entry in transcript_data:
         # Each entry is a TranscriptSnippet object with text attribute
         formatted_entries.append(entry.text)
-    return " ".join(formatted_entries) 
\ No newline at end of file
+    return " ".join(formatted_entries) 
+
+def format_segments(transcript_data):
+    """
+    Keep the timing of each entry in a compact SegmentTable
+    Its text is the same string format_transcript returns
+    """
+    return SegmentTable.from_entries(transcript_data)
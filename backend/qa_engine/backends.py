@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import os
+import abc
+
+
+class LLMBackend(abc.ABC):
+    """
+    Where DeepSeekQAModel sends its chat completions.
+
+    A backend builds an OpenAI-shaped client (``client.chat.completions.create``)
+    and names the model. ``cache_name`` goes into response cache keys, so
+    different backends never serve each other's cached questions.
+    """
+
+    name = None
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    @property
+    def cache_name(self):
+        return self.model_name
+
+    @abc.abstractmethod
+    def create_client(self):
+        """Build the OpenAI-shaped chat client for this backend"""
+
+    def describe(self):
+        return {'backend': self.name, 'model': self.model_name}
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """Any server speaking the OpenAI chat API, e.g. a local llama.cpp, Ollama or vLLM server"""
+
+    name = 'openai'
+
+    def __init__(self, base_url=None, model_name=None, api_key=None):
+        super().__init__(model_name or os.getenv('QA_LLM_MODEL', 'local-model'))
+        self.base_url = base_url or os.getenv('QA_LLM_BASE_URL', 'http://localhost:8080/v1')
+        # Local servers usually ignore the key, but the client requires one
+        self.api_key = api_key or os.getenv('QA_LLM_API_KEY', 'not-needed')
+
+    @property
+    def cache_name(self):
+        return f"{self.base_url}|{self.model_name}"
+
+    def create_client(self):
+        from openai import OpenAI
+        from .transport import get_http_client
+        # Retries, deadlines and pooling are handled by the shared transport
+        http_client = get_http_client()
+        return OpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_client=http_client,
+            timeout=http_client.timeout,
+            max_retries=0
+        )
+
+    def describe(self):
+        return dict(super().describe(), base_url=self.base_url)
+
+
+class DeepSeekBackend(OpenAICompatibleBackend):
+    """The hosted DeepSeek API"""
+
+    name = 'deepseek'
+
+    def __init__(self, model_name=None, api_key=None):
+        super().__init__(
+            base_url=os.getenv('DEEPSEEK_BASE_URL', 'https://api.deepseek.com/v1'),
+            model_name=model_name or os.getenv('QA_LLM_MODEL', 'deepseek-chat'),
+            api_key=api_key or os.getenv('DEEPSEEK_API_KEY', '').strip()
+        )
+
+    @property
+    def cache_name(self):
+        # Same keys as before backends existed, so existing cache entries stay valid
+        return self.model_name
+
+    def create_client(self):
+        if not self.api_key:
+            raise ValueError("DEEPSEEK_API_KEY not found in environment variables")
+        if not self.api_key.startswith("sk-"):
+            raise ValueError("Invalid API key format. DeepSeek API key should start with 'sk-'")
+        print(f"Initializing DeepSeek QA model with API key: {self.api_key[:5]}...")
+        return super().create_client()
+
+
+class FakeBackend(LLMBackend):
+    """Deterministic in-process model for development, tests and load tests"""
+
+    name = 'fake'
+
+    def __init__(self, latency=None, tokens_per_second=None, jitter=None, seed=0):
+        super().__init__('fake-chat')
+        self.latency = float(os.getenv('QA_LLM_FAKE_LATENCY', '1.0')) if latency is None else latency
+        self.tokens_per_second = (
+            float(os.getenv('QA_LLM_FAKE_TOKENS_PER_SECOND', '0')) if tokens_per_second is None else tokens_per_second
+        )
+        self.jitter = float(os.getenv('QA_LLM_FAKE_JITTER', '0')) if jitter is None else jitter
+        self.seed = seed
+
+    def create_client(self):
+        from .fake_client import FakeChatClient
+        return FakeChatClient(
+            latency=self.latency,
+            jitter=self.jitter,
+            seed=self.seed,
+            tokens_per_second=self.tokens_per_second
+        )
+
+    def describe(self):
+        return dict(super().describe(), latency=self.latency, tokens_per_second=self.tokens_per_second)
+
+
+BACKENDS = {
+    DeepSeekBackend.name: DeepSeekBackend,
+    OpenAICompatibleBackend.name: OpenAICompatibleBackend,
+    FakeBackend.name: FakeBackend
+}
+
+
+def get_backend(name=None):
+    """Backend named by QA_LLM_BACKEND (deepseek, openai or fake); QA_LLM_FAKE=True still selects fake"""
+    if name is None:
+        name = os.getenv('QA_LLM_BACKEND') or ('fake' if os.getenv('QA_LLM_FAKE', 'False') == 'True' else 'deepseek')
+    try:
+        return BACKENDS[name.lower()]()
+    except KeyError:
+        raise ValueError(f"Unknown LLM backend '{name}'. Supported backends: {', '.join(BACKENDS)}")
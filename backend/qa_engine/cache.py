@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+import os
+import copy
+import json
+import hashlib
+import threading
+import unicodedata
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from core.lru import LRUCache
+from .prompts import PROMPT_VERSION
+
+
+class QAResponseCache:
+    """
+    Content-addressed cache for generated qa_pairs.
+
+    Entries are keyed by a hash of (normalized transcript, question type,
+    prompt version, model name) and kept in an in-process LRU in front of the
+    shared ``qa_cache`` Mongo collection, so a video is only sent to the LLM
+    once across all workers. Mongo entries expire through a TTL index.
+    """
+
+    def __init__(self, max_entries=None, ttl_seconds=None, collection_name='qa_cache'):
+        self.ttl_seconds = ttl_seconds or int(os.getenv('QA_CACHE_TTL_SECONDS', str(60 * 60 * 24 * 30)))
+        self.memory = LRUCache(
+            max_entries=max_entries or int(os.getenv('QA_CACHE_MAX_ENTRIES', '256')),
+            ttl=self.ttl_seconds
+        )
+        self.collection_name = collection_name
+        self.use_mongo = os.getenv('QA_CACHE_MONGO', 'True') == 'True'
+        self._collection = None
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.mongo_hits = 0
+        self.mongo_misses = 0
+
+    @staticmethod
+    def normalize_transcript(text):
+        """Normalize unicode and whitespace so trivially different copies share a key"""
+        return ' '.join(unicodedata.normalize('NFC', text or '').split())
+
+    def make_key(self, transcript_text, question_type, model_name):
+        """Build the cache key for a generation request"""
+        payload = json.dumps(
+            [self.normalize_transcript(transcript_text), question_type, PROMPT_VERSION, model_name],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @property
+    def collection(self):
+        """Lazily connect to the shared cache collection (None when disabled or unavailable)"""
+        if self._collection is None and self.use_mongo:
+            try:
+                from api.services.mongo_service import mongo_service
+                # The TTL index on expires_at is part of the MongoService index registry
+                self._collection = mongo_service.db[self.collection_name]
+            except Exception as e:
+                print(f"QA cache running without MongoDB: {str(e)}")
+                self.use_mongo = False
+        return self._collection
+
+    def begin(self, key):
+        """
+        Register an in-flight generation for a key.
+        Returns (is_leader, event); followers wait on the event and then re-read
+        the cache, so concurrent requests for one transcript make one LLM call.
+        """
+        with self._lock:
+            event = self._inflight.get(key)
+            if event is not None:
+                return False, event
+            event = self._inflight[key] = threading.Event()
+            return True, event
+
+    def end(self, key):
+        """Release followers waiting on an in-flight generation"""
+        with self._lock:
+            event = self._inflight.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def get(self, key):
+        """Get cached qa_pairs for a key, or None"""
+        qa_pairs = self.memory.get(key)
+        if qa_pairs is not None:
+            return copy.deepcopy(qa_pairs)
+
+        collection = self.collection
+        if collection is None:
+            return None
+        try:
+            doc = collection.find_one_and_update(
+                {'_id': key, 'expires_at': {'$gt': datetime.utcnow()}},
+                {'$inc': {'hits': 1}},
+                projection={'qa_pairs': 1},
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            print(f"Error reading QA cache: {str(e)}")
+            return None
+
+        with self._lock:
+            if doc is None:
+                self.mongo_misses += 1
+                return None
+            self.mongo_hits += 1
+        self.memory.set(key, doc['qa_pairs'])
+        return copy.deepcopy(doc['qa_pairs'])
+
+    def set(self, key, qa_pairs, question_type=None, model_name=None):
+        """Store qa_pairs in both tiers"""
+        qa_pairs = copy.deepcopy(qa_pairs)
+        self.memory.set(key, qa_pairs)
+
+        collection = self.collection
+        if collection is None:
+            return
+        now = datetime.utcnow()
+        try:
+            collection.update_one(
+                {'_id': key},
+                {
+                    '$set': {
+                        'qa_pairs': qa_pairs,
+                        'question_type': question_type,
+                        'model': model_name,
+                        'prompt_version': PROMPT_VERSION,
+                        'created_at': now,
+                        'expires_at': now + timedelta(seconds=self.ttl_seconds)
+                    },
+                    '$setOnInsert': {'hits': 0}
+                },
+                upsert=True
+            )
+        except Exception as e:
+            print(f"Error writing QA cache: {str(e)}")
+
+    def stats(self):
+        """Get hit/miss counters for both tiers"""
+        memory = self.memory.stats()
+        with self._lock:
+            return {
+                'memory': memory,
+                'mongo': {
+                    'enabled': self.use_mongo,
+                    'hits': self.mongo_hits,
+                    'misses': self.mongo_misses
+                },
+                'llm_calls_saved': memory['hits'] + self.mongo_hits
+            }
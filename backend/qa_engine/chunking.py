@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+import re
+import hashlib
+import unicodedata
+from itertools import zip_longest
+from .tokens import estimate_tokens
+
+# Sentence ends: danda, double danda and Latin punctuation
+SENTENCE_END = re.compile(r'(?<=[।॥.!?])\s+')
+PUNCTUATION = re.compile(r'[।॥.,!?;:"\'“”‘’()\[\]{}\-]')
+
+DEFAULT_MAX_TOKENS = 2000
+DEFAULT_MIN_TOKENS = 600
+# On average one content-defined boundary every BOUNDARY_DIVISOR sentences past the minimum
+BOUNDARY_DIVISOR = 8
+
+
+def split_sentences(text, max_tokens=DEFAULT_MAX_TOKENS):
+    """
+    Split text into sentences on "।", "॥", ".", "!" and "?".
+    Auto-generated captions often have no punctuation at all, so any sentence
+    longer than max_tokens is further cut into word runs that fit.
+    """
+    sentences = []
+    for sentence in SENTENCE_END.split(' '.join(text.split())):
+        if not sentence:
+            continue
+        if estimate_tokens(sentence) <= max_tokens:
+            sentences.append(sentence)
+            continue
+        words = []
+        for word in sentence.split(' '):
+            if words and estimate_tokens(' '.join(words + [word])) > max_tokens:
+                sentences.append(' '.join(words))
+                words = []
+            words.append(word)
+        if words:
+            sentences.append(' '.join(words))
+    return sentences
+
+
+def _is_boundary(sentence):
+    digest = hashlib.md5(sentence.encode('utf-8')).digest()
+    return digest[0] % BOUNDARY_DIVISOR == 0
+
+
+def _pack(sentences, max_tokens, min_tokens):
+    """Group consecutive sentences into windows; returns (first, last + 1) index ranges"""
+    ranges = []
+    first = 0
+    tokens = 0
+    for i, sentence in enumerate(sentences):
+        sentence_tokens = estimate_tokens(sentence)
+        if i > first and tokens + sentence_tokens > max_tokens:
+            ranges.append((first, i))
+            first, tokens = i, 0
+        tokens += sentence_tokens
+        if tokens >= min_tokens and _is_boundary(sentence):
+            ranges.append((first, i + 1))
+            first, tokens = i + 1, 0
+    if first < len(sentences):
+        ranges.append((first, len(sentences)))
+    return ranges
+
+
+def chunk_sentences(sentences, max_tokens=DEFAULT_MAX_TOKENS, min_tokens=DEFAULT_MIN_TOKENS):
+    """
+    Pack sentences into windows of at most max_tokens.
+
+    Past min_tokens a window also ends after any sentence whose hash marks it
+    as a boundary, so boundaries depend on content rather than position: an
+    edit only changes the windows around it and the others keep their cache keys.
+    """
+    return [' '.join(sentences[first:last]) for first, last in _pack(sentences, max_tokens, min_tokens)]
+
+
+def chunk_text(text, max_tokens=DEFAULT_MAX_TOKENS, min_tokens=DEFAULT_MIN_TOKENS):
+    """Split a transcript into token-budgeted windows; short transcripts stay whole"""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    return chunk_sentences(split_sentences(text, max_tokens), max_tokens, min_tokens)
+
+
+def chunk_segments(segments, max_tokens=DEFAULT_MAX_TOKENS, min_tokens=DEFAULT_MIN_TOKENS):
+    """
+    Split timed caption segments ({'text', 'start', 'duration'}) into windows on segment boundaries
+    Returns:
+        list: {'text', 'start', 'end'} per window
+    """
+    segments = [
+        dict(segment, text=' '.join(segment['text'].split()))
+        for segment in segments if segment.get('text', '').strip()
+    ]
+    texts = [segment['text'] for segment in segments]
+    chunks = []
+    for first, last in _pack(texts, max_tokens, min_tokens):
+        end = segments[last - 1]
+        chunks.append({
+            'text': ' '.join(texts[first:last]),
+            'start': segments[first]['start'],
+            'end': end['start'] + end.get('duration', 0)
+        })
+    return chunks
+
+
+def question_key(question):
+    """Normalized question text used to spot duplicates across chunks"""
+    text = unicodedata.normalize('NFC', str(question.get('question') or question.get('question_text') or ''))
+    return ' '.join(PUNCTUATION.sub(' ', text).lower().split())
+
+
+def merge_questions(chunk_results, limit=None):
+    """
+    Merge per-chunk question lists, dropping duplicates.
+    Chunks are interleaved so a limit keeps questions from across the whole transcript.
+    """
+    merged = []
+    seen = set()
+    for round_ in zip_longest(*chunk_results):
+        for question in round_:
+            if not question:
+                continue
+            key = question_key(question)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            merged.append(question)
+            if limit and len(merged) >= limit:
+                return merged
+    return merged
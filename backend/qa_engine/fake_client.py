@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import json
+import random
+import re
+import time
+import threading
+from types import SimpleNamespace
+from .tokens import estimate_tokens
+
+
+class FakeChatClient:
+    """
+    Offline stand-in for the OpenAI client used by DeepSeekQAModel.
+
+    Mirrors the ``client.chat.completions.create(...)`` call shape and returns
+    deterministic qa_pairs built from the transcript words, after sleeping for
+    ``latency`` seconds to imitate the upstream round-trip. With
+    ``tokens_per_second`` set, ``latency`` is the time to the first token and
+    the completion then takes as long as that throughput allows. With
+    ``stream=True`` the reply arrives in chunks paced the same way.
+    """
+
+    def __init__(self, latency=1.0, jitter=0.0, seed=0, tokens_per_second=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.seed = seed
+        self.tokens_per_second = tokens_per_second
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _generation_time(self, text):
+        return estimate_tokens(text) / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _create(self, model=None, messages=None, stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+        user_input = messages[-1]['content'] if messages else ''
+        delay = self.latency + random.uniform(0, self.jitter) if self.jitter else self.latency
+        content = json.dumps(self._build_response(user_input), ensure_ascii=False)
+        if stream:
+            return self._stream(model, content, delay)
+
+        delay += self._generation_time(content)
+        if delay > 0:
+            time.sleep(delay)
+        message = SimpleNamespace(role='assistant', content=content)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(index=0, message=message, finish_reason='stop')]
+        )
+
+    def _stream(self, model, content, delay, chunk_size=16):
+        """Yield the content in chunks like a token stream"""
+        pieces = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+        if self.tokens_per_second and delay > 0:
+            time.sleep(delay)
+        for piece in pieces:
+            if self.tokens_per_second:
+                time.sleep(self._generation_time(piece))
+            elif delay > 0:
+                # Without a throughput the latency is spread across the chunks
+                time.sleep(delay / len(pieces))
+            delta = SimpleNamespace(role='assistant', content=piece)
+            yield SimpleNamespace(
+                model=model,
+                choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)]
+            )
+
+    def _build_response(self, user_input):
+        """Build a qa_pairs payload for the question type(s) requested in the prompt"""
+        transcript = user_input.split('Transcript Text:')[-1]
+        words = transcript.split() or ['पाठ']
+
+        batch = re.search(r'Include every requested type as a key: ([\w, ]+)', user_input)
+        if batch:
+            return {
+                question_type.strip(): self._build_pairs(question_type.strip(), transcript, words)
+                for question_type in batch.group(1).split(',')
+            }
+
+        match = re.search(r'"type":\s*"(novice|mcq|fill_blanks)"', user_input)
+        question_type = match.group(1) if match else 'novice'
+        return {'qa_pairs': self._build_pairs(question_type, transcript, words)}
+
+    def _build_pairs(self, question_type, transcript, words):
+        rng = random.Random(f"{self.seed}:{question_type}:{transcript}")
+
+        qa_pairs = []
+        for i in range(3):
+            answer = rng.choice(words)
+            pair = {
+                'question': f"प्रश्न {i + 1}: पाठ में '{answer}' का क्या महत्व है?",
+                'answer': answer,
+                'type': question_type
+            }
+            if question_type == 'fill_blanks':
+                pair['question'] = f"{' '.join(rng.sample(words, min(3, len(words))))} ____"
+            if question_type == 'mcq':
+                distractors = [w for w in rng.sample(words, min(4, len(words))) if w != answer][:3]
+                pair['options'] = [answer] + distractors
+            qa_pairs.append(pair)
+        return qa_pairs
@@ -47,6 +47,72 @@ Example:
     }]
 """
 
+# Bump whenever the prompts below change so cached LLM responses are not reused
+PROMPT_VERSION = 1
+
+question_prompts = {
+    "novice": """Generate 3-5 Novice level questions in JSON format.
+        Return questions in this format:
+        {
+            "qa_pairs": [
+                {
+                    "question": "question text here",
+                    "answer": "answer text here",
+                    "type": "novice"
+                }
+            ]
+        }""",
+    
+    "mcq": """Generate 3-5 Multiple Choice Questions (MCQs) in JSON format.
+        Return questions in this format:
+        {
+            "qa_pairs": [
+                {
+                    "question": "question text here",
+                    "answer": "correct answer here",
+                    "type": "mcq",
+                    "options": ["correct answer", "wrong option 1", "wrong option 2", "wrong option 3"]
+                }
+            ]
+        }""",
+    
+    "fill_blanks": """Generate 3-5 Fill in the Blanks questions in JSON format.
+        For each question, take a sentence from the text and replace a key word or phrase with '____'.
+        Return questions in this format:
+        {
+            "qa_pairs": [
+                {
+                    "question": "sentence with ____ for blank",
+                    "answer": "word or phrase that goes in blank",
+                    "type": "fill_blanks"
+                }
+            ]
+        }"""
+}
+
+# Used by generate_questions_batch to request several question types in one call
+question_type_instructions = {
+    "novice": "3-5 Novice level questions, each with \"question\" and \"answer\"",
+    "mcq": "3-5 Multiple Choice Questions (MCQs), each with \"question\", \"answer\" and \"options\" "
+           "(the correct answer plus 3 wrong options)",
+    "fill_blanks": "3-5 Fill in the Blanks questions: take a sentence from the text and replace a key word "
+                   "or phrase with '____'; \"answer\" is the word or phrase that goes in the blank"
+}
+
+batch_question_prompt = """Generate questions of each of the following types in JSON format:
+        {type_instructions}
+        Return ONE JSON object that uses the question type as the key and the list of questions as the value:
+        {{
+            "<question type>": [
+                {{
+                    "question": "question text here",
+                    "answer": "answer text here",
+                    "type": "<question type>"
+                }}
+            ]
+        }}
+        Include every requested type as a key: {type_keys}"""
+
 assitant = """
 
 """
\ No newline at end of file
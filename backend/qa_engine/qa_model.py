@@ -1,9 +1,15 @@
 # -*- coding: utf-8 -*-
 import os
-from openai import OpenAI
 from dotenv import load_dotenv
-from .prompts import system
+from .prompts import system, question_prompts, question_type_instructions, batch_question_prompt
+from .cache import QAResponseCache
+from .stream_parser import QAPairStreamParser
+from .chunking import chunk_text, merge_questions, question_key
+from .tokens import token_estimator, BudgetPlanner, UsageMeter
+from .backends import get_backend
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
+import time
 
 # Load environment variables from root directory
 root_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
@@ -22,92 +28,111 @@ class DeepSeekQAModel:
         if not self._is_initialized:
             self._is_initialized = True
             self.client = None
+            self.cache = QAResponseCache()
+            # Long transcripts are split into windows generated in parallel
+            self.chunk_max_tokens = int(os.getenv("QA_CHUNK_MAX_TOKENS", "2000"))
+            self.chunk_concurrency = int(os.getenv("QA_CHUNK_CONCURRENCY", "4"))
+            self.max_merged_questions = int(os.getenv("QA_MAX_MERGED_QUESTIONS", "20"))
+            # Token accounting: chunk sizes and max_tokens come from the budget planner
+            self.tokens = token_estimator
+            self.budget = BudgetPlanner(self.tokens, max_chunk_tokens=self.chunk_max_tokens)
+            self.usage = UsageMeter()
+            self.use_backend(get_backend())
+
+    def use_backend(self, backend):
+        """Switch the LLM backend; its cache name keeps cached responses per backend"""
+        self.backend = backend
+        self.model_name = backend.model_name
+        self.cache_model_name = backend.cache_name
+        self.client = None
 
     def _ensure_initialized(self):
         """Lazy initialization of the API client"""
         if self.client is None:
-            api_key = os.getenv("DEEPSEEK_API_KEY", "").strip()
-            if not api_key:
-                raise ValueError("DEEPSEEK_API_KEY not found in environment variables")
-                
-            if not api_key.startswith("sk-"):
-                raise ValueError("Invalid API key format. DeepSeek API key should start with 'sk-'")
-                
-            print(f"Initializing DeepSeek QA model with API key: {api_key[:5]}...")
-                
-            self.client = OpenAI(
-                api_key=api_key,
-                base_url="https://api.deepseek.com/v1"
-            )
+            self.client = self.backend.create_client()
 
-    def _query_model(self, user_input):
-        """Internal method to query the DeepSeek model"""
-        self._ensure_initialized()
+    def _messages(self, user_input, max_tokens=None):
+        """Build the chat messages and check the request fits the context window"""
         messages = [
             {"role": "system", "content": system},
             {"role": "user", "content": user_input}
         ]
+        estimated = self.tokens.estimate_messages(messages)
+        if estimated + (max_tokens or 0) > self.budget.context_window:
+            raise ValueError(
+                f"Request of ~{estimated} prompt tokens and {max_tokens} completion tokens "
+                f"exceeds the {self.budget.context_window} token context window"
+            )
+        return messages, estimated
+
+    def _query_model(self, user_input, max_tokens=None):
+        """Internal method to query the DeepSeek model"""
+        self._ensure_initialized()
+        messages, estimated = self._messages(user_input, max_tokens)
+        options = {"max_tokens": max_tokens} if max_tokens else {}
+        started = time.monotonic()
         response = self.client.chat.completions.create(
-            model="deepseek-chat",
+            model=self.model_name,
             messages=messages,
-            stream=False
+            stream=False,
+            **options
+        )
+        content = response.choices[0].message.content
+        self.usage.record(
+            estimated, getattr(response, 'usage', None), time.monotonic() - started, content, self.tokens
         )
-        return response.choices[0].message.content
+        return content
 
-    def generate_questions(self, transcript_text, question_type="novice"):
-        """
-        Generate questions from transcript text
-        Args:
-            transcript_text (str): The transcript text to generate questions from
-            question_type (str): Type of questions to generate (novice/mcq/fill_blanks)
-        Returns:
-            dict: JSON response containing generated questions
-        """
-        prompt_templates = {
-            "novice": """Generate 3-5 Novice level questions in JSON format.
-                Return questions in this format:
-                {
-                    "qa_pairs": [
-                        {
-                            "question": "question text here",
-                            "answer": "answer text here",
-                            "type": "novice"
-                        }
-                    ]
-                }""",
-            
-            "mcq": """Generate 3-5 Multiple Choice Questions (MCQs) in JSON format.
-                Return questions in this format:
-                {
-                    "qa_pairs": [
-                        {
-                            "question": "question text here",
-                            "answer": "correct answer here",
-                            "type": "mcq",
-                            "options": ["correct answer", "wrong option 1", "wrong option 2", "wrong option 3"]
-                        }
-                    ]
-                }""",
-            
-            "fill_blanks": """Generate 3-5 Fill in the Blanks questions in JSON format.
-                For each question, take a sentence from the text and replace a key word or phrase with '____'.
-                Return questions in this format:
-                {
-                    "qa_pairs": [
-                        {
-                            "question": "sentence with ____ for blank",
-                            "answer": "word or phrase that goes in blank",
-                            "type": "fill_blanks"
-                        }
-                    ]
-                }"""
-        }
+    def _stream_model(self, user_input, max_tokens=None):
+        """Query the DeepSeek model and yield the completion text as it is generated"""
+        self._ensure_initialized()
+        messages, estimated = self._messages(user_input, max_tokens)
+        options = {"max_tokens": max_tokens} if max_tokens else {}
+        started = time.monotonic()
+        stream = self.client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            stream=True,
+            # Sent as a raw body field: the pinned openai client predates the stream_options argument
+            extra_body={"stream_options": {"include_usage": True}},
+            **options
+        )
+        usage = None
+        parts = []
+        for chunk in stream:
+            # With include_usage the last chunk has no choices, only usage
+            if getattr(chunk, 'usage', None) is not None:
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+        self.usage.record(estimated, usage, time.monotonic() - started, ''.join(parts), self.tokens)
+
+    def _question_prompt(self, transcript_text, question_type):
+        """Build the generation prompt for one question type"""
+        return f"""Please generate questions based on the following transcript text.
+        Return ONLY a JSON object with NO additional text or formatting.
+        
+        Instructions:
+        1. {question_prompts.get(question_type, question_prompts['novice'])}
+        2. Ensure all text is in Hindi
+        3. Make questions progressively more challenging
+        4. Return ONLY the JSON object, no other text
+        5. Ensure the JSON is properly formatted and valid
+        
+        Transcript Text:
+        {transcript_text}"""
 
-        prompt = f"""Please generate questions based on the following transcript text.
+    def _batch_prompt(self, transcript_text, question_types):
+        """Build the generation prompt for several question types at once"""
+        type_instructions = '\n        '.join(
+            f"- {question_type}: {question_type_instructions[question_type]}" for question_type in question_types
+        )
+        return f"""Please generate questions based on the following transcript text.
         Return ONLY a JSON object with NO additional text or formatting.
         
         Instructions:
-        1. {prompt_templates.get(question_type, prompt_templates['novice'])}
+        1. {batch_question_prompt.format(type_instructions=type_instructions, type_keys=', '.join(question_types))}
         2. Ensure all text is in Hindi
         3. Make questions progressively more challenging
         4. Return ONLY the JSON object, no other text
@@ -116,8 +141,51 @@ class DeepSeekQAModel:
         Transcript Text:
         {transcript_text}"""
 
+    def generate_questions(self, transcript_text, question_type="novice"):
+        """
+        Generate questions from transcript text, served from the response cache when possible
+        Args:
+            transcript_text (str): The transcript text to generate questions from
+            question_type (str): Type of questions to generate (novice/mcq/fill_blanks)
+        Returns:
+            dict: JSON response containing generated questions
+        """
+        chunks = self._chunks(transcript_text, [question_type])
+        if len(chunks) > 1:
+            return self._generate_chunked(chunks, [question_type])[question_type]
+        return self._cached_generate(transcript_text, question_type)
+
+    def _cached_generate(self, transcript_text, question_type):
+        """Generate questions for text that fits in one prompt, through the response cache"""
+        cache_key = self.cache.make_key(transcript_text, question_type, self.cache_model_name)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        is_leader, inflight = self.cache.begin(cache_key)
+        if not is_leader:
+            # Same transcript is being generated by another request; reuse its result
+            inflight.wait(timeout=300)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            response = self._query_model(prompt)
+            result = self._generate_questions(transcript_text, question_type)
+            # Only successful, non-empty generations are worth sharing
+            if isinstance(result, list) and result:
+                self.cache.set(cache_key, result, question_type, self.model_name)
+            return result
+        finally:
+            if is_leader:
+                self.cache.end(cache_key)
+
+    def _generate_questions(self, transcript_text, question_type="novice"):
+        """Query the model for questions without consulting the cache"""
+        prompt = self._question_prompt(transcript_text, question_type)
+
+        try:
+            response = self._query_model(prompt, max_tokens=self.budget.max_tokens_for([question_type]))
             
             # If response is already a list or dict, process it directly
             if isinstance(response, (list, dict)):
@@ -151,6 +219,240 @@ class DeepSeekQAModel:
             print(f"Error in generate_questions: {str(e)}")
             raise ValueError(f"Failed to generate questions: {str(e)}")
 
+    def generate_questions_batch(self, transcript_text, question_types):
+        """
+        Generate several question types from one LLM call
+        Args:
+            transcript_text (str): The transcript text to generate questions from
+            question_types (list): Question types to generate (novice/mcq/fill_blanks)
+        Returns:
+            dict: Mapping of question type to its list of questions
+        """
+        chunks = self._chunks(transcript_text, question_types)
+        if len(chunks) > 1:
+            return self._generate_chunked(chunks, question_types)
+        return self._generate_batch(transcript_text, question_types)
+
+    def _generate_batch(self, transcript_text, question_types):
+        """Generate several question types for text that fits in one prompt"""
+        results = {}
+        missing = []
+        for question_type in dict.fromkeys(question_types):
+            cached = self.cache.get(self.cache.make_key(transcript_text, question_type, self.cache_model_name))
+            if cached is not None:
+                results[question_type] = cached
+            else:
+                missing.append(question_type)
+
+        if len(missing) == 1:
+            results[missing[0]] = self._as_list(self._cached_generate(transcript_text, missing[0]))
+            return results
+        if not missing:
+            return results
+
+        prompt = self._batch_prompt(transcript_text, missing)
+
+        try:
+            parsed = self._parse_batch_response(
+                self._query_model(prompt, max_tokens=self.budget.max_tokens_for(missing)), missing
+            )
+        except Exception as e:
+            print(f"Error in generate_questions_batch: {str(e)}")
+            parsed = {}
+
+        for question_type in missing:
+            qa_pairs = parsed.get(question_type)
+            if qa_pairs:
+                results[question_type] = qa_pairs
+                self.cache.set(
+                    self.cache.make_key(transcript_text, question_type, self.cache_model_name),
+                    qa_pairs, question_type, self.model_name
+                )
+            else:
+                # Fall back to a dedicated call for types the batched reply did not cover
+                print(f"Batched reply had no usable {question_type} questions, generating them separately")
+                results[question_type] = self._as_list(self._cached_generate(transcript_text, question_type))
+        return results
+
+    def stream_questions(self, transcript_text, question_types):
+        """
+        Generate questions and yield each one as soon as the model finishes writing it
+        Args:
+            transcript_text (str): The transcript text to generate questions from
+            question_types (list): Question types to generate (novice/mcq/fill_blanks)
+        Yields:
+            tuple: (question_type, qa_pair)
+        """
+        chunks = self._chunks(transcript_text, question_types)
+        if len(chunks) > 1:
+            yield from self._stream_chunked(chunks, question_types)
+            return
+
+        missing = []
+        for question_type in dict.fromkeys(question_types):
+            cached = self.cache.get(self.cache.make_key(transcript_text, question_type, self.cache_model_name))
+            if cached is None:
+                missing.append(question_type)
+                continue
+            for qa_pair in cached:
+                yield question_type, qa_pair
+        if not missing:
+            return
+
+        if len(missing) == 1:
+            prompt = self._question_prompt(transcript_text, missing[0])
+        else:
+            prompt = self._batch_prompt(transcript_text, missing)
+
+        streamed = {question_type: [] for question_type in missing}
+        parser = QAPairStreamParser()
+        finished = False
+        try:
+            for chunk in self._stream_model(prompt, max_tokens=self.budget.max_tokens_for(missing)):
+                for key, pair in parser.feed(chunk):
+                    if not isinstance(pair, dict) or not pair.get('question') or not pair.get('answer'):
+                        continue
+                    # Single-type replies use "qa_pairs"; batched replies are keyed by type
+                    if len(missing) == 1:
+                        question_type = missing[0]
+                    else:
+                        question_type = key if key in streamed else pair.get('type')
+                    if question_type not in streamed:
+                        continue
+                    pair = dict(pair, type=question_type)
+                    streamed[question_type].append(pair)
+                    yield question_type, pair
+            finished = True
+        except Exception as e:
+            print(f"Error in stream_questions: {str(e)}")
+
+        for question_type, qa_pairs in streamed.items():
+            if qa_pairs:
+                # A failed or cut-off stream would otherwise be served from the cache as the full set
+                if not (finished and parser.closed):
+                    continue
+                self.cache.set(
+                    self.cache.make_key(transcript_text, question_type, self.cache_model_name),
+                    qa_pairs, question_type, self.model_name
+                )
+            else:
+                # Same fallback as the batched call: a dedicated non-streamed request
+                print(f"Stream had no usable {question_type} questions, generating them separately")
+                for qa_pair in self._as_list(self._cached_generate(transcript_text, question_type)):
+                    yield question_type, qa_pair
+
+    def _prompt_overhead(self, question_types):
+        """Estimated prompt tokens of a generation request, excluding the transcript"""
+        if len(question_types) > 1:
+            prompt = self._batch_prompt('', question_types)
+        else:
+            prompt = self._question_prompt('', question_types[0])
+        return self.tokens.estimate_messages([
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ])
+
+    def _chunks(self, transcript_text, question_types):
+        """Split a transcript into prompt-sized windows (a single window when it already fits)"""
+        max_tokens = self.budget.chunk_tokens_for(self._prompt_overhead(question_types), question_types)
+        return chunk_text(transcript_text, max_tokens=max_tokens, min_tokens=max_tokens * 3 // 10)
+
+    def plan(self, transcript_text, question_types):
+        """Token, chunk and cost budget for generating question_types from a transcript"""
+        return self.budget.plan(transcript_text, self._prompt_overhead(question_types), question_types)
+
+    def _generate_chunks(self, chunks, question_types):
+        """Run _generate_batch over chunks in parallel; yields each chunk's result as it completes"""
+        with ThreadPoolExecutor(max_workers=min(self.chunk_concurrency, len(chunks))) as pool:
+            futures = {
+                pool.submit(self._generate_batch, chunk, question_types): index
+                for index, chunk in enumerate(chunks)
+            }
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    print(f"Chunk {futures[future] + 1}/{len(chunks)} failed: {str(e)}")
+                    yield futures[future], None
+
+    def _generate_chunked(self, chunks, question_types):
+        """
+        Map-reduce generation for long transcripts: every chunk is generated (and
+        cached) separately, then the questions are deduplicated and merged
+        """
+        print(f"Generating questions for {len(chunks)} transcript chunks")
+        results = [None] * len(chunks)
+        for index, result in self._generate_chunks(chunks, question_types):
+            results[index] = result
+        if all(result is None for result in results):
+            raise ValueError(f"Failed to generate questions for all {len(chunks)} transcript chunks")
+
+        return {
+            question_type: merge_questions(
+                [(result or {}).get(question_type, []) for result in results],
+                limit=self.max_merged_questions
+            )
+            for question_type in dict.fromkeys(question_types)
+        }
+
+    def _stream_chunked(self, chunks, question_types):
+        """Yield (question_type, qa_pair) from each chunk as soon as the chunk is done"""
+        seen = set()
+        counts = {}
+        for _, result in self._generate_chunks(chunks, question_types):
+            for question_type, qa_pairs in (result or {}).items():
+                for qa_pair in qa_pairs:
+                    key = (question_type, question_key(qa_pair))
+                    if key in seen or counts.get(question_type, 0) >= self.max_merged_questions:
+                        continue
+                    seen.add(key)
+                    counts[question_type] = counts.get(question_type, 0) + 1
+                    yield question_type, qa_pair
+
+    @staticmethod
+    def _parse_batch_response(response, question_types):
+        """Split a batched JSON reply into per-type lists of valid qa_pairs"""
+        json_start = response.find('{')
+        json_end = response.rfind('}') + 1
+        if json_start < 0 or json_end <= json_start:
+            print("No JSON found in batched response:", response)
+            return {}
+        try:
+            data = json.loads(response[json_start:json_end])
+        except json.JSONDecodeError as e:
+            print(f"Failed to parse batched JSON response: {str(e)}")
+            return {}
+        if not isinstance(data, dict):
+            return {}
+
+        # Accept a flat qa_pairs list too, grouped by each pair's type
+        if isinstance(data.get('qa_pairs'), list):
+            grouped = {}
+            for pair in data['qa_pairs']:
+                if isinstance(pair, dict):
+                    grouped.setdefault(pair.get('type'), []).append(pair)
+            data = grouped
+
+        parsed = {}
+        for question_type in question_types:
+            pairs = data.get(question_type)
+            if not isinstance(pairs, list):
+                continue
+            valid = [
+                dict(pair, type=question_type) for pair in pairs
+                if isinstance(pair, dict) and pair.get('question') and pair.get('answer')
+            ]
+            if valid:
+                parsed[question_type] = valid
+        return parsed
+
+    @staticmethod
+    def _as_list(response):
+        """Normalize the generate_questions return value to a list of qa_pairs"""
+        if isinstance(response, dict):
+            response = response.get('qa_pairs', [])
+        return response if isinstance(response, list) else []
+
     def answer_question(self, context, question):
         """
         Answer a question based on the context
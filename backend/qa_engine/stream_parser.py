@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import json
+
+
+class QAPairStreamParser:
+    """
+    Incremental parser for streamed qa_pairs JSON.
+
+    Feed it completion chunks as they arrive; it returns every object that
+    closed inside a top-level list, e.g. each pair of ``{"qa_pairs": [...]}``
+    or of a batched ``{"mcq": [...], "novice": [...]}`` reply, together with
+    the key of the list it belongs to. Text outside the JSON (code fences,
+    chatter) is ignored and only the object being read is buffered.
+    """
+
+    def __init__(self):
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._capture = None
+        self._capture_depth = 0
+        self._string = None
+        self._key = None
+        self.errors = 0
+        # Set once the top-level JSON value has been read to its closing bracket
+        self.closed = False
+
+    def feed(self, chunk):
+        """
+        Consume a chunk of the completion
+        Returns:
+            list: (key, object) tuples for objects completed by this chunk
+        """
+        completed = []
+        for char in chunk:
+            if self._capture is not None:
+                self._capture.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._string is not None:
+                        # Strings read directly in the top-level object are the list keys
+                        self._key = ''.join(self._string)
+                        self._string = None
+                elif self._string is not None:
+                    self._string.append(char)
+                continue
+
+            if char == '"':
+                if not self._stack:
+                    continue
+                self._in_string = True
+                if self._capture is None and self._stack == ['{']:
+                    self._string = []
+            elif char in '{[':
+                if self._capture is None and char == '{' and self._stack and self._stack[-1] == '[':
+                    self._capture = [char]
+                    self._capture_depth = len(self._stack)
+                self._stack.append(char)
+            elif char in '}]':
+                if not self._stack:
+                    continue
+                self._stack.pop()
+                if not self._stack:
+                    self.closed = True
+                if self._capture is not None and len(self._stack) == self._capture_depth:
+                    text = ''.join(self._capture)
+                    self._capture = None
+                    try:
+                        completed.append((self._key, json.loads(text)))
+                    except json.JSONDecodeError:
+                        self.errors += 1
+        return completed
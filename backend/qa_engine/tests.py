@@ -0,0 +1,242 @@
+import json
+import time
+import httpx
+from django.test import SimpleTestCase
+from unittest import mock
+
+from openai import OpenAI
+
+from .backends import FakeBackend, OpenAICompatibleBackend, get_backend
+from .chunking import chunk_text, merge_questions, split_sentences
+from .qa_model import DeepSeekQAModel
+from .tokens import (
+    DEFAULT_RATES, REFERENCE_COUNTS_PATH, BudgetPlanner, TokenEstimator, estimate_error, estimate_tokens,
+    load_corpus, token_estimator
+)
+from .transport import CircuitBreaker, CircuitOpenError, RetryTransport
+
+
+def mock_upstream(statuses):
+    """Local stand-in for the LLM API answering with the given status codes in turn"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        status = statuses[min(len(calls), len(statuses)) - 1]
+        return httpx.Response(status, json={'choices': []})
+
+    return httpx.MockTransport(handler), calls
+
+
+class RetryTransportTests(SimpleTestCase):
+    def make_client(self, statuses, **kwargs):
+        upstream, calls = mock_upstream(statuses)
+        retry = RetryTransport(upstream, sleep=lambda seconds: None, **kwargs)
+        return httpx.Client(transport=retry, base_url='http://llm.test'), retry, calls
+
+    def test_retries_rate_limits_and_server_errors(self):
+        client, retry, calls = self.make_client([429, 503, 200])
+
+        response = client.post('/v1/chat/completions', json={})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(retry.stats['retries'], 2)
+
+    def test_gives_up_after_max_retries(self):
+        client, retry, calls = self.make_client([500], max_retries=2)
+
+        response = client.post('/v1/chat/completions', json={})
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(retry.stats['failures'], 1)
+
+    def test_client_errors_are_not_retried(self):
+        client, _, calls = self.make_client([400])
+
+        self.assertEqual(client.post('/v1/chat/completions', json={}).status_code, 400)
+        self.assertEqual(len(calls), 1)
+
+    def test_open_circuit_rejects_without_calling_upstream(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        client, _, calls = self.make_client([502], max_retries=0, breaker=breaker)
+
+        client.post('/v1/chat/completions', json={})
+        client.post('/v1/chat/completions', json={})
+        with self.assertRaises(CircuitOpenError):
+            client.post('/v1/chat/completions', json={})
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(breaker.stats()['state'], CircuitBreaker.OPEN)
+
+
+    def test_deadline_bounds_timeouts_and_streamed_body(self):
+        seen = []
+
+        def trickle():
+            for _ in range(5):
+                time.sleep(0.05)
+                yield b'data: {}\n\n'
+
+        def handler(request):
+            seen.append(request.extensions['timeout'])
+            return httpx.Response(200, content=trickle())
+
+        retry = RetryTransport(httpx.MockTransport(handler), deadline=0.1)
+        client = httpx.Client(transport=retry, base_url='http://llm.test', timeout=90)
+
+        with self.assertRaises(httpx.ReadTimeout):
+            client.post('/v1/chat/completions', json={})
+        self.assertLessEqual(seen[0]['read'], 0.1)
+
+
+class BackendTests(SimpleTestCase):
+    def test_backend_selected_from_environment(self):
+        with mock.patch.dict('os.environ', {'QA_LLM_BACKEND': 'fake'}):
+            self.assertIsInstance(get_backend(), FakeBackend)
+        with mock.patch.dict('os.environ', {'QA_LLM_BACKEND': 'openai', 'QA_LLM_MODEL': 'qwen2.5'}):
+            backend = get_backend()
+            self.assertIsInstance(backend, OpenAICompatibleBackend)
+            self.assertIn('qwen2.5', backend.cache_name)
+        with self.assertRaises(ValueError):
+            get_backend('unknown')
+
+    def test_fake_backend_is_deterministic(self):
+        messages = [{'role': 'user', 'content': 'Transcript Text: यह एक वाक्य है।'}]
+        replies = [
+            FakeBackend(latency=0, tokens_per_second=0).create_client()
+            .chat.completions.create(model='fake-chat', messages=messages)
+            .choices[0].message.content
+            for _ in range(2)
+        ]
+        self.assertEqual(replies[0], replies[1])
+        json.loads(replies[0])
+
+
+class ChunkingTests(SimpleTestCase):
+    transcript = ' '.join(f'आज हम पाठ {i} में नए शब्द सीखेंगे और उनका अभ्यास करेंगे।' for i in range(200))
+
+    def test_sentences_end_at_danda_and_latin_punctuation(self):
+        text = 'पहला वाक्य है। क्या यह दूसरा है? हाँ!  यह तीसरा॥ Last one.'
+        self.assertEqual(
+            split_sentences(text),
+            ['पहला वाक्य है।', 'क्या यह दूसरा है?', 'हाँ!', 'यह तीसरा॥', 'Last one.']
+        )
+
+    def test_unpunctuated_captions_are_cut_to_the_budget(self):
+        captions = ' '.join(['नमस्ते दोस्तों आज हम पढ़ेंगे'] * 100)
+        pieces = split_sentences(captions, max_tokens=50)
+        self.assertGreater(len(pieces), 1)
+        self.assertTrue(all(estimate_tokens(piece) <= 50 for piece in pieces))
+        self.assertEqual(' '.join(pieces), captions)
+
+    def test_chunks_cover_the_transcript_within_budget(self):
+        self.assertEqual(chunk_text('छोटा पाठ।'), ['छोटा पाठ।'])
+        chunks = chunk_text(self.transcript, max_tokens=300, min_tokens=100)
+        self.assertGreater(len(chunks), 5)
+        self.assertTrue(all(estimate_tokens(chunk) <= 300 for chunk in chunks))
+        self.assertEqual(' '.join(chunks), self.transcript)
+
+    def test_edit_at_the_start_keeps_later_chunks(self):
+        before = chunk_text(self.transcript, max_tokens=300, min_tokens=100)
+        edited = 'नमस्ते बच्चों, शुरू करने से पहले पिछला पाठ दोहरा लेते हैं। ' + self.transcript
+        after = chunk_text(edited, max_tokens=300, min_tokens=100)
+        self.assertNotEqual(after[0], before[0])
+        self.assertEqual(after[1:], before[1:])
+
+    def test_merge_drops_duplicates_and_interleaves_chunks(self):
+        first = [{'question': 'भारत की राजधानी क्या है?'}, {'question': 'गंगा कहाँ बहती है?'}]
+        second = [{'question': 'Python क्या है?'}, {'question': 'भारत की राजधानी क्या है'}]
+        merged = merge_questions([first, second])
+        self.assertEqual(
+            [question['question'] for question in merged],
+            ['भारत की राजधानी क्या है?', 'Python क्या है?', 'गंगा कहाँ बहती है?']
+        )
+        self.assertEqual(merge_questions([first, second], limit=2), merged[:2])
+
+
+class BudgetPlannerTests(SimpleTestCase):
+    def test_max_tokens_only_with_calibrated_estimator(self):
+        uncalibrated = BudgetPlanner(TokenEstimator(rates=dict(DEFAULT_RATES)))
+        self.assertIsNone(uncalibrated.max_tokens_for(['novice']))
+        self.assertGreater(uncalibrated.completion_reserve(['novice']), 0)
+
+        rough = BudgetPlanner(TokenEstimator(rates={}, calibration={'rates': {}, 'mean_error_pct': 12.0}))
+        self.assertIsNone(rough.max_tokens_for(['novice']))
+
+        fitted = BudgetPlanner(TokenEstimator(rates={}, calibration={'rates': {}, 'mean_error_pct': 2.5}))
+        self.assertEqual(fitted.max_tokens_for(['novice', 'mcq']), fitted.completion_reserve(['novice', 'mcq']))
+
+    def test_shipped_rates_match_reference_tokenizer(self):
+        with open(REFERENCE_COUNTS_PATH, encoding='utf-8') as f:
+            reference = json.load(f)
+        lines, paragraphs = load_corpus()
+        self.assertEqual((len(lines), len(paragraphs)), (len(reference['lines']), len(reference['paragraphs'])))
+
+        planner = BudgetPlanner(token_estimator)
+        mean_error, _ = estimate_error(token_estimator.estimate, paragraphs, reference['paragraphs'])
+        self.assertLessEqual(mean_error, planner.max_error_pct)
+        self.assertTrue(planner.caps_completions)
+
+
+class OpenAIClientTests(SimpleTestCase):
+    """Requests made through the pinned openai client against a local stand-in for the API"""
+
+    def setUp(self):
+        self.model = DeepSeekQAModel()
+        self.previous_backend = self.model.backend
+        self.requests = []
+
+    def tearDown(self):
+        self.model.use_backend(self.previous_backend)
+
+    def use_upstream(self, handler):
+        def record(request):
+            self.requests.append(json.loads(request.content))
+            return handler(request)
+
+        self.model.client = OpenAI(
+            api_key='sk-test',
+            base_url='http://llm.test/v1',
+            http_client=httpx.Client(transport=httpx.MockTransport(record)),
+            max_retries=0
+        )
+
+    @staticmethod
+    def streamed_reply(contents, usage=None):
+        """Server-sent chat completion chunks carrying `contents`"""
+        events = [{'choices': [{'index': 0, 'delta': {'content': content}}]} for content in contents]
+        if usage:
+            events.append({'choices': [], 'usage': usage})
+        body = ''.join(
+            f"data: {json.dumps(dict(event, id='1', object='chat.completion.chunk', created=0, model='m'))}\n\n"
+            for event in events
+        ) + 'data: [DONE]\n\n'
+        return httpx.Response(200, text=body, headers={'content-type': 'text/event-stream'})
+
+    def test_streamed_completion_requests_usage(self):
+        self.use_upstream(lambda request: self.streamed_reply(
+            ['{"qa_pairs": ', '[]}'],
+            usage={'prompt_tokens': 40, 'completion_tokens': 6, 'total_tokens': 46}
+        ))
+
+        text = ''.join(self.model._stream_model('Transcript Text: नमस्ते', max_tokens=100))
+
+        self.assertEqual(text, '{"qa_pairs": []}')
+        self.assertTrue(self.requests[0]['stream'])
+        self.assertEqual(self.requests[0]['stream_options'], {'include_usage': True})
+        self.assertEqual(self.requests[0]['max_tokens'], 100)
+
+    def test_cut_off_stream_is_not_cached(self):
+        self.use_upstream(lambda request: self.streamed_reply([
+            '{"qa_pairs": [{"question": "क्या?", "answer": "हाँ"}, ',
+            '{"question": "कौन'
+        ]))
+
+        with mock.patch.object(self.model.cache, 'get', return_value=None), \
+                mock.patch.object(self.model.cache, 'set') as cache_set:
+            streamed = list(self.model.stream_questions('नमस्ते दुनिया', ['novice']))
+
+        self.assertEqual(len(streamed), 1)
+        cache_set.assert_not_called()
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import json
+import hashlib
+import threading
+from core.lru import LRUCache
+
+# Text classes the estimate is built from; each costs a different number of tokens
+TOKEN_CLASSES = re.compile(
+    r'(?P<devanagari>[ऀ-ॿ]+)'
+    r'|(?P<latin>[A-Za-z]+)'
+    r'|(?P<digits>[0-9]+)'
+    r'|(?P<space>\s+)'
+    r'|(?P<other>.)',
+    re.DOTALL
+)
+FEATURES = ('devanagari_chars', 'devanagari_words', 'latin_chars', 'latin_words', 'digits', 'newlines', 'other')
+
+# Tokens per unit of each feature, used when qa_engine/token_rates.json (fitted
+# to the DeepSeek-V3 tokenizer by scripts/calibrate_tokens.py) is missing.
+DEFAULT_RATES = {
+    'devanagari_chars': 0.42,
+    'devanagari_words': 0.35,
+    'latin_chars': 0.2,
+    'latin_words': 0.35,
+    'digits': 0.34,
+    'newlines': 0.5,
+    'other': 0.9
+}
+RATES_PATH = os.path.join(os.path.dirname(__file__), 'token_rates.json')
+
+# Bundled Hindi/English corpus and its token counts under the reference tokenizer
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'hindi_token_corpus.txt')
+REFERENCE_COUNTS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'hindi_token_counts.json')
+# Lines per paragraph sample; the planner sizes transcript windows and replies, not single sentences
+PARAGRAPH_LINES = 10
+
+# USD per million tokens; set to the provider's current prices
+PRICE_INPUT_PER_M = float(os.getenv('QA_PRICE_INPUT_PER_M', '0.27'))
+PRICE_OUTPUT_PER_M = float(os.getenv('QA_PRICE_OUTPUT_PER_M', '1.10'))
+
+# Output budget per generated question, by type (MCQ options make them longer)
+OUTPUT_TOKENS_PER_QUESTION = {'novice': 90, 'mcq': 140, 'fill_blanks': 80}
+QUESTIONS_PER_TYPE = 5
+
+
+def load_calibration(path=RATES_PATH):
+    """The token_rates.json written by scripts/calibrate_tokens.py, or None before it has been run"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            calibration = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return calibration if isinstance(calibration, dict) and isinstance(calibration.get('rates'), dict) else None
+
+
+def load_rates(path=RATES_PATH):
+    """Calibrated rates when available, the built-in defaults otherwise"""
+    calibration = load_calibration(path)
+    return dict(DEFAULT_RATES, **calibration['rates']) if calibration else dict(DEFAULT_RATES)
+
+
+def load_corpus(path=CORPUS_PATH):
+    """Corpus lines, and the paragraphs of PARAGRAPH_LINES consecutive lines"""
+    with open(path, encoding='utf-8') as f:
+        lines = [line.strip() for line in f if line.strip()]
+    paragraphs = ['\n'.join(lines[i:i + PARAGRAPH_LINES]) for i in range(0, len(lines), PARAGRAPH_LINES)]
+    return lines, paragraphs
+
+
+def estimate_error(estimate, samples, actual):
+    """Mean and worst relative error, in percent, of estimate(text) against actual token counts"""
+    errors = [abs(estimate(sample) - tokens) / tokens for sample, tokens in zip(samples, actual)]
+    return 100 * sum(errors) / len(errors), 100 * max(errors)
+
+
+def count_features(text):
+    """Count the text features the token estimate is a linear function of"""
+    counts = dict.fromkeys(FEATURES, 0)
+    for match in TOKEN_CLASSES.finditer(text):
+        kind = match.lastgroup
+        length = len(match.group())
+        if kind == 'devanagari':
+            counts['devanagari_chars'] += length
+            counts['devanagari_words'] += 1
+        elif kind == 'latin':
+            counts['latin_chars'] += length
+            counts['latin_words'] += 1
+        elif kind == 'digits':
+            counts['digits'] += length
+        elif kind == 'space':
+            counts['newlines'] += match.group().count('\n')
+        else:
+            counts['other'] += length
+    return counts
+
+
+class TokenEstimator:
+    """
+    Offline token counts for mixed Hindi/English text.
+
+    The estimate is a weighted sum of character and word counts per script,
+    with weights fitted to the real tokenizer by scripts/calibrate_tokens.py.
+    Results for long texts are memoized by content hash, so a transcript that
+    is planned, chunked and metered is only scanned once.
+    """
+
+    MEMO_MIN_LENGTH = 256
+
+    def __init__(self, rates=None, memo_entries=1024, calibration=None):
+        if not rates:
+            calibration = calibration or load_calibration()
+            rates = dict(DEFAULT_RATES, **calibration['rates']) if calibration else dict(DEFAULT_RATES)
+        self.rates = rates
+        # Fitted rates and their measured error; None while the estimate uses the unfitted defaults
+        self.calibration = calibration
+        self._memo = LRUCache(max_entries=memo_entries)
+
+    def _estimate(self, text):
+        counts = count_features(text)
+        return max(1, round(sum(self.rates[feature] * counts[feature] for feature in FEATURES)))
+
+    def estimate(self, text):
+        """Estimated token count of a text"""
+        if not text:
+            return 0
+        if len(text) < self.MEMO_MIN_LENGTH:
+            return self._estimate(text)
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+        tokens = self._memo.get(key)
+        if tokens is None:
+            tokens = self._estimate(text)
+            self._memo.set(key, tokens)
+        return tokens
+
+    def estimate_messages(self, messages):
+        """Estimated prompt tokens of a chat request, with a few tokens of framing per message"""
+        return sum(self.estimate(message['content']) + 4 for message in messages) + 2
+
+
+class BudgetPlanner:
+    """
+    Picks chunk sizes and max_tokens for generation requests so that prompt
+    plus completion fit the model's context window.
+
+    Room for the completion is always reserved when sizing chunks, but
+    max_tokens is only sent once the estimator has been calibrated with an
+    error of at most QA_MAX_TOKENS_ERROR_PCT (default 5): a cap computed from
+    unfitted weights can truncate the reply, which then fails to parse.
+    """
+
+    def __init__(self, estimator, context_window=None, max_output_tokens=None, max_chunk_tokens=None):
+        self.estimator = estimator
+        self.context_window = context_window or int(os.getenv('QA_CONTEXT_WINDOW', '64000'))
+        self.max_output_tokens = max_output_tokens or int(os.getenv('QA_MAX_OUTPUT_TOKENS', '8192'))
+        self.max_chunk_tokens = max_chunk_tokens or int(os.getenv('QA_CHUNK_MAX_TOKENS', '2000'))
+        self.max_error_pct = float(os.getenv('QA_MAX_TOKENS_ERROR_PCT', '5'))
+
+    def completion_reserve(self, question_types):
+        """Tokens kept free for the completion of a request generating the given question types"""
+        expected = sum(
+            OUTPUT_TOKENS_PER_QUESTION.get(question_type, 100) * QUESTIONS_PER_TYPE
+            for question_type in question_types
+        )
+        # Headroom for JSON structure and longer-than-usual answers; a truncated reply is unusable
+        return min(self.max_output_tokens, expected * 2 + 64)
+
+    @property
+    def caps_completions(self):
+        calibration = self.estimator.calibration
+        if not calibration or calibration.get('mean_error_pct') is None:
+            return False
+        return calibration['mean_error_pct'] <= self.max_error_pct
+
+    def max_tokens_for(self, question_types):
+        """max_tokens to send, or None to leave the completion uncapped until the estimator is calibrated"""
+        return self.completion_reserve(question_types) if self.caps_completions else None
+
+    def chunk_tokens_for(self, prompt_overhead, question_types):
+        """Largest transcript window that still fits next to the prompt and completion"""
+        room = self.context_window - prompt_overhead - self.completion_reserve(question_types)
+        return max(200, min(self.max_chunk_tokens, room))
+
+    def plan(self, transcript_text, prompt_overhead, question_types):
+        """Budget for one transcript: token counts, chunk size and expected cost"""
+        transcript_tokens = self.estimator.estimate(transcript_text)
+        chunk_tokens = self.chunk_tokens_for(prompt_overhead, question_types)
+        chunks = max(1, -(-transcript_tokens // chunk_tokens))
+        completion_tokens = self.completion_reserve(question_types)
+        input_tokens = transcript_tokens + chunks * prompt_overhead
+        return {
+            'transcript_tokens': transcript_tokens,
+            'chunk_tokens': chunk_tokens,
+            'chunks': chunks,
+            'max_tokens': self.max_tokens_for(question_types),
+            'completion_reserve': completion_tokens,
+            'input_tokens': input_tokens,
+            'max_cost_usd': round(
+                (input_tokens * PRICE_INPUT_PER_M + chunks * completion_tokens * PRICE_OUTPUT_PER_M) / 1e6, 6
+            )
+        }
+
+
+class UsageMeter:
+    """Per-call token, latency and cost metrics for LLM requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {
+            'calls': 0,
+            'measured_calls': 0,
+            'estimated_prompt_tokens': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'cost_usd': 0.0,
+            'latency_seconds': 0.0,
+            'estimate_error_sum': 0.0
+        }
+        self.last_call = None
+
+    @staticmethod
+    def _usage_field(usage, name):
+        value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+        return value or 0
+
+    def record(self, estimated_prompt_tokens, usage=None, latency=0.0, completion_text=None, estimator=None):
+        """
+        Record one call. usage is the API's usage object when it returned one;
+        otherwise the completion is estimated from its text.
+        """
+        if usage is not None:
+            prompt_tokens = self._usage_field(usage, 'prompt_tokens')
+            completion_tokens = self._usage_field(usage, 'completion_tokens')
+        else:
+            prompt_tokens = estimated_prompt_tokens
+            completion_tokens = estimator.estimate(completion_text) if estimator and completion_text else 0
+
+        cost = (prompt_tokens * PRICE_INPUT_PER_M + completion_tokens * PRICE_OUTPUT_PER_M) / 1e6
+        call = {
+            'estimated_prompt_tokens': estimated_prompt_tokens,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'measured': usage is not None,
+            'cost_usd': cost,
+            'latency_seconds': latency
+        }
+        with self._lock:
+            totals = self._totals
+            totals['calls'] += 1
+            totals['estimated_prompt_tokens'] += estimated_prompt_tokens
+            totals['prompt_tokens'] += prompt_tokens
+            totals['completion_tokens'] += completion_tokens
+            totals['cost_usd'] += cost
+            totals['latency_seconds'] += latency
+            if usage is not None and prompt_tokens:
+                totals['measured_calls'] += 1
+                totals['estimate_error_sum'] += abs(estimated_prompt_tokens - prompt_tokens) / prompt_tokens
+            self.last_call = call
+        return call
+
+    def stats(self):
+        """Totals plus the mean estimate error against measured prompt tokens"""
+        with self._lock:
+            stats = dict(self._totals)
+        error_sum = stats.pop('estimate_error_sum')
+        stats['estimate_error_pct'] = round(100 * error_sum / stats['measured_calls'], 2) if stats['measured_calls'] else None
+        stats['avg_latency_seconds'] = stats['latency_seconds'] / stats['calls'] if stats['calls'] else 0.0
+        stats['cost_usd'] = round(stats['cost_usd'], 6)
+        return stats
+
+
+# Shared estimator, also used by the chunker
+token_estimator = TokenEstimator()
+
+
+def estimate_tokens(text):
+    return token_estimator.estimate(text)
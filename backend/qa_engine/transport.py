@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import random
+import threading
+import httpx
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of calling an upstream that keeps failing"""
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream after `failure_threshold` consecutive failures.
+
+    After `reset_timeout` seconds one trial request is let through; its
+    success closes the circuit again and its failure re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Raise CircuitOpenError unless a request may be sent now"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    raise CircuitOpenError('LLM upstream circuit is open')
+                self.state = self.HALF_OPEN
+            elif self.state == self.HALF_OPEN:
+                # Only the single trial request goes through while half open
+                self.rejected += 1
+                raise CircuitOpenError('LLM upstream circuit is half open')
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {'state': self.state, 'failures': self.failures, 'rejected': self.rejected}
+
+
+class DeadlineStream(httpx.SyncByteStream):
+    """Response body that raises ReadTimeout once the call's deadline has passed"""
+
+    def __init__(self, stream, request, expires_at):
+        self.stream = stream
+        self.request = request
+        self.expires_at = expires_at
+
+    def __iter__(self):
+        for chunk in self.stream:
+            if time.monotonic() > self.expires_at:
+                raise httpx.ReadTimeout('LLM call deadline exceeded', request=self.request)
+            yield chunk
+
+    def close(self):
+        self.stream.close()
+
+
+class RetryTransport(httpx.BaseTransport):
+    """
+    httpx transport that retries 429/5xx responses and network errors with
+    jittered exponential backoff, within an overall per-call deadline, behind
+    a circuit breaker. `Retry-After` headers are honoured.
+
+    The deadline bounds the whole call: each attempt's connect/read/write/pool
+    timeouts are capped at the time left, and a streamed body that is still
+    arriving when the deadline passes fails with ReadTimeout.
+    """
+
+    def __init__(self, transport, max_retries=3, backoff_base=0.5, backoff_max=8.0,
+                 deadline=60.0, breaker=None, sleep=time.sleep):
+        self.transport = transport
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.breaker = breaker or CircuitBreaker()
+        self.sleep = sleep
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _backoff(self, attempt, response=None):
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        if retry_after:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+        # Full jitter keeps retrying workers from synchronizing
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _limit_timeouts(request, remaining):
+        timeout = request.extensions.get('timeout', {})
+        request.extensions['timeout'] = {
+            key: remaining if timeout.get(key) is None else min(timeout[key], remaining)
+            for key in ('connect', 'read', 'write', 'pool')
+        }
+
+    def handle_request(self, request):
+        self.breaker.allow()
+        self._count('requests')
+        started = time.monotonic()
+        expires_at = started + self.deadline
+        attempt = 0
+        while True:
+            response = None
+            error = None
+            try:
+                self._limit_timeouts(request, max(expires_at - time.monotonic(), 0.001))
+                response = self.transport.handle_request(request)
+            except httpx.TransportError as e:
+                error = e
+            except Exception:
+                self.breaker.record_failure()
+                raise
+
+            if error is None and response.status_code not in RETRY_STATUSES:
+                self.breaker.record_success()
+                response.stream = DeadlineStream(response.stream, request, expires_at)
+                return response
+
+            wait = self._backoff(attempt, response)
+            out_of_time = time.monotonic() - started + wait > self.deadline
+            if attempt >= self.max_retries or out_of_time:
+                self._count('failures')
+                self.breaker.record_failure()
+                if error is not None:
+                    raise error
+                return response
+
+            if response is not None:
+                response.read()
+                response.close()
+            self._count('retries')
+            self.sleep(wait)
+            attempt += 1
+
+    def close(self):
+        self.transport.close()
+
+
+def http2_available():
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def build_http_client(transport=None):
+    """
+    Build the pooled HTTP client used for LLM calls from QA_LLM_* settings.
+    Pass `transport` (e.g. httpx.MockTransport) to test against a fake upstream.
+    Returns (client, retry_transport).
+    """
+    limits = httpx.Limits(
+        max_connections=int(os.getenv('QA_LLM_MAX_CONNECTIONS', '20')),
+        max_keepalive_connections=int(os.getenv('QA_LLM_MAX_KEEPALIVE', '10')),
+        keepalive_expiry=float(os.getenv('QA_LLM_KEEPALIVE_SECONDS', '60'))
+    )
+    http2 = os.getenv('QA_LLM_HTTP2', 'True') == 'True' and http2_available()
+    inner = transport or httpx.HTTPTransport(limits=limits, http2=http2, retries=1)
+    retry = RetryTransport(
+        inner,
+        max_retries=int(os.getenv('QA_LLM_MAX_RETRIES', '3')),
+        backoff_base=float(os.getenv('QA_LLM_BACKOFF_SECONDS', '0.5')),
+        deadline=float(os.getenv('QA_LLM_DEADLINE_SECONDS', '120')),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv('QA_LLM_BREAKER_FAILURES', '5')),
+            reset_timeout=float(os.getenv('QA_LLM_BREAKER_RESET_SECONDS', '30'))
+        )
+    )
+    timeout = httpx.Timeout(
+        float(os.getenv('QA_LLM_READ_TIMEOUT', '90')),
+        connect=float(os.getenv('QA_LLM_CONNECT_TIMEOUT', '5')),
+        pool=float(os.getenv('QA_LLM_POOL_TIMEOUT', '10'))
+    )
+    return httpx.Client(transport=retry, timeout=timeout), retry
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    # Connections must not be shared with the parent process (gunicorn --preload)
+    global _shared, _shared_lock
+    _shared = None
+    _shared_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_http_client():
+    """The process-wide pooled client shared by all threads of a worker"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = build_http_client()
+        return _shared[0]
+
+
+def transport_stats():
+    """Retry and circuit breaker counters of the shared client"""
+    if _shared is None:
+        return {}
+    retry = _shared[1]
+    with retry._lock:
+        stats = dict(retry.stats)
+    return dict(stats, circuit=retry.breaker.stats())
@@ -8,6 +8,8 @@ import yt_dlp
 from pymongo import MongoClient
 import certifi
 from qa_engine.qa_model import qa_model
+from core.pipeline import Pipeline, Stage, RateLimiter
+from api.services.question_docs import build_question_docs, insert_question_docs
 
 # Load environment variables
 load_dotenv()
@@ -24,6 +26,14 @@ PLAYLIST_URL = "https://www.youtube.com/playlist?list=PL48CaRIHVwhX-QW3yVgbbKUhZ
 QUESTION_TYPES = ["novice", "mcq"]
 LANGUAGE_PREFERENCES = ['hi', 'hi-IN', 'en', 'en-IN', 'en-US']
 
+# Ingestion pipeline tuning
+FETCH_WORKERS = int(os.getenv('INGEST_FETCH_WORKERS', '4'))
+GENERATE_WORKERS = int(os.getenv('INGEST_GENERATE_WORKERS', '4'))
+WRITE_BATCH_SIZE = int(os.getenv('INGEST_WRITE_BATCH_SIZE', '20'))
+QUEUE_SIZE = int(os.getenv('INGEST_QUEUE_SIZE', '8'))
+YOUTUBE_RATE = float(os.getenv('INGEST_YOUTUBE_RATE', '2'))  # requests per second
+LLM_RATE = float(os.getenv('INGEST_LLM_RATE', '1'))  # requests per second
+
 class MongoConnection:
     def __init__(self):
         self.client = None
@@ -125,74 +135,101 @@ def get_transcript(video_id: str) -> Optional[str]:
         return None
 
 def generate_qa_pairs(text: str, video_id: str) -> List[Dict[str, Any]]:
-    """Generate QA pairs from text"""
+    """Generate QA pairs for all configured question types in one model call"""
     qa_pairs = []
     try:
-        for q_type in QUESTION_TYPES:
-            pairs = qa_model.generate_questions(text, q_type)
-            if isinstance(pairs, list):
-                for pair in pairs:
-                    pair['video_id'] = video_id
-                    pair['type'] = q_type
-                    pair['created_at'] = datetime.utcnow()
-                    qa_pairs.append(pair)
+        generated = qa_model.generate_questions_batch(text, QUESTION_TYPES)
+        for q_type, pairs in generated.items():
+            for pair in pairs:
+                pair['video_id'] = video_id
+                pair['type'] = q_type
+                pair['created_at'] = datetime.utcnow()
+                qa_pairs.append(pair)
     except Exception as e:
         logger.error(f"Error generating QA pairs: {str(e)}")
     
     return qa_pairs
 
-def process_video(db, video: Dict[str, Any]) -> bool:
-    """Process a single video"""
-    try:
-        video_id = video['video_id']
-        logger.info(f"Processing video: {video['title']} ({video_id})")
-
-        # Check available transcripts
-        transcript_list = get_available_transcripts(video_id)
-        if not transcript_list:
-            logger.warning(f"No transcripts available for video {video_id}")
-            # Save video as processed but without transcript
-            video['processed'] = True
-            video['has_transcript'] = False
-            db.youtube_videos.insert_one(video)
-            return False
-
-        # Get transcript
-        transcript = get_transcript(video_id)
-        if not transcript:
-            logger.error(f"Could not get transcript for video {video_id}")
-            # Save video as processed but without transcript
-            video['processed'] = True
-            video['has_transcript'] = False
-            db.youtube_videos.insert_one(video)
-            return False
-
-        # Save transcript
-        transcript_doc = {
-            'video_id': video_id,
-            'title': video['title'],
-            'content': transcript,
-            'language': 'hi',  # Default to Hindi even if we got another language
-            'created_at': datetime.utcnow()
-        }
-        result = db.transcripts.insert_one(transcript_doc)
-        transcript_id = result.inserted_id
+def fetch_stage(video: Dict[str, Any], fetch=get_transcript) -> Dict[str, Any]:
+    """Pipeline stage: attach the transcript text (or None) to a video"""
+    logger.info(f"Fetching transcript: {video['title']} ({video['video_id']})")
+    video['transcript'] = fetch(video['video_id'])
+    if not video['transcript']:
+        logger.warning(f"No transcript available for video {video['video_id']}")
+    return video
+
+
+def generate_stage(video: Dict[str, Any], generate=generate_qa_pairs) -> Dict[str, Any]:
+    """Pipeline stage: attach generated QA pairs to a video with a transcript"""
+    video['qa_pairs'] = generate(video['transcript'], video['video_id']) if video['transcript'] else []
+    return video
+
 
-        # Generate and save QA pairs
-        qa_pairs = generate_qa_pairs(transcript, video_id)
-        if qa_pairs:
-            for pair in qa_pairs:
-                pair['transcript_id'] = transcript_id
-            db.qa_pairs.insert_many(qa_pairs)
+def write_stage(db, videos: List[Dict[str, Any]]) -> None:
+    """Pipeline stage: persist a batch of processed videos with bulk inserts"""
+    with_transcript = [video for video in videos if video['transcript']]
 
-        # Mark video as processed
-        video['processed'] = True
-        video['has_transcript'] = True
-        db.youtube_videos.insert_one(video)
+    if with_transcript:
+        transcript_docs = [
+            {
+                'video_id': video['video_id'],
+                'title': video['title'],
+                'content': video['transcript'],
+                'language': 'hi',  # Default to Hindi even if we got another language
+                'created_at': datetime.utcnow()
+            }
+            for video in with_transcript
+        ]
+        result = db.transcripts.insert_many(transcript_docs)
 
-        logger.info(f"Successfully processed video {video_id} with {len(qa_pairs)} QA pairs")
-        return True
+        qa_docs = []
+        for video, transcript_id in zip(with_transcript, result.inserted_ids):
+            qa_docs.extend(build_question_docs(
+                transcript_id=transcript_id,
+                video_id=video['video_id'],
+                questions=video['qa_pairs'],
+                video_title=video['title'],
+                source='playlist'
+            ))
+        insert_question_docs(db.qa_pairs, qa_docs)
 
+    # Mark videos as processed
+    video_docs = []
+    for video in videos:
+        doc = {k: v for k, v in video.items() if k not in ('transcript', 'qa_pairs')}
+        doc['processed'] = True
+        doc['has_transcript'] = bool(video['transcript'])
+        video_docs.append(doc)
+        if video['transcript']:
+            logger.info(f"Successfully processed video {video['video_id']} with {len(video['qa_pairs'])} QA pairs")
+    db.youtube_videos.insert_many(video_docs, ordered=False)
+
+
+def build_pipeline(db, fetch=get_transcript, generate=generate_qa_pairs, write=None) -> Pipeline:
+    """
+    Build the ingestion pipeline: transcript fetch -> QA generation -> bulk write.
+    The fetch/generate/write callables can be replaced with stubs for testing.
+    """
+    write = write or (lambda videos: write_stage(db, videos))
+    return Pipeline(
+        [
+            Stage('fetch', lambda video: fetch_stage(video, fetch),
+                  concurrency=FETCH_WORKERS, rate_limiter=RateLimiter(YOUTUBE_RATE)),
+            Stage('generate', lambda video: generate_stage(video, generate),
+                  concurrency=GENERATE_WORKERS, rate_limiter=RateLimiter(LLM_RATE)),
+            Stage('write', write, batch_size=WRITE_BATCH_SIZE)
+        ],
+        queue_size=QUEUE_SIZE
+    )
+
+
+def process_video(db, video: Dict[str, Any]) -> bool:
+    """Process a single video"""
+    try:
+        logger.info(f"Processing video: {video['title']} ({video['video_id']})")
+        video = generate_stage(fetch_stage(video))
+        write_stage(db, [video])
+        return bool(video['transcript'])
     except Exception as e:
         logger.error(f"Error processing video {video.get('video_id')}: {str(e)}")
         return False
@@ -214,13 +251,18 @@ def main():
 
         logger.info(f"Found {len(new_videos)} new videos to process")
 
-        # Process each video
-        success_count = 0
-        for video in new_videos:
-            if process_video(mongo.db, video):
-                success_count += 1
+        # Fetch, generate and write concurrently with backpressure between stages
+        pipeline = build_pipeline(mongo.db)
+        stats = pipeline.run(new_videos)
 
-        logger.info(f"Completed processing. Successfully processed {success_count}/{len(new_videos)} videos")
+        for name in ('fetch', 'generate', 'write'):
+            logger.info(f"Stage {name}: {stats[name]}")
+        logger.info(
+            f"Completed processing {stats['write']['processed']}/{len(new_videos)} videos "
+            f"in {stats['elapsed_seconds']:.1f}s"
+        )
+        logger.info(f"QA cache stats: {qa_model.cache.stats()}")
+        logger.info(f"LLM usage: {qa_model.usage.stats()}")
 
     except Exception as e:
         logger.error(f"Error in main process: {str(e)}")
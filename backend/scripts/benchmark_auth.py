@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import argparse
+
+# Set up Django environment
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import django
+django.setup()
+
+from bson import ObjectId
+from django.test import RequestFactory
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from api.middleware import MongoJWTAuthentication, MongoUserMiddleware
+from api.token_cache import token_cache
+
+
+def legacy_request(raw_token):
+    """The previous path: the middleware and DRF each validate the token and build a user class"""
+    for _ in range(2):
+        validated_token = JWTAuthentication().get_validated_token(raw_token)
+        user_id = validated_token['user_id']
+        type('MongoUser', (), {
+            'id': user_id,
+            'is_authenticated': True,
+            'is_active': True,
+            'user_id': user_id
+        })()
+
+
+def make_request_runner(factory, raw_token, clear_cache):
+    """Middleware plus DRF authentication for one request"""
+    def get_response(request):
+        drf_request = Request(request, authenticators=[MongoJWTAuthentication()])
+        return drf_request.user
+
+    middleware = MongoUserMiddleware(get_response)
+    request = factory.get('/api/transcripts/', HTTP_AUTHORIZATION=f'Bearer {raw_token}')
+
+    def run():
+        if clear_cache:
+            token_cache._verified.clear()
+        middleware(request)
+    return run
+
+
+def bench(name, run, requests):
+    run()
+    started = time.perf_counter()
+    for _ in range(requests):
+        run()
+    elapsed = time.perf_counter() - started
+    print(f"⏱️  {name:28} {elapsed / requests * 1e6:8.1f} µs/request")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure per-request JWT authentication overhead')
+    parser.add_argument('--requests', type=int, default=20000, help='Requests per scenario')
+    args = parser.parse_args()
+
+    token = AccessToken()
+    token['user_id'] = str(ObjectId())
+    raw_token = str(token)
+    factory = RequestFactory()
+
+    print(f"🔐 {args.requests} authenticated requests per scenario")
+    legacy = bench('before (validate twice)', lambda: legacy_request(raw_token.encode()), args.requests)
+    cold = bench('after, cache miss', make_request_runner(factory, raw_token, True), args.requests)
+    cached = bench('after, cache hit', make_request_runner(factory, raw_token, False), args.requests)
+    print(f"📊 {legacy / cold:.1f}x faster without the cache, {legacy / cached:.1f}x with it")
+    print(f"📊 Token cache: {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Responses must not come from (or land in) the shared MongoDB cache
+os.environ.setdefault('QA_CACHE_MONGO', 'False')
+
+DEFAULT_CORPUS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'qa_engine', 'data', 'hindi_token_corpus.txt'
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark question generation against an LLM backend')
+    parser.add_argument('--backend', default='fake', help='LLM backend: fake, openai or deepseek')
+    parser.add_argument('--requests', type=int, default=20, help='Number of generation requests')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent requests')
+    parser.add_argument('--types', default='novice,mcq', help='Comma-separated question types per request')
+    parser.add_argument('--latency', type=float, help='Fake backend time to first token in seconds')
+    parser.add_argument('--tps', type=float, help='Fake backend output tokens per second')
+    parser.add_argument('--stream', action='store_true', help='Stream questions and measure time to first question')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='Text file the transcripts are built from')
+    return parser.parse_args()
+
+
+def make_transcripts(path, count, lines_per_transcript=10):
+    """Distinct transcripts built from the corpus, so no request is a cache hit"""
+    with open(path, encoding='utf-8') as f:
+        lines = [line.strip() for line in f if line.strip()]
+    return [
+        ' '.join(lines[(i + j) % len(lines)] for j in range(lines_per_transcript)) + f' ({i})'
+        for i in range(count)
+    ]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_request(qa_model, text, question_types, stream):
+    """(seconds, seconds to first question, questions) for one request"""
+    started = time.perf_counter()
+    first = None
+    questions = 0
+    if stream:
+        for _ in qa_model.stream_questions(text, question_types):
+            if first is None:
+                first = time.perf_counter() - started
+            questions += 1
+    else:
+        result = qa_model.generate_questions_batch(text, question_types)
+        questions = sum(len(pairs) for pairs in result.values())
+    return time.perf_counter() - started, first, questions
+
+
+def main():
+    args = parse_args()
+    if args.latency is not None:
+        os.environ['QA_LLM_FAKE_LATENCY'] = str(args.latency)
+    if args.tps is not None:
+        os.environ['QA_LLM_FAKE_TOKENS_PER_SECOND'] = str(args.tps)
+
+    from qa_engine.backends import get_backend
+    from qa_engine.qa_model import qa_model
+
+    backend = get_backend(args.backend)
+    qa_model.use_backend(backend)
+    question_types = [t.strip().lower() for t in args.types.split(',') if t.strip()]
+    transcripts = make_transcripts(args.corpus, args.requests)
+    print(f"🚀 {args.requests} requests x {question_types} with {args.concurrency} workers on {backend.describe()}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(
+            lambda text: run_request(qa_model, text, question_types, args.stream), transcripts
+        ))
+    elapsed = time.perf_counter() - started
+
+    latencies = [seconds for seconds, _, _ in results]
+    questions = sum(count for _, _, count in results)
+    print(f"⏱️  {elapsed:.2f}s total, {args.requests / elapsed:.2f} requests/s, {questions / elapsed:.1f} questions/s")
+    print(f"📊 latency p50 {percentile(latencies, 50):.3f}s, p95 {percentile(latencies, 95):.3f}s, "
+          f"max {max(latencies):.3f}s")
+    firsts = [first for _, first, _ in results if first is not None]
+    if firsts:
+        print(f"📊 time to first question p50 {percentile(firsts, 50):.3f}s, p95 {percentile(firsts, 95):.3f}s")
+    print(f"🧮 LLM usage: {qa_model.usage.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Set up Django environment
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import django
+django.setup()
+
+from django.contrib.auth.hashers import get_hasher
+from api.services.password_hasher import PasswordHasher, HashQueueFull
+
+PASSWORD = 'benchmark-password'
+
+
+def bench_hasher(algorithm, iterations):
+    """Milliseconds per make/check on one core"""
+    hasher = get_hasher(algorithm)
+    started = time.perf_counter()
+    encoded = [hasher.encode(PASSWORD, hasher.salt()) for _ in range(iterations)]
+    make_ms = (time.perf_counter() - started) / iterations * 1000
+
+    started = time.perf_counter()
+    for value in encoded:
+        hasher.verify(PASSWORD, value)
+    check_ms = (time.perf_counter() - started) / iterations * 1000
+    print(f"🔐 {algorithm:14} make {make_ms:7.1f}ms  check {check_ms:7.1f}ms  "
+          f"{1000 / check_ms:6.1f} logins/s per core")
+    return encoded[0]
+
+
+def bench_pool(encoded, workers, concurrency, logins):
+    """Logins/s through the hashing pool with `concurrency` requests in flight"""
+    os.environ['PASSWORD_HASH_WORKERS'] = str(workers)
+    os.environ['PASSWORD_HASH_MAX_QUEUE'] = str(max(workers * 2, 1))
+    pool = PasswordHasher()
+    # Warm up the worker processes
+    pool.check(PASSWORD, encoded)
+
+    def login(i):
+        try:
+            return pool.check(PASSWORD, encoded, email=f'user{i}@example.com')[0]
+        except HashQueueFull:
+            return False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    stats = pool.stats()
+    pool.shutdown()
+    print(f"⏱️  {workers} hash workers: {logins / elapsed:7.1f} logins/s, "
+          f"{logins / elapsed / max(workers, 1):6.1f} per core, {results.count(False)} rejected, "
+          f"avg wait {stats['avg_wait_ms']:.1f}ms, max queued {stats['max_queued']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure password hashing cost and login throughput per core')
+    parser.add_argument('--iterations', type=int, default=10, help='Hashes per algorithm for the single-core cost')
+    parser.add_argument('--workers', default='1,2,4', help='Comma-separated hashing pool sizes to try')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent logins')
+    parser.add_argument('--logins', type=int, default=100, help='Logins per pool size')
+    args = parser.parse_args()
+
+    print(f"📋 CPU cores: {os.cpu_count()}")
+    bench_hasher('pbkdf2_sha256', args.iterations)
+    encoded = bench_hasher('argon2', args.iterations)
+    for workers in [int(w) for w in args.workers.split(',') if w.strip()]:
+        bench_pool(encoded, workers, args.concurrency, args.logins)
+
+
+if __name__ == "__main__":
+    main()
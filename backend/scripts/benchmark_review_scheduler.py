@@ -0,0 +1,126 @@
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Set up Django environment
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+from core.srs import INITIAL_EASE, sm2_review, sm2_review_bulk
+
+BENCHMARK_USER = 'benchmark-review-user'
+
+
+def make_deck(size, seed=0):
+    """Random card states and grades for a deck of `size` cards"""
+    rng = np.random.default_rng(seed)
+    ease = rng.uniform(1.3, 3.0, size)
+    interval = rng.integers(0, 120, size).astype(np.float64)
+    reps = rng.integers(0, 10, size)
+    quality = rng.integers(0, 6, size)
+    return ease, interval, reps, quality
+
+
+def bench_math(size, repeat):
+    ease, interval, reps, quality = make_deck(size)
+
+    started = time.perf_counter()
+    scalar = [sm2_review(e, i, r, q) for e, i, r, q in zip(ease.tolist(), interval.tolist(), reps.tolist(), quality.tolist())]
+    scalar_seconds = time.perf_counter() - started
+
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        vector = sm2_review_bulk(ease, interval, reps, quality)
+        best = min(best, time.perf_counter() - started)
+
+    matches = (
+        np.allclose(vector[0], [s[0] for s in scalar])
+        and np.array_equal(vector[1], [s[1] for s in scalar])
+        and np.array_equal(vector[2], [s[2] for s in scalar])
+    )
+    print(f"📊 SM-2 over {size} cards")
+    print(f"   scalar loop: {scalar_seconds * 1000:.1f} ms")
+    print(f"   vectorized:  {best * 1000:.1f} ms (best of {repeat})")
+    print(f"   speedup:     {scalar_seconds / best:.1f}x")
+    print(f"   {'✅' if matches else '❌'} results {'match' if matches else 'differ'}")
+
+
+def bench_mongo(size, limit):
+    import django
+    django.setup()
+
+    from pymongo import InsertOne
+    from bson import ObjectId
+    from api.services.mongo_service import mongo_service
+    from api.services.review_service import review_service
+
+    collection = mongo_service.db.review_cards
+    collection.delete_many({'user_id': BENCHMARK_USER})
+
+    now = datetime.utcnow()
+    ease, interval, reps, _ = make_deck(size)
+    offsets = np.random.default_rng(1).uniform(-30, 30, size)
+    started = time.perf_counter()
+    ops = []
+    for i in range(size):
+        ops.append(InsertOne({
+            'user_id': BENCHMARK_USER,
+            'question_id': ObjectId(),
+            'transcript_id': 'benchmark',
+            'ease': float(ease[i]) if reps[i] else INITIAL_EASE,
+            'interval': float(interval[i]),
+            'reps': int(reps[i]),
+            'lapses': 0,
+            'due_at': now + timedelta(days=float(offsets[i])),
+            'last_reviewed_at': None,
+            'created_at': now
+        }))
+        if len(ops) >= 5000:
+            collection.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        collection.bulk_write(ops, ordered=False)
+    print(f"🗃️  Seeded {size} cards in {time.perf_counter() - started:.2f}s")
+
+    try:
+        started = time.perf_counter()
+        cards = list(collection.find(
+            {'user_id': BENCHMARK_USER, 'due_at': {'$lte': now}}
+        ).sort('due_at', 1).limit(limit))
+        print(f"⏱️  Next {len(cards)} due cards in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        plan = collection.find(
+            {'user_id': BENCHMARK_USER, 'due_at': {'$lte': now}}
+        ).sort('due_at', 1).limit(limit).explain()
+        stats = plan.get('executionStats', {})
+        stages = mongo_service._plan_stages(plan.get('queryPlanner', {}).get('winningPlan', {}))
+        print(f"   plan: {' -> '.join(stages)}, docs examined: {stats.get('totalDocsExamined', '?')}")
+
+        started = time.perf_counter()
+        rescheduled = review_service.review_deck(BENCHMARK_USER, 4, transcript_id='benchmark')
+        print(f"⏱️  Rescheduled {rescheduled} cards in {time.perf_counter() - started:.2f}s")
+    finally:
+        collection.delete_many({'user_id': BENCHMARK_USER})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the SM-2 review scheduler')
+    parser.add_argument('--cards', type=int, default=100000, help='Deck size')
+    parser.add_argument('--repeat', type=int, default=5, help='Vectorized runs to take the best of')
+    parser.add_argument('--mongo', action='store_true',
+                        help='Also seed review_cards and time the due-card query and a deck reschedule')
+    parser.add_argument('--limit', type=int, default=20, help='Due cards to fetch with --mongo')
+    args = parser.parse_args()
+
+    bench_math(args.cards, args.repeat)
+    if args.mongo:
+        bench_mongo(args.cards, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import argparse
+from multiprocessing import Pool
+
+# Set up Django environment
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+
+def rotate(args):
+    """One worker process: refresh with rotation `refreshes` times, like TokenRefreshView does"""
+    mode, refreshes = args
+    import django
+    django.setup()
+    from bson import ObjectId
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from api.token_blacklist import CachedRefreshToken, token_blacklist
+
+    token_class = CachedRefreshToken if mode == 'cached' else RefreshToken
+    token = RefreshToken()
+    token['user_id'] = str(ObjectId())
+    raw_token = str(token)
+
+    latencies = []
+    errors = 0
+    for _ in range(refreshes):
+        started = time.perf_counter()
+        try:
+            refresh = token_class(raw_token)
+            refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            raw_token = str(refresh)
+        except Exception:
+            # e.g. "database is locked" under contention
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    if mode == 'cached':
+        token_blacklist.flush()
+    return latencies, errors, time.perf_counter() - started
+
+
+def run(mode, workers, refreshes):
+    started = time.perf_counter()
+    with Pool(workers) as pool:
+        results = pool.map(rotate, [(mode, refreshes)] * workers)
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for worker_latencies, _, _ in results for latency in worker_latencies)
+    errors = sum(worker_errors for _, worker_errors, _ in results)
+    final_flush = max(flush for _, _, flush in results)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000
+    print(f"⏱️  {mode:7} {len(latencies) / elapsed:8.1f} refreshes/s  p50 {p50:6.2f}ms  p95 {p95:7.2f}ms  "
+          f"errors {errors}  final flush {final_flush * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare concurrent refresh-token rotation on the SQLite blacklist with the cached blacklist'
+    )
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent worker processes (like gunicorn workers)')
+    parser.add_argument('--refreshes', type=int, default=200, help='Refreshes per worker')
+    parser.add_argument('--mode', choices=['sqlite', 'cached', 'both'], default='both')
+    args = parser.parse_args()
+
+    print(f"🔁 {args.workers} workers x {args.refreshes} refreshes with rotation and blacklisting")
+    for mode in (['sqlite', 'cached'] if args.mode == 'both' else [args.mode]):
+        run(mode, args.workers, args.refreshes)
+
+
+if __name__ == "__main__":
+    main()
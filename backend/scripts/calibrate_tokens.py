@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+
+# Set up Django environment
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+from qa_engine.tokens import (
+    CORPUS_PATH, FEATURES, PARAGRAPH_LINES, RATES_PATH, REFERENCE_COUNTS_PATH,
+    TokenEstimator, count_features, estimate_error, load_corpus, load_rates
+)
+
+
+def load_tokenizer(name):
+    """A tokenizer.json file, or a tokenizer downloaded from the Hugging Face hub"""
+    from tokenizers import Tokenizer
+    if os.path.isfile(name):
+        return Tokenizer.from_file(name)
+    return Tokenizer.from_pretrained(name)
+
+
+def load_transcripts(size):
+    """A random sample of stored transcripts, cut to 20k characters each"""
+    import django
+    django.setup()
+    from api.services.mongo_service import mongo_service
+    return [
+        doc['content'][:20000]
+        for doc in mongo_service.db.video_transcripts.aggregate([
+            {'$sample': {'size': size}},
+            {'$project': {'content': 1}}
+        ])
+    ]
+
+
+def fit_rates(samples, actual):
+    """Non-negative relative least squares fit, so short lines count as much as long transcripts"""
+    features = np.array([[counts[feature] for feature in FEATURES] for counts in map(count_features, samples)], dtype=float)
+    weights = 1 / actual
+    active = list(range(len(FEATURES)))
+    while True:
+        fitted, *_ = np.linalg.lstsq(features[:, active] * weights[:, None], actual * weights, rcond=None)
+        if fitted.min() >= 0:
+            break
+        # A negative weight would make the estimate shrink as text grows; drop that feature and refit
+        del active[int(fitted.argmin())]
+    rates = dict.fromkeys(FEATURES, 0.0)
+    for index, rate in zip(active, fitted):
+        rates[FEATURES[index]] = round(float(rate), 4)
+    return rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit the offline token estimator to a real tokenizer')
+    parser.add_argument('--tokenizer', default='deepseek-ai/DeepSeek-V3',
+                        help='Hugging Face tokenizer name, or a path to its tokenizer.json')
+    parser.add_argument('--corpus', default=CORPUS_PATH, help='Text file with one sample per line')
+    parser.add_argument('--mongo-sample', type=int, default=0, metavar='N',
+                        help='Also fit on N random transcripts from video_transcripts')
+    parser.add_argument('--write', action='store_true',
+                        help=f'Save the fitted rates to {RATES_PATH} and the corpus token counts to {REFERENCE_COUNTS_PATH}')
+    args = parser.parse_args()
+
+    tokenizer = load_tokenizer(args.tokenizer)
+
+    def count(text):
+        return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+    lines, paragraphs = load_corpus(args.corpus)
+    transcripts = load_transcripts(args.mongo_sample) if args.mongo_sample else []
+    samples = lines + paragraphs + transcripts
+    actual = np.array([count(sample) for sample in samples], dtype=float)
+    print(f"📚 {len(samples)} samples, {int(actual.sum())} tokens with {args.tokenizer}")
+
+    fitted_rates = fit_rates(samples, actual)
+    # Paragraphs and transcripts are what the planner estimates; single lines are reported for reference
+    long_samples = paragraphs + transcripts
+    long_actual = actual[len(lines):]
+    for name, rates in (('current', load_rates()), ('fitted', fitted_rates)):
+        estimator = TokenEstimator(rates=rates)
+        line_error, _ = estimate_error(estimator.estimate, lines, actual[:len(lines)])
+        mean_error, max_error = estimate_error(estimator.estimate, long_samples, long_actual)
+        total_error = 100 * abs(sum(map(estimator.estimate, samples)) - actual.sum()) / actual.sum()
+        print(f"📊 {name:8} paragraphs mean error {mean_error:.2f}%, worst {max_error:.2f}%; "
+              f"lines {line_error:.2f}%; corpus total {total_error:.2f}%")
+    print(f"   fitted rates: {fitted_rates}")
+
+    if args.write:
+        # The measured error decides whether BudgetPlanner may cap completions with max_tokens
+        with open(RATES_PATH, 'w', encoding='utf-8') as f:
+            json.dump({
+                'tokenizer': args.tokenizer,
+                'samples': len(samples),
+                'rates': fitted_rates,
+                'mean_error_pct': round(float(mean_error), 2),
+                'max_error_pct': round(float(max_error), 2),
+                'line_mean_error_pct': round(float(line_error), 2),
+                'total_error_pct': round(float(total_error), 2)
+            }, f, indent=2)
+            f.write('\n')
+        print(f"✅ Saved rates to {RATES_PATH}")
+
+        # Reference counts let the test suite re-check the estimator without the tokenizer
+        with open(REFERENCE_COUNTS_PATH, 'w', encoding='utf-8') as f:
+            json.dump({
+                'tokenizer': args.tokenizer,
+                'paragraph_lines': PARAGRAPH_LINES,
+                'lines': [int(tokens) for tokens in actual[:len(lines)]],
+                'paragraphs': [int(tokens) for tokens in actual[len(lines):len(lines) + len(paragraphs)]]
+            }, f, indent=2)
+            f.write('\n')
+        print(f"✅ Saved corpus token counts to {REFERENCE_COUNTS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -28,24 +28,15 @@ def save_transcript(video_id, transcript_data):
     }
     return mongo_service.db.transcripts.insert_one(doc)
 
-def save_qa_pairs(transcript_id, qa_pairs, video_id):
+def save_qa_pairs(transcript_id, qa_pairs, video_id, qa_type=None):
     """Save QA pairs to MongoDB"""
-    qa_docs = []
-    for qa in qa_pairs:
-        qa_doc = {
-            'transcript_id': transcript_id,
-            'video_id': video_id,
-            'question': qa['question'],
-            'answer': qa['answer'],
-            'type': qa.get('type', 'novice'),
-            'options': qa.get('options', None),
-            'created_at': datetime.utcnow()
-        }
-        qa_docs.append(qa_doc)
-    
-    if qa_docs:
-        return mongo_service.db.qa_pairs.insert_many(qa_docs)
-    return None
+    return mongo_service.save_questions(
+        transcript_id=transcript_id,
+        video_id=video_id,
+        questions=qa_pairs,
+        question_type=qa_type,
+        source='playlist'
+    )
 
 def process_video(video):
     """Process a single video: get transcript, generate QA pairs"""
@@ -61,16 +52,14 @@ def process_video(video):
         transcript_result = save_transcript(video_id, transcript_text)
         print("✅ Saved transcript")
         
-        # Generate and save QA pairs for different types
-        for qa_type in ['novice', 'mcq', 'fill_blanks']:
-            print(f"📝 Generating {qa_type} questions...")
-            qa_pairs = qa_model.generate_questions(transcript_text, qa_type)
-            
-            if isinstance(qa_pairs, dict) and 'qa_pairs' in qa_pairs:
-                qa_pairs = qa_pairs['qa_pairs']
-            
-            save_qa_pairs(transcript_result.inserted_id, qa_pairs, video_id)
-            print(f"✅ Saved {len(qa_pairs)} {qa_type} questions")
+        # Generate all question types in one model call and save them per type
+        qa_types = ['novice', 'mcq', 'fill_blanks']
+        print(f"📝 Generating {', '.join(qa_types)} questions...")
+        generated = qa_model.generate_questions_batch(transcript_text, qa_types)
+        
+        for qa_type, qa_pairs in generated.items():
+            saved = save_qa_pairs(transcript_result.inserted_id, qa_pairs, video_id, qa_type)
+            print(f"✅ Saved {len(saved)} {qa_type} questions")
         
         # Mark video as processed
         mongo_service.db.youtube_videos.update_one(
@@ -104,8 +93,7 @@ def main():
     print("🚀 Starting dataset generation...")
     
     # Create indexes if they don't exist
-    mongo_service.db.transcripts.create_index('video_id', unique=True)
-    mongo_service.db.qa_pairs.create_index([('transcript_id', 1), ('type', 1)])
+    mongo_service.ensure_indexes()
     
     # Get unprocessed videos
     videos = get_unprocessed_videos()
@@ -124,6 +112,8 @@ def main():
     print(f"✅ Successfully processed: {successful}")
     print(f"❌ Failed: {failed}")
     print(f"📊 Total QA pairs: {mongo_service.db.qa_pairs.count_documents({})}")
+    print(f"🗄️  QA cache: {qa_model.cache.stats()}")
+    print(f"🧮 LLM usage: {qa_model.usage.stats()}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -52,7 +52,7 @@ def main():
     print("🔍 Fetching playlist URLs...")
     try:
         # Create index on video_id if it doesn't exist
-        mongo_service.db.youtube_videos.create_index('video_id', unique=True)
+        mongo_service.ensure_indexes(['youtube_videos'])
         
         # Fetch and process videos
         videos = get_urls_from_playlist(PLAYLIST_URL)
@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+# Set up Django environment
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import django
+django.setup()
+
+from bson import ObjectId
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from api.services.mongo_service import mongo_service
+from api.services.user_service import user_service, LOGIN_FIELDS
+from api.services.password_hasher import password_hasher
+
+EMAIL_PREFIX = 'login-load-test-'
+PASSWORD = 'load-test-password'
+
+
+def legacy_login(email, password):
+    """The previous login path: full document read and a synchronous last_login update"""
+    user = mongo_service.db.users.find_one({'email': email})
+    if user and check_password(password, user['password']):
+        mongo_service.db.users.update_one(
+            {'_id': ObjectId(user['_id'])},
+            {'$set': {'last_login': datetime.utcnow()}}
+        )
+        return True
+    return False
+
+
+def current_login(email, password):
+    """The current login path: projected read and a queued last_login update"""
+    user = user_service.get_user_by_email(email, fields=LOGIN_FIELDS)
+    if user and user_service.verify_password(user, password):
+        user_service.update_last_login(user['id'])
+        return True
+    return False
+
+
+def run(name, login, emails, concurrency, logins):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda i: login(emails[i % len(emails)], PASSWORD), range(logins)))
+    elapsed = time.perf_counter() - started
+    print(f"⏱️  {name:8} {logins / elapsed:8.1f} logins/s ({results.count(False)} failed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare logins per second before and after the single-query login path')
+    parser.add_argument('--users', type=int, default=50, help='Test users to create')
+    parser.add_argument('--logins', type=int, default=2000, help='Logins per scenario')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent logins')
+    parser.add_argument('--real-hasher', action='store_true',
+                        help='Keep the configured password hasher (otherwise hashing would hide the database cost)')
+    args = parser.parse_args()
+
+    if not args.real_hasher:
+        settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher'] + list(settings.PASSWORD_HASHERS)
+        # Pool processes load their own settings; hash inline so both paths use the fast hasher
+        password_hasher.workers = 0
+
+    users = mongo_service.db.users
+    emails = [f'{EMAIL_PREFIX}{i}@example.com' for i in range(args.users)]
+    users.delete_many({'email': {'$regex': f'^{EMAIL_PREFIX}'}})
+    hashed = make_password(PASSWORD)
+    users.insert_many([
+        {'email': email, 'username': email, 'password': hashed, 'first_name': 'Load', 'last_name': 'Test',
+         'is_active': True, 'date_joined': datetime.utcnow(), 'last_login': None}
+        for email in emails
+    ])
+    print(f"🔑 {args.logins} logins over {args.users} users with {args.concurrency} threads")
+
+    try:
+        run('before', legacy_login, emails, args.concurrency, args.logins)
+        run('after', current_login, emails, args.concurrency, args.logins)
+        if user_service.last_logins is not None:
+            user_service.last_logins.flush()
+            print(f"📊 last_login writes: {user_service.last_logins.stats()}")
+    finally:
+        users.delete_many({'email': {'$regex': f'^{EMAIL_PREFIX}'}})
+
+
+if __name__ == "__main__":
+    main()
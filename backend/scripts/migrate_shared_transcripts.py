@@ -0,0 +1,74 @@
+import os
+import sys
+import argparse
+from datetime import datetime
+
+# Set up Django environment
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import django
+django.setup()
+
+from pymongo import UpdateOne
+from api.services.mongo_service import mongo_service
+
+BATCH_SIZE = 500
+
+
+def migrate(dry_run=False):
+    """
+    Move inline transcript content into the shared video_transcripts collection.
+    Per-user documents keep a video_transcript_id reference and lose their copy of the text.
+    Safe to re-run: already migrated documents have no 'content' field.
+    """
+    db = mongo_service.db
+    cursor = db.transcripts.find(
+        {'content': {'$exists': True}, 'video_id': {'$exists': True}},
+        {'video_id': 1, 'language': 1, 'content': 1}
+    )
+
+    migrated = 0
+    shared_ids = {}
+    updates = []
+    for doc in cursor:
+        language = doc.get('language') or 'hi'
+        key = (doc['video_id'], language)
+        if key not in shared_ids:
+            if dry_run:
+                shared_ids[key] = None
+            else:
+                shared_ids[key] = mongo_service.save_video_transcript(doc['video_id'], doc['content'], language)
+
+        migrated += 1
+        if dry_run:
+            continue
+        updates.append(UpdateOne(
+            {'_id': doc['_id']},
+            {
+                '$set': {'video_transcript_id': shared_ids[key], 'updated_at': datetime.utcnow()},
+                '$unset': {'content': ''}
+            }
+        ))
+        if len(updates) >= BATCH_SIZE:
+            db.transcripts.bulk_write(updates, ordered=False)
+            updates = []
+
+    if updates:
+        db.transcripts.bulk_write(updates, ordered=False)
+    return migrated, len(shared_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deduplicate transcript content into video_transcripts')
+    parser.add_argument('--dry-run', action='store_true', help='Only count the documents that would change')
+    args = parser.parse_args()
+
+    print("🚀 Migrating transcripts to the shared store...")
+    migrated, shared = migrate(dry_run=args.dry_run)
+    prefix = "Would migrate" if args.dry_run else "Migrated"
+    print(f"✅ {prefix} {migrated} transcripts into {shared} shared video transcripts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import signal
+import argparse
+
+# Set up Django environment
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run the question generation worker pool')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('QA_JOB_WORKERS', '4')),
+                        help='Number of concurrent generation workers')
+    parser.add_argument('--poll-interval', type=float, default=1.0,
+                        help='Seconds to wait when the queue is empty')
+    parser.add_argument('--fake', action='store_true',
+                        help='Use the offline fake LLM client instead of DeepSeek')
+    parser.add_argument('--fake-latency', type=float, default=1.0,
+                        help='Simulated LLM latency in seconds (with --fake)')
+    parser.add_argument('--fake-tps', type=float, default=0,
+                        help='Simulated LLM output tokens per second (with --fake, 0 = instant)')
+    parser.add_argument('--load-test', type=int, default=0, metavar='N',
+                        help='Enqueue N jobs for --transcript-id, drain them and report throughput')
+    parser.add_argument('--transcript-id', help='Transcript used by --load-test')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.fake:
+        os.environ['QA_LLM_BACKEND'] = 'fake'
+        os.environ['QA_LLM_FAKE_LATENCY'] = str(args.fake_latency)
+        os.environ['QA_LLM_FAKE_TOKENS_PER_SECOND'] = str(args.fake_tps)
+
+    import django
+    django.setup()
+
+    from api.services.job_service import job_service, GenerationWorkerPool
+    from api.services.mongo_service import mongo_service
+    from api.services.qa_service import qa_service
+    from api.services.question_bank import question_bank
+
+    pool = GenerationWorkerPool(
+        job_service,
+        qa_service,
+        concurrency=args.workers,
+        poll_interval=args.poll_interval
+    )
+
+    if args.load_test:
+        if not args.transcript_id:
+            print("❌ --load-test requires --transcript-id")
+            sys.exit(1)
+        transcript = mongo_service.get_transcript(args.transcript_id)
+        if not transcript:
+            print(f"❌ Transcript {args.transcript_id} not found")
+            sys.exit(1)
+
+        types = qa_service.get_supported_question_types()
+        for i in range(args.load_test):
+            job_service.enqueue_generation(args.transcript_id, transcript['user_id'], [types[i % len(types)]])
+        print(f"📋 Enqueued {args.load_test} jobs, running {args.workers} workers...")
+
+        started = time.monotonic()
+        pool.start()
+        pool.wait_until_idle()
+        pool.stop()
+        elapsed = time.monotonic() - started
+
+        print("\n=== Load Test Summary ===")
+        print(f"✅ Completed: {pool.stats['completed']}")
+        print(f"❌ Failed: {pool.stats['failed']}")
+        print(f"🔁 Lost leases: {pool.stats['lost_leases']}")
+        print(f"📝 Questions created: {pool.stats['questions']}")
+        print(f"⏱️  Elapsed: {elapsed:.2f}s ({pool.stats['completed'] / elapsed:.2f} jobs/s)")
+        print(f"🧮 LLM usage: {qa_service.qa_model.usage.stats()}")
+        print(f"🏦 Question bank: {question_bank.stats()}")
+        return
+
+    def shutdown(signum, frame):
+        print("🛑 Stopping workers...")
+        pool.stop()
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    print(f"🚀 Started {args.workers} question generation workers")
+    pool.start()
+    while True:
+        time.sleep(60)
+        print(f"📊 {pool.stats}")
+
+
+if __name__ == "__main__":
+    main()
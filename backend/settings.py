@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -106,6 +107,14 @@ MONGODB_NAME = os.getenv('MONGODB_NAME', 'hindi_learning')
 os.makedirs(os.path.dirname(BASE_DIR / 'db.sqlite3'), exist_ok=True)
 
 
+# Password hashing: new and upgraded hashes use Argon2; PBKDF2 hashes still verify
+PASSWORD_HASHERS = [
+    'api.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 # Password validation
 # Keep these for JWT auth
 AUTH_PASSWORD_VALIDATORS = [
@@ -167,6 +176,8 @@ CSRF_COOKIE_SECURE = True
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+# Reverse proxies in front of the app that append to X-Forwarded-For (0: use REMOTE_ADDR)
+TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', '1'))
 
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = False
@@ -226,8 +237,15 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    # Blacklist checks and writes through the Bloom filter and batched writer in api/token_blacklist.py
+    'TOKEN_REFRESH_SERIALIZER': 'api.token_blacklist.CachedTokenRefreshSerializer',
 }
 
+# Test runs log to the console only so they don't leave a debug.log behind
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+LOG_FILE = os.getenv('DJANGO_LOG_FILE', 'debug.log')
+LOG_HANDLERS = ['console'] if TESTING or not LOG_FILE else ['console', 'file']
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -244,17 +262,18 @@ LOGGING = {
         },
         'file': {
             'class': 'logging.FileHandler',
-            'filename': 'debug.log',
+            'filename': LOG_FILE or os.devnull,
             'formatter': 'verbose',
+            'delay': True,
         },
     },
     'loggers': {
         '': {  # Root logger
-            'handlers': ['console', 'file'],
+            'handlers': LOG_HANDLERS,
             'level': 'INFO',
         },
         'api': {  # Logger for your api app
-            'handlers': ['console', 'file'],
+            'handlers': LOG_HANDLERS,
             'level': 'INFO',
             'propagate': False,
         },
@@ -269,5 +288,7 @@ CACHES = {
     }
 }
 
-# Cache timeout for transcripts (24 hours)
+# Cache timeout for transcripts (24 hours). Fetched transcripts are cached by
+# api/transcript_cache.py, not CACHES: a per-process LRU (TRANSCRIPT_CACHE_MEMORY_BYTES)
+# in front of a SQLite file shared by the workers (TRANSCRIPT_CACHE_PATH, TRANSCRIPT_CACHE_DISK_BYTES)
 TRANSCRIPT_CACHE_TIMEOUT = 60 * 60 * 24
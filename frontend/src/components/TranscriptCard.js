@@ -53,9 +53,19 @@ const TranscriptCard = ({ transcript, onDelete, onUpdate }) => {
   const [qaExpanded, setQaExpanded] = useState(false);
   const [isFavorite, setIsFavorite] = useState(transcript.is_favorite);
   const [isLoading, setIsLoading] = useState(false);
+  // The list only carries a preview; the full text is loaded the first time the card is expanded
+  const [content, setContent] = useState(transcript.content);
 
-  const handleExpandClick = () => {
+  const handleExpandClick = async () => {
     setExpanded(!expanded);
+    if (!expanded && content === undefined) {
+      try {
+        const detail = await transcriptService.getTranscript(transcript.id);
+        setContent(detail.content);
+      } catch (error) {
+        console.error('Failed to load transcript:', error);
+      }
+    }
   };
 
   const handleQAExpandClick = () => {
@@ -77,7 +87,7 @@ const TranscriptCard = ({ transcript, onDelete, onUpdate }) => {
     }
   };
 
-  const title = extractTitle(transcript.content, transcript.title);
+  const title = extractTitle(transcript.content ?? transcript.preview ?? '', transcript.title);
   const createdDate = moment(transcript.created_at).format('MMMM D, YYYY');
 
   return (
@@ -128,7 +138,7 @@ const TranscriptCard = ({ transcript, onDelete, onUpdate }) => {
             fontFamily: 'inherit',
             lineHeight: 1.8
           }}>
-            {transcript.content}
+            {content ?? transcript.preview}
           </Typography>
         </Collapse>
       </CardContent>